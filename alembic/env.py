@@ -16,6 +16,7 @@ from models.sale import Sale  # pylint: disable=import-error, unused-import, wro
 from models.purchase import Purchase  # pylint: disable=import-error, unused-import, wrong-import-position
 from models.ingredient import Ingredient  # pylint: disable=import-error, unused-import, wrong-import-position
 from models.edition_ingredient import EditionIngredient  # pylint: disable=import-error, unused-import, wrong-import-position
+from models.edition_summary import EditionSummary  # pylint: disable=import-error, unused-import, wrong-import-position
 
 # 2️⃣ Cargar variables de entorno
 load_dotenv()
@@ -0,0 +1,50 @@
+"""Add trigram search indexes
+
+Revision ID: 2e8a5f17c3b9
+Revises: 9d41f6a2c8e3
+Create Date: 2026-10-16 15:02:47.381925
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e8a5f17c3b9'
+down_revision: Union[str, Sequence[str], None] = '9d41f6a2c8e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (índice, tabla, columna) con GIN gin_trgm_ops: sirven para ILIKE '%q%' y para %> / word_similarity
+TRGM_INDEXES = [
+    ('ix_customer_name_trgm', 'customer', 'name'),
+    ('ix_customer_email_trgm', 'customer', 'email'),
+    ('ix_customer_phone_trgm', 'customer', 'phone'),
+    ('ix_ingredient_name_trgm', 'ingredient', 'name'),
+    ('ix_ingredient_unit_trgm', 'ingredient', 'unit'),
+    ('ix_purchase_supplier_trgm', 'purchase', 'supplier'),
+    ('ix_purchase_notes_trgm', 'purchase', 'notes'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, table_name, column in TRGM_INDEXES:
+        op.create_index(
+            index_name,
+            table_name,
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for index_name, table_name, _ in reversed(TRGM_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
+    # la extensión queda instalada: otros objetos de la base pueden depender de ella
@@ -0,0 +1,45 @@
+"""Add keyset pagination indexes
+
+Revision ID: 5b7c2e91d4a0
+Revises: 870f9b949df2
+Create Date: 2026-10-16 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7c2e91d4a0'
+down_revision: Union[str, Sequence[str], None] = '870f9b949df2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_sale_created_at_id', 'sale', ['created_at', 'id'], unique=False)
+    op.create_index('ix_sale_edition_created_at_id', 'sale', ['edition_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_customer_name_id', 'customer', ['name', 'id'], unique=False)
+    op.create_index('ix_edition_date_id', 'edition', ['date', 'id'], unique=False)
+    op.create_index('ix_ingredient_created_at_id', 'ingredient', ['created_at', 'id'], unique=False)
+    op.create_index('ix_purchase_purchased_at_id', 'purchase', ['purchased_at', 'id'], unique=False)
+    op.create_index(
+        'ix_edition_ingredient_edition_created_at_id',
+        'edition_ingredient',
+        ['edition_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_edition_ingredient_edition_created_at_id', table_name='edition_ingredient')
+    op.drop_index('ix_purchase_purchased_at_id', table_name='purchase')
+    op.drop_index('ix_ingredient_created_at_id', table_name='ingredient')
+    op.drop_index('ix_edition_date_id', table_name='edition')
+    op.drop_index('ix_customer_name_id', table_name='customer')
+    op.drop_index('ix_sale_edition_created_at_id', table_name='sale')
+    op.drop_index('ix_sale_created_at_id', table_name='sale')
@@ -0,0 +1,33 @@
+"""Add updated_at to sale, customer and edition
+
+Revision ID: 7f3d9b2a6c14
+Revises: 2e8a5f17c3b9
+Create Date: 2026-10-16 16:41:09.527310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3d9b2a6c14'
+down_revision: Union[str, Sequence[str], None] = '2e8a5f17c3b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # server_default now(): las filas existentes quedan con la fecha de la migración
+    op.add_column('sale', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('customer', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('edition', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('edition', 'updated_at')
+    op.drop_column('customer', 'updated_at')
+    op.drop_column('sale', 'updated_at')
@@ -0,0 +1,146 @@
+"""Add edition summary
+
+Revision ID: 9d41f6a2c8e3
+Revises: 5b7c2e91d4a0
+Create Date: 2026-10-16 12:40:07.118250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d41f6a2c8e3'
+down_revision: Union[str, Sequence[str], None] = '5b7c2e91d4a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Aplica deltas por edición. Omite ediciones que ya no existen: cuando se borra
+# una edición, el CASCADE sobre sale/edition_ingredient dispara estos triggers
+# después de borrada la edición (y su fila de summary se borra por su propio CASCADE).
+# ORDER BY edition_id: orden de locks determinístico entre transacciones concurrentes.
+APPLY_DELTAS_SQL = """
+CREATE OR REPLACE FUNCTION edition_summary_apply(p_edition_ids bigint[], p_sales bigint[], p_costs double precision[])
+RETURNS void LANGUAGE sql AS $$
+    INSERT INTO edition_summary AS s (edition_id, sales_count, edition_costs, updated_at)
+    SELECT d.edition_id, d.sales, d.costs, now()
+    FROM unnest(p_edition_ids, p_sales, p_costs) AS d(edition_id, sales, costs)
+    WHERE EXISTS (SELECT 1 FROM edition e WHERE e.id = d.edition_id)
+    ORDER BY d.edition_id
+    ON CONFLICT (edition_id) DO UPDATE
+    SET sales_count = s.sales_count + EXCLUDED.sales_count,
+        edition_costs = s.edition_costs + EXCLUDED.edition_costs,
+        updated_at = EXCLUDED.updated_at;
+$$;
+"""
+
+# Triggers por sentencia con tablas de transición: un INSERT/UPDATE/DELETE
+# masivo aplica un solo upsert por edición afectada, no uno por fila.
+SALE_TRIGGER_FN_SQL = """
+CREATE OR REPLACE FUNCTION edition_summary_on_sale() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM edition_summary_apply(array_agg(edition_id), array_agg(delta), array_agg(0::double precision))
+        FROM (SELECT edition_id, SUM(total_portions)::bigint AS delta
+              FROM new_rows GROUP BY edition_id) d;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM edition_summary_apply(array_agg(edition_id), array_agg(delta), array_agg(0::double precision))
+        FROM (SELECT edition_id, -SUM(total_portions)::bigint AS delta
+              FROM old_rows GROUP BY edition_id) d;
+    ELSE
+        PERFORM edition_summary_apply(array_agg(edition_id), array_agg(delta), array_agg(0::double precision))
+        FROM (SELECT edition_id, SUM(portions)::bigint AS delta
+              FROM (SELECT edition_id, total_portions AS portions FROM new_rows
+                    UNION ALL
+                    SELECT edition_id, -total_portions FROM old_rows) u
+              GROUP BY edition_id
+              HAVING SUM(portions) <> 0) d;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+EDITION_INGREDIENT_TRIGGER_FN_SQL = """
+CREATE OR REPLACE FUNCTION edition_summary_on_edition_ingredient() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM edition_summary_apply(array_agg(edition_id), array_agg(0::bigint), array_agg(delta))
+        FROM (SELECT edition_id, SUM(subtotal) AS delta
+              FROM new_rows GROUP BY edition_id) d;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM edition_summary_apply(array_agg(edition_id), array_agg(0::bigint), array_agg(delta))
+        FROM (SELECT edition_id, -SUM(subtotal) AS delta
+              FROM old_rows GROUP BY edition_id) d;
+    ELSE
+        PERFORM edition_summary_apply(array_agg(edition_id), array_agg(0::bigint), array_agg(delta))
+        FROM (SELECT edition_id, SUM(subtotal) AS delta
+              FROM (SELECT edition_id, subtotal FROM new_rows
+                    UNION ALL
+                    SELECT edition_id, -subtotal FROM old_rows) u
+              GROUP BY edition_id
+              HAVING SUM(subtotal) <> 0) d;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+BACKFILL_SQL = """
+INSERT INTO edition_summary (edition_id, sales_count, edition_costs, updated_at)
+SELECT e.id,
+       COALESCE((SELECT SUM(s.total_portions) FROM sale s WHERE s.edition_id = e.id), 0),
+       COALESCE((SELECT SUM(ei.subtotal) FROM edition_ingredient ei WHERE ei.edition_id = e.id), 0),
+       now()
+FROM edition e
+"""
+
+
+def _create_triggers(table: str, fn: str) -> None:
+    # una tabla de transición por evento: Postgres no permite varios eventos con REFERENCING
+    op.execute(f"""
+        CREATE TRIGGER trg_{table}_summary_ins AFTER INSERT ON {table}
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION {fn}()
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_{table}_summary_upd AFTER UPDATE ON {table}
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION {fn}()
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_{table}_summary_del AFTER DELETE ON {table}
+        REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION {fn}()
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('edition_summary',
+    sa.Column('edition_id', sa.BigInteger(), nullable=False),
+    sa.Column('sales_count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('edition_costs', sa.Float(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['edition_id'], ['edition.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('edition_id')
+    )
+    op.execute(APPLY_DELTAS_SQL)
+    op.execute(SALE_TRIGGER_FN_SQL)
+    op.execute(EDITION_INGREDIENT_TRIGGER_FN_SQL)
+    # backfill y triggers bajo el mismo lock: ninguna escritura queda afuera
+    op.execute("LOCK TABLE sale, edition_ingredient IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(BACKFILL_SQL)
+    _create_triggers('sale', 'edition_summary_on_sale')
+    _create_triggers('edition_ingredient', 'edition_summary_on_edition_ingredient')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('sale', 'edition_ingredient'):
+        for suffix in ('ins', 'upd', 'del'):
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_summary_{suffix} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS edition_summary_on_edition_ingredient()")
+    op.execute("DROP FUNCTION IF EXISTS edition_summary_on_sale()")
+    op.execute("DROP FUNCTION IF EXISTS edition_summary_apply(bigint[], bigint[], double precision[])")
+    op.drop_table('edition_summary')
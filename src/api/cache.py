@@ -0,0 +1,154 @@
+"""
+Respuestas cacheadas para rutas GET (ver core/cache.py).
+
+Uso en una ruta:
+
+    return await cached_response(
+        request,
+        tags=("ingredients",),
+        model=IngredientListResponse,
+        build=lambda: run_db_lazily(request, crud_ingredient.get_ingredients, ...),
+    )
+
+`run_db_lazily` (api/deps.py) abre la sesión recién dentro de `build`: con
+`Depends(get_session)` un hit igual pagaría la sesión (y el checkout de la réplica).
+
+La clave es método + path + query params (ordenados) + versiones de los tags
++ formato negociado (api/formats.py). Se guarda el cuerpo ya serializado por el
+`model` en ese formato (y comprimido con gzip si supera
+settings.response_cache_compress_min_bytes), así un hit no vuelve a consultar
+la base, ni a validar con Pydantic, ni a re-codificar.
+
+Una respuesta leída de una réplica (api.deps marca request.state.db_replica)
+no se guarda si alguno de sus tags se invalidó hace menos de
+settings.read_your_writes_seconds: la réplica puede no tener todavía la
+escritura y el cuerpo viejo quedaría bajo la versión nueva del tag.
+"""
+import gzip
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional, Sequence, Type
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from api.formats import JSON_MEDIA_TYPE, response_codec  # pylint: disable=import-error
+from api.serialization import fast_json_response, json_response, render  # pylint: disable=import-error
+from core import cache  # pylint: disable=import-error
+from core.config import settings  # pylint: disable=import-error
+
+logger = logging.getLogger(__name__)
+
+# primer byte de cada entrada: formato del cuerpo guardado
+_RAW = b"r"
+_GZIP = b"g"
+
+
+def _media_type() -> str:
+    codec = response_codec()
+    return codec.media_type if codec is not None else JSON_MEDIA_TYPE
+
+
+def _cache_key(request: Request, versions: Sequence[int]) -> str:
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    tag_versions = ",".join(str(v) for v in versions)
+    return f"{request.method}:{request.url.path}?{params}#{tag_versions}@{_media_type()}"
+
+
+def _encode(body: bytes) -> bytes:
+    if 0 <= settings.response_cache_compress_min_bytes <= len(body):
+        return _GZIP + gzip.compress(body, compresslevel=5)
+    return _RAW + body
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Accept-Encoding admite gzip: `gzip` (o `*` si gzip no figura) con q > 0."""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding] = q
+    return qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0))) > 0
+
+
+def _response(entry: bytes, request: Request, cache_status: str, extra_headers: Optional[dict]) -> Response:
+    headers = {"X-Cache": cache_status, **(extra_headers or {})}
+    body = entry[1:]
+    if entry[:1] == _GZIP:
+        # la misma URL responde comprimido o no según el cliente: siempre Vary
+        headers["Vary"] = "Accept-Encoding"
+        if _accepts_gzip(request.headers.get("accept-encoding", "")):
+            headers["Content-Encoding"] = "gzip"
+        else:
+            body = gzip.decompress(body)
+    return Response(content=body, media_type=_media_type(), headers=headers)
+
+
+def _replica_may_lag(request: Request, tags: Sequence[str]) -> bool:
+    if not getattr(request.state, "db_replica", False):
+        return False
+    return time.time() - cache.backend.invalidated_at(tags) < settings.read_your_writes_seconds
+
+
+async def _call(fn: Callable, *args: Any) -> Any:
+    if cache.backend.blocking:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+async def cached_response(
+    request: Request,
+    *,
+    tags: Sequence[str],
+    model: Type[BaseModel],
+    build: Callable[[], Awaitable[Any]],
+    ttl: Optional[float] = None,
+    headers: Optional[dict] = None,
+) -> Any:
+    """
+    Devuelve la respuesta cacheada para `request` o la construye con `build()`,
+    la serializa con `model` y la guarda. `headers` se agregan a la respuesta
+    (ej. Cache-Control). Sin cache habilitado se responde por la serialización
+    directa de api/serialization.py.
+    """
+    if not settings.response_cache_enabled:
+        data = await build()
+        if headers:
+            return json_response(data, model, headers)
+        return fast_json_response(data, model)
+
+    namespace = tags[0]
+    try:
+        versions = await _call(cache.backend.versions, tags)
+        key = _cache_key(request, versions)
+        entry = await _call(cache.backend.get, key)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Cache de respuestas no disponible; se responde sin cache")
+        return json_response(await build(), model, headers)
+
+    if entry is not None:
+        cache.stats.record(namespace, hit=True)
+        return _response(entry, request, "HIT", headers)
+
+    cache.stats.record(namespace, hit=False)
+    data = await build()
+    body, _ = render(data, model)
+    entry = _encode(body)
+    try:
+        if not await _call(_replica_may_lag, request, tags):
+            await _call(cache.backend.set, key, entry, ttl or settings.response_cache_ttl_seconds)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("No se pudo guardar en el cache de respuestas")
+    return _response(entry, request, "MISS", headers)
@@ -0,0 +1,71 @@
+"""
+GETs condicionales (ETag / Last-Modified) para listados que se consultan en polling.
+
+La ruta pasa una `probe` barata (cantidad de filas + últimos updated_at) y un
+`build` con la consulta completa. El ETag débil se calcula con la ruta, sus
+query params y la versión; si coincide con `If-None-Match` se responde 304
+sin ejecutar `build` ni serializar nada.
+
+Solo `If-None-Match` decide el 304: un borrado cambia la cantidad de filas
+(incluida en el ETag) pero no mueve ningún updated_at, así que Last-Modified se
+informa pero `If-Modified-Since` no alcanza para validar.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from api.serialization import json_response  # pylint: disable=import-error
+
+# los clientes deben revalidar siempre (respuesta cambia seguido, pero el 304 es barato)
+POLLING_CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(request: Request, version: Any) -> str:
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    raw = f"{request.url.path}?{params}|{version!r}"
+    return 'W/"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil (RFC 9110): ignora el prefijo W/; '*' coincide con todo."""
+    if not if_none_match:
+        return False
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == wanted:
+            return True
+    return False
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+async def conditional_response(
+    request: Request,
+    *,
+    probe: Callable[[], Awaitable[Tuple[Any, Optional[datetime]]]],
+    build: Callable[[], Awaitable[Any]],
+    model: Type[BaseModel],
+    cache_control: str = POLLING_CACHE_CONTROL,
+) -> Response:
+    version, last_modified = await probe()
+    headers = {"ETag": weak_etag(request, version), "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    data = await build()
+    return json_response(data, model, headers)
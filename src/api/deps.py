@@ -1,5 +1,31 @@
-from typing import Generator
-from db.session import SessionLocal # pylint: disable=import-error
+import inspect
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Generator, Optional, TypeVar, Union
+
+from fastapi import Depends, Request
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from core.config import settings # pylint: disable=import-error
+from db.replicas import ReplicaSet, reads_from_replica # pylint: disable=import-error
+from db.session import ( # pylint: disable=import-error
+    AsyncReplicaSessionLocal,
+    AsyncSessionLocal,
+    ReplicaSessionLocal,
+    SessionLocal,
+    async_replicas,
+    replicas,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# sesión que reciben las rutas: Session (sync) o AsyncSession según settings.db_async
+DbSession = Union[Session, AsyncSession]
 
 def get_db() -> Generator:
     """
@@ -18,4 +44,175 @@ def get_db() -> Generator:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator:
+    """
+    Versión async de `get_db` (settings.db_async): una AsyncSession por request,
+    cerrada al terminar sin ocupar un hilo del threadpool.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# claves de Session.info de una sesión de réplica
+_REPLICA = "replica"
+_PRIMARY_FALLBACK = "primary_fallback"
+_REPLICA_FAILED = "replica_failed"
+
+
+@asynccontextmanager
+async def _drive(provider: Callable[[], Any]) -> AsyncIterator[DbSession]:
+    """Usa como context manager una dependencia generadora sin parámetros (get_db o un override)."""
+    if inspect.isasyncgenfunction(provider):
+        async with asynccontextmanager(provider)() as db:
+            yield db
+        return
+    manager = contextmanager(provider)()
+    db = manager.__enter__()  # pylint: disable=unnecessary-dunder-call
+    try:
+        yield db
+    finally:
+        # db.close() puede devolver una conexión al pool: fuera del event loop
+        await run_in_threadpool(manager.__exit__, None, None, None)
+
+
+@asynccontextmanager
+async def _borrow(db: DbSession) -> AsyncIterator[DbSession]:
+    """La sesión del primario que ya abrió la dependencia (la cierra ella)."""
+    yield db
+
+
+def _open_replica_session(replica_set: ReplicaSet, session_factory: Callable[..., DbSession],
+                          fallback: Callable[[], Any]) -> Optional[DbSession]:
+    """
+    Sesión sobre la siguiente réplica en rotación; None si no queda ninguna.
+    No toma conexión: el checkout de la propia sesión hace el pre-ping y, si la
+    réplica no responde, `run_db` la saca de rotación y repite la lectura en el
+    primario que entrega `fallback()`.
+    """
+    candidates = replica_set.candidates()
+    if not candidates:
+        return None
+    db = session_factory(bind=candidates[0])
+    db.info[_REPLICA] = (replica_set, candidates[0])
+    db.info[_PRIMARY_FALLBACK] = fallback
+    return db
+
+
+def get_request_db(request: Request, primary: Session = Depends(get_db)) -> Generator:
+    """
+    Sesión de las rutas (modo sync): GET/HEAD leen de una réplica si hay
+    configuradas y el cliente no escribió recién; el resto usa el primario.
+    La sesión del primario es lazy: si se lee de la réplica nunca toma conexión.
+    """
+    if reads_from_replica(request.method, request.cookies, replicas):
+        db = _open_replica_session(replicas, ReplicaSessionLocal, lambda: _borrow(primary))
+        if db is not None:
+            # api/cache.py no guarda lecturas de réplica recién invalidadas
+            request.state.db_replica = True
+            try:
+                yield db
+            finally:
+                db.close()
+            return
+    yield primary
+
+
+async def get_async_request_db(request: Request, primary: AsyncSession = Depends(get_async_db)) -> AsyncGenerator:
+    """Igual que `get_request_db` para el stack async."""
+    if reads_from_replica(request.method, request.cookies, async_replicas):
+        db = _open_replica_session(async_replicas, AsyncReplicaSessionLocal, lambda: _borrow(primary))
+        if db is not None:
+            request.state.db_replica = True
+            async with db:
+                yield db
+            return
+    yield primary
+
+
+# dependencia de sesión de las rutas
+get_session = get_async_request_db if settings.db_async else get_request_db
+
+
+@asynccontextmanager
+async def open_session(request: Request) -> AsyncIterator[DbSession]:
+    """
+    La misma sesión que `get_session` (réplica o primario), abierta recién al
+    entrar al bloque. Para rutas que muchas veces no tocan la base (índice en
+    memoria, hits del cache de respuestas): con `Depends(get_session)` la sesión
+    se resuelve antes de saber si hace falta. Respeta los dependency_overrides
+    de get_session / get_db (tests y benchmarks).
+    """
+    overrides = request.app.dependency_overrides
+    if get_session in overrides:
+        async with _drive(overrides[get_session]) as db:
+            yield db
+        return
+
+    if settings.db_async:
+        primary = overrides.get(get_async_db, get_async_db)
+        if reads_from_replica(request.method, request.cookies, async_replicas):
+            db = _open_replica_session(async_replicas, AsyncReplicaSessionLocal, lambda: _drive(primary))
+            if db is not None:
+                request.state.db_replica = True
+                async with db:
+                    yield db
+                return
+        async with _drive(primary) as db:
+            yield db
+        return
+
+    primary = overrides.get(get_db, get_db)
+    if reads_from_replica(request.method, request.cookies, replicas):
+        db = _open_replica_session(replicas, ReplicaSessionLocal, lambda: _drive(primary))
+        if db is not None:
+            request.state.db_replica = True
+            try:
+                yield db
+            finally:
+                await run_in_threadpool(db.close)
+            return
+    async with _drive(primary) as db:
+        yield db
+
+
+async def _run(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def run_db(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Ejecuta una función CRUD `fn(session, *args, **kwargs)` sin bloquear el event loop.
+
+    - AsyncSession: `run_sync` corre el mismo código ORM sobre la conexión async
+      (asyncpg) dentro de un greenlet; no usa hilos.
+    - Session: se ejecuta en el threadpool, igual que una ruta `def`.
+
+    Si `db` es de una réplica y falla la conexión (OperationalError /
+    InterfaceError: no responde al checkout o se cayó), la réplica sale de
+    rotación y la lectura se repite en el primario; las siguientes llamadas con
+    la misma sesión van directo al primario.
+    """
+    fallback = db.info.get(_PRIMARY_FALLBACK)
+    if fallback is None or not db.info.get(_REPLICA_FAILED):
+        try:
+            return await _run(db, fn, *args, **kwargs)
+        except (OperationalError, InterfaceError):
+            if fallback is None:
+                raise
+            replica_set, replica = db.info[_REPLICA]
+            replica_set.mark_down(replica)
+            db.info[_REPLICA_FAILED] = True
+            logger.warning("Lectura de réplica fallida; se repite en el primario", exc_info=True)
+    async with fallback() as primary:
+        return await _run(primary, fn, *args, **kwargs)
+
+
+async def run_db_lazily(request: Request, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """`run_db` sobre una sesión de `open_session`: para el `build` de las rutas con cache."""
+    async with open_session(request) as db:
+        return await run_db(db, fn, *args, **kwargs)
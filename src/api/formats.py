@@ -0,0 +1,256 @@
+"""
+Formatos binarios por negociación de contenido (settings.binary_formats_enabled).
+
+Los clientes del POS pueden pedir y enviar MessagePack (`application/msgpack`,
+paquete `msgpack`) o CBOR (`application/cbor`, paquete opcional `cbor2`) en
+lugar de JSON:
+
+  - respuestas: con `Accept: application/msgpack` (o cbor, con q mayor o igual
+    al de application/json) se responde en ese formato;
+  - pedidos: un POST/PATCH con `Content-Type: application/msgpack` se decodifica
+    y llega a la ruta como JSON, validado con los mismos schemas.
+
+El middleware negocia el codec y lo deja en `response_codec()` mientras corre
+la ruta. Las respuestas que arma api/serialization.py (listados, cache de
+respuestas, GET condicionales) ya salen codificadas desde el modelo Pydantic y
+el middleware no las toca. El resto (rutas que devuelven el modelo y dejan
+serializar a FastAPI) sale como JSON y el middleware lo re-codifica,
+manteniendo el gzip si la respuesta venía comprimida. En todos los casos el
+contenido es el mismo documento JSON (fechas como strings ISO, claves de mapas
+como strings), solo cambia la codificación; las respuestas llevan `Vary: Accept`.
+"""
+import gzip
+import importlib
+import json
+import logging
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings  # pylint: disable=import-error
+
+logger = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class Codec:
+    """Codificación binaria de un media type; el paquete se importa la primera vez que se usa."""
+
+    def __init__(self, media_type: str, module: str, dumps: Callable[[Any, Any], bytes], loads: Callable[[Any, bytes], Any]) -> None:
+        self.media_type = media_type
+        self._module_name = module
+        self._dumps = dumps
+        self._loads = loads
+        self._module: Any = None
+        self._missing = False
+
+    def _load_module(self) -> Any:
+        if self._module is None and not self._missing:
+            try:
+                self._module = importlib.import_module(self._module_name)
+            except ImportError:
+                self._missing = True
+                logger.warning("%s requiere el paquete '%s'; se responde JSON", self.media_type, self._module_name)
+        return self._module
+
+    @property
+    def available(self) -> bool:
+        return self._load_module() is not None
+
+    def dumps(self, data: Any) -> bytes:
+        return self._dumps(self._load_module(), data)
+
+    def loads(self, raw: bytes) -> Any:
+        return self._loads(self._load_module(), raw)
+
+
+MSGPACK = Codec(
+    "application/msgpack",
+    "msgpack",
+    dumps=lambda m, data: m.packb(data, use_bin_type=True),
+    loads=lambda m, raw: m.unpackb(raw, raw=False),
+)
+CBOR = Codec(
+    "application/cbor",
+    "cbor2",
+    dumps=lambda m, data: m.dumps(data),
+    loads=lambda m, raw: m.loads(raw),
+)
+
+CODECS: Dict[str, Codec] = {
+    MSGPACK.media_type: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    CBOR.media_type: CBOR,
+}
+
+
+def _media_ranges(accept: str) -> List[Tuple[str, float]]:
+    ranges = []
+    for part in accept.split(","):
+        media, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges.append((media.strip().lower(), q))
+    return ranges
+
+
+def negotiate(accept: Optional[str]) -> Optional[Codec]:
+    """
+    Codec binario pedido en `Accept`, o None para responder JSON. El binario
+    se elige solo si se nombra explícitamente (`*/*` sigue siendo JSON) y con
+    q >= al de application/json.
+    """
+    if not accept:
+        return None
+    best: Optional[Codec] = None
+    best_q = json_q = 0.0
+    for media, q in _media_ranges(accept):
+        if media == JSON_MEDIA_TYPE:
+            json_q = max(json_q, q)
+            continue
+        codec = CODECS.get(media)
+        if codec is not None and q > best_q and codec.available:
+            best, best_q = codec, q
+    if best is None or best_q <= 0 or best_q < json_q:
+        return None
+    return best
+
+
+_response_codec: ContextVar[Optional[Codec]] = ContextVar("response_codec", default=None)
+
+
+def response_codec() -> Optional[Codec]:
+    """Codec negociado para la respuesta del request en curso (None: JSON)."""
+    return _response_codec.get()
+
+
+def request_codec(content_type: Optional[str]) -> Optional[Codec]:
+    if not content_type:
+        return None
+    return CODECS.get(content_type.split(";")[0].strip().lower())
+
+
+def _with_headers(scope: Scope, replace: Dict[bytes, bytes]) -> Scope:
+    headers = [(k, v) for k, v in scope["headers"] if k not in replace]
+    headers.extend(replace.items())
+    return {**scope, "headers": headers}
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+class BinaryFormatMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.binary_formats_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        body_codec = request_codec(headers.get("content-type"))
+        if body_codec is not None:
+            decoded = await self._decode_request(body_codec, receive, send)
+            if decoded is None:
+                return
+            scope = _with_headers(scope, {
+                b"content-type": JSON_MEDIA_TYPE.encode("latin-1"),
+                b"content-length": str(len(decoded)).encode("latin-1"),
+            })
+            receive = self._replay(decoded)
+
+        codec = negotiate(headers.get("accept"))
+        token = _response_codec.set(codec)
+        try:
+            await self.app(scope, receive, self._encoding_send(send, codec))
+        finally:
+            _response_codec.reset(token)
+
+    @staticmethod
+    def _replay(body: bytes) -> Receive:
+        sent = False
+
+        async def receive() -> Message:
+            nonlocal sent
+            if sent:
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return receive
+
+    @staticmethod
+    async def _decode_request(codec: Codec, receive: Receive, send: Send) -> Optional[bytes]:
+        """Cuerpo binario -> JSON; si no se puede, responde 415/400 y devuelve None."""
+        if not codec.available:
+            response = JSONResponse({"detail": f"{codec.media_type} no está disponible"}, status_code=415)
+            await response({"type": "http"}, receive, send)
+            return None
+        raw = await _read_body(receive)
+        try:
+            return json.dumps(codec.loads(raw), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        except Exception:  # pylint: disable=broad-except
+            # cuerpo mal formado o con tipos sin equivalente JSON (bytes, fechas nativas, ...)
+            response = JSONResponse({"detail": f"Cuerpo {codec.media_type} inválido"}, status_code=400)
+            await response({"type": "http"}, receive, send)
+            return None
+
+    @staticmethod
+    def _encoding_send(send: Send, codec: Optional[Codec]) -> Send:
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+
+        async def encoding_send(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", []))
+                response_headers = MutableHeaders(raw=message["headers"])
+                content_type = response_headers.get("content-type", "")
+                is_json = content_type.startswith(JSON_MEDIA_TYPE)
+                if is_json or request_codec(content_type) is not None or "content-type" not in response_headers:
+                    response_headers.add_vary_header("Accept")
+                # las respuestas de api/serialization.py ya vienen en el formato negociado
+                if codec is None or not is_json:
+                    await send(message)
+                    return
+                start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            response_headers = MutableHeaders(raw=start["headers"])
+            # un cuerpo gzip solo llega si el cliente lo acepta: se vuelve a comprimir
+            gzipped = response_headers.get("content-encoding") == "gzip"
+            if body:
+                body = codec.dumps(json.loads(gzip.decompress(body) if gzipped else body))
+                if gzipped:
+                    body = gzip.compress(body, compresslevel=5)
+            response_headers["content-type"] = codec.media_type
+            response_headers["content-length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        return encoding_send
@@ -1,47 +1,77 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from api.deps import get_db
+from api.deps import DbSession, get_session, run_db, run_db_lazily
+from api.serialization import fast_json_response # pylint: disable=import-error
 from crud import customer as crud_customer
-from schemas.customer import CustomerCreate, CustomerRead, CustomerUpdate, CustomerListResponse
+from crud.pagination import TotalMode # pylint: disable=import-error
+from crud.customer_autocomplete import customer_index # pylint: disable=import-error
+from schemas.customer import (
+    CustomerAutocompleteResponse,
+    CustomerAutocompleteStats,
+    CustomerCreate,
+    CustomerListResponse,
+    CustomerRead,
+    CustomerUpdate,
+)
 
 router = APIRouter()
 
 @router.get("/", response_model=CustomerListResponse, summary="Listar clientes")
-def list_customers(
+async def list_customers(
     q: Optional[str] = Query(None, description="Término de búsqueda (nombre, email o teléfono)"),
     limit: int = Query(100, ge=1, le=1000, description="Máximo resultados a devolver"),
     offset: int = Query(0, ge=0, description="Offset para paginación"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor de paginación keyset (next_cursor de la página anterior); si se envía, se ignora offset"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="Cálculo del total: exact | estimate (estimación del planner) | none (solo has_more)"),
+    db: DbSession = Depends(get_session)
 ):
-    return crud_customer.get_customers(db=db, q=q, limit=limit, offset=offset)
+    page = await run_db(db, crud_customer.get_customers, q=q, limit=limit, offset=offset, cursor=cursor, total_mode=total_mode)
+    return fast_json_response(page, CustomerListResponse)
+
+
+@router.get("/autocomplete", response_model=CustomerAutocompleteResponse, summary="Autocompletar clientes (índice en memoria)")
+async def autocomplete_customers(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Prefijo de nombre, email o teléfono"),
+    limit: int = Query(10, ge=1, le=50, description="Máximo resultados a devolver"),
+):
+    # el índice responde en el event loop; la sesión se abre solo para el fallback a la base
+    result = crud_customer.autocomplete_from_index(q, limit)
+    if result is None:
+        result = await run_db_lazily(request, crud_customer.autocomplete_customers, q=q, limit=limit)
+    return fast_json_response(result, CustomerAutocompleteResponse)
+
+
+@router.get("/autocomplete/stats", response_model=CustomerAutocompleteStats, summary="Estado y memoria del índice de autocompletado")
+async def autocomplete_stats():
+    return customer_index.stats()
 
 
 @router.get("/{customer_id}", response_model=CustomerRead, summary="Obtener cliente por id")
-def get_customer(customer_id: int, db: Session = Depends(get_db)):
+async def get_customer(customer_id: int, db: DbSession = Depends(get_session)):
     # El CRUD ya lanza HTTPException(404) si no existe
-    return crud_customer.get_customer(db, customer_id)
+    return await run_db(db, crud_customer.get_customer, customer_id)
 
 
 @router.post("/", response_model=CustomerRead, status_code=status.HTTP_201_CREATED, summary="Crear cliente")
-def create_customer(payload: CustomerCreate, db: Session = Depends(get_db)):
+async def create_customer(payload: CustomerCreate, db: DbSession = Depends(get_session)):
     # El CRUD maneja IntegrityError y convierte a HTTPException(409)
-    customer = crud_customer.create_customer(db, payload)
+    customer = await run_db(db, crud_customer.create_customer, payload)
     return customer
 
 
 @router.patch("/{customer_id}", response_model=CustomerRead, summary="Actualizar cliente parcialmente")
-def patch_customer(customer_id: int, payload: CustomerUpdate, db: Session = Depends(get_db)):
-    updated = crud_customer.update_customer(db, customer_id, payload)
+async def patch_customer(customer_id: int, payload: CustomerUpdate, db: DbSession = Depends(get_session)):
+    updated = await run_db(db, crud_customer.update_customer, customer_id, payload)
     if not updated:
         raise HTTPException(status_code=404, detail="Customer not found")
     return updated
 
 
 @router.delete("/{customer_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Eliminar cliente")
-def delete_customer(customer_id: int, db: Session = Depends(get_db)): # pylint: disable=useless-return
-    deleted = crud_customer.delete_customer(db, customer_id)
+async def delete_customer(customer_id: int, db: DbSession = Depends(get_session)): # pylint: disable=useless-return
+    deleted = await run_db(db, crud_customer.delete_customer, customer_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Customer not found")
     return None
\ No newline at end of file
@@ -1,11 +1,15 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from api.deps import get_db # pylint: disable=import-error
+from api.cache import cached_response # pylint: disable=import-error
+from api.deps import DbSession, get_session, run_db, run_db_lazily # pylint: disable=import-error
 from crud import edition as crud_edition # pylint: disable=import-error
+from crud.pagination import TotalMode # pylint: disable=import-error
 from schemas.edition import ( # pylint: disable=import-error
+    EditionClone,
+    EditionCloneResponse,
     EditionCreate, 
+    EditionRecomputeTotalsResponse,
     EditionRead, 
     EditionUpdate, 
     EditionListResponse
@@ -14,38 +18,63 @@ from schemas.edition import ( # pylint: disable=import-error
 router = APIRouter()
 
 @router.get("/", response_model=EditionListResponse, summary="Listar ediciones")
-def list_editions(
+async def list_editions(
+    request: Request,
     q: Optional[str] = Query(None, description="Término de búsqueda (nombre o notas)"),
     limit: int = Query(100, ge=1, le=1000, description="Máximo resultados a devolver"),
     offset: int = Query(0, ge=0, description="Offset para paginación"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor de paginación keyset (next_cursor de la página anterior); si se envía, se ignora offset"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="Cálculo del total: exact | estimate (estimación del planner) | none (solo has_more)"),
 ):
-    return crud_edition.get_editions(db=db, q=q, limit=limit, offset=offset)
+    # la sesión se abre recién en build: un hit del cache no toma conexión
+    return await cached_response(
+        request,
+        tags=("editions",),
+        model=EditionListResponse,
+        build=lambda: run_db_lazily(request, crud_edition.get_editions, q=q, limit=limit, offset=offset, cursor=cursor, total_mode=total_mode),
+    )
 
 
 @router.get("/{edition_id}", response_model=EditionRead, summary="Obtener edición por id")
-def get_edition(edition_id: int, db: Session = Depends(get_db)):
-    # El CRUD ya lanza HTTPException(404) si no existe
-    return crud_edition.get_edition(db, edition_id)
+async def get_edition(edition_id: int, request: Request):
+    # El CRUD ya lanza HTTPException(404) si no existe (los 404 no se cachean)
+    return await cached_response(
+        request,
+        tags=("editions",),
+        model=EditionRead,
+        build=lambda: run_db_lazily(request, crud_edition.get_edition, edition_id),
+    )
 
 
 @router.post("/", response_model=EditionRead, status_code=status.HTTP_201_CREATED, summary="Crear edición")
-def create_edition(payload: EditionCreate, db: Session = Depends(get_db)):
-    edition = crud_edition.create_edition(db, payload)
+async def create_edition(payload: EditionCreate, db: DbSession = Depends(get_session)):
+    edition = await run_db(db, crud_edition.create_edition, payload)
     return edition
 
 
+@router.post("/{edition_id}/clone", response_model=EditionCloneResponse, status_code=status.HTTP_201_CREATED,
+             summary="Crear una edición copiando los ingredientes de otra")
+async def clone_edition(edition_id: int, payload: EditionClone, db: DbSession = Depends(get_session)):
+    return await run_db(db, crud_edition.clone_edition, edition_id, payload)
+
+
+@router.post("/{edition_id}/recompute-totals", response_model=EditionRecomputeTotalsResponse,
+             summary="Recalcular el total de las ventas con el precio actual de la edición")
+async def recompute_edition_sale_totals(edition_id: int, db: DbSession = Depends(get_session)):
+    return await run_db(db, crud_edition.recompute_edition_sale_totals, edition_id)
+
+
 @router.patch("/{edition_id}", response_model=EditionRead, summary="Actualizar edición parcialmente")
-def patch_edition(edition_id: int, payload: EditionUpdate, db: Session = Depends(get_db)):
-    updated = crud_edition.update_edition(db, edition_id, payload)
+async def patch_edition(edition_id: int, payload: EditionUpdate, db: DbSession = Depends(get_session)):
+    updated = await run_db(db, crud_edition.update_edition, edition_id, payload)
     if not updated:
         raise HTTPException(status_code=404, detail="Edition not found")
     return updated
 
 
 @router.delete("/{edition_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Eliminar edición")
-def delete_edition(edition_id: int, db: Session = Depends(get_db)): # pylint: disable=useless-return
-    deleted = crud_edition.delete_edition(db, edition_id)
+async def delete_edition(edition_id: int, db: DbSession = Depends(get_session)): # pylint: disable=useless-return
+    deleted = await run_db(db, crud_edition.delete_edition, edition_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Edition not found")
     return None
@@ -1,10 +1,13 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from api.deps import get_db  # pylint: disable=import-error, unused-import
+from api.conditional import conditional_response  # pylint: disable=import-error
+from api.deps import DbSession, get_session, run_db  # pylint: disable=import-error, unused-import
 from crud import edition_ingredient as crud_ei  # pylint: disable=import-error, unused-import
+from crud.pagination import TotalMode # pylint: disable=import-error
 from schemas.edition_ingredient import (  # pylint: disable=import-error, unused-import
+    EditionIngredientBatchCreate,
+    EditionIngredientBatchResponse,
     EditionIngredientCreate,
     EditionIngredientRead,
     EditionIngredientListResponse,
@@ -17,26 +20,42 @@ router = APIRouter()
 @router.get("/{edition_id}", 
             response_model=EditionIngredientListResponse, 
             summary="Listar ingredientes por edición")
-def list_edition_ingredients(
+async def list_edition_ingredients(
     edition_id: int,
+    request: Request,
     q: Optional[str] = Query(None, description="Término de búsqueda (notes)"),
     categories: Optional[str] = Query(None, description="Filtrar por categorías (MEAT,VEGETABLES)"),
     limit: int = Query(100, ge=1, le=1000, description="Máximo resultados a devolver"),
     offset: int = Query(0, ge=0, description="Offset para paginación"),
-    db: Session = Depends(get_db)):
-    return crud_ei.get_edition_ingredients( db=db, 
-                                            edition_id=edition_id, 
-                                            q=q, 
-                                            categories=categories,
-                                            limit=limit, 
-                                            offset=offset )
+    cursor: Optional[str] = Query(None, description="Cursor de paginación keyset (next_cursor de la página anterior); si se envía, se ignora offset"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="Cálculo del total: exact | estimate (estimación del planner) | none (solo has_more)"),
+    include: Optional[str] = Query(None, description="Modo normalizado: items solo con ids y entidades una sola vez en mapas (ingredient,purchase,edition)"),
+    db: DbSession = Depends(get_session)):
+    # polling de las tablets: If-None-Match con el ETag anterior -> 304 sin consultar la página
+    return await conditional_response(
+        request,
+        probe=lambda: run_db(db, crud_ei.get_edition_ingredients_version, edition_id),
+        build=lambda: run_db(
+            db,
+            crud_ei.get_edition_ingredients,
+            edition_id=edition_id,
+            q=q,
+            categories=categories,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            total_mode=total_mode,
+            include=include,
+        ),
+        model=EditionIngredientListResponse,
+    )
 
 
 @router.get("/{ei_id}", 
             response_model=EditionIngredientRead, 
             summary="Obtener ingredient-edition por id")
-def get_edition_ingredient(ei_id: int, db: Session = Depends(get_db)):
-    return crud_ei.get_edition_ingredient(db, ei_id)
+async def get_edition_ingredient(ei_id: int, db: DbSession = Depends(get_session)):
+    return await run_db(db, crud_ei.get_edition_ingredient, ei_id)
 
 
 @router.post(
@@ -45,10 +64,23 @@ def get_edition_ingredient(ei_id: int, db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED,
     summary="Agregar ingredient a una edición"
 )
-def create_edition_ingredient(edition_id: int, 
-                              payload: EditionIngredientCreate, 
-                              db: Session = Depends(get_db)):
-    return crud_ei.create_edition_ingredient(db, edition_id, payload)
+async def create_edition_ingredient(edition_id: int, 
+                                    payload: EditionIngredientCreate, 
+                                    db: DbSession = Depends(get_session)):
+    return await run_db(db, crud_ei.create_edition_ingredient, edition_id, payload)
+
+
+@router.post(
+    "/{edition_id}/batch",
+    response_model=EditionIngredientBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Agregar varios ingredientes a una edición (una transacción)"
+)
+async def create_edition_ingredients_batch(edition_id: int,
+                                           payload: EditionIngredientBatchCreate,
+                                           db: DbSession = Depends(get_session)):
+    return await run_db(db, crud_ei.create_edition_ingredients_batch, edition_id, payload.items,
+                        strategy=payload.strategy)
 
 
 @router.patch(
@@ -56,10 +88,10 @@ def create_edition_ingredient(edition_id: int,
     response_model=EditionIngredientRead,
     summary="Actualizar ingredient-edition parcialmente"
 )
-def patch_edition_ingredient(ei_id: int, 
-                             payload: EditionIngredientUpdate, 
-                             db: Session = Depends(get_db)):
-    updated = crud_ei.update_edition_ingredient(db, ei_id, payload)
+async def patch_edition_ingredient(ei_id: int, 
+                                   payload: EditionIngredientUpdate, 
+                                   db: DbSession = Depends(get_session)):
+    updated = await run_db(db, crud_ei.update_edition_ingredient, ei_id, payload)
     if not updated:
         raise HTTPException(status_code=404, detail="EditionIngredient not found")
     return updated
@@ -70,8 +102,8 @@ def patch_edition_ingredient(ei_id: int,
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Eliminar ingredient de una edición"
 )
-def delete_edition_ingredient(ei_id: int, db: Session = Depends(get_db)):  # pylint: disable=useless-return
-    deleted = crud_ei.delete_edition_ingredient(db, ei_id)
+async def delete_edition_ingredient(ei_id: int, db: DbSession = Depends(get_session)):  # pylint: disable=useless-return
+    deleted = await run_db(db, crud_ei.delete_edition_ingredient, ei_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="EditionIngredient not found")
     return None
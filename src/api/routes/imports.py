@@ -0,0 +1,91 @@
+import os
+import tempfile
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from starlette.concurrency import run_in_threadpool
+
+from crud.imports import import_jobs # pylint: disable=import-error
+from db.session import engine # pylint: disable=import-error
+from schemas.imports import ImportEntity, ImportFormat, ImportJobListResponse, ImportJobRead # pylint: disable=import-error
+
+router = APIRouter()
+
+# el cuerpo se junta en bloques de este tamaño antes de escribirlo al archivo temporal
+_WRITE_BLOCK_BYTES = 1024 * 1024
+
+_CONTENT_TYPE_FORMATS = {
+    "text/csv": ImportFormat.CSV,
+    "application/csv": ImportFormat.CSV,
+    "application/x-ndjson": ImportFormat.NDJSON,
+    "application/ndjson": ImportFormat.NDJSON,
+    "application/jsonl": ImportFormat.NDJSON,
+}
+
+
+def _discard(tmp) -> None:
+    tmp.close()
+    try:
+        os.remove(tmp.name)
+    except OSError:
+        pass
+
+
+@router.post(
+    "/{entity}",
+    response_model=ImportJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Importar un archivo CSV o NDJSON (en segundo plano)",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string", "description": "CSV con encabezado (campos del schema de alta)"}},
+                "application/x-ndjson": {"schema": {"type": "string", "description": "Un objeto JSON por línea"}},
+            },
+        }
+    },
+)
+async def start_import(
+    entity: ImportEntity,
+    request: Request,
+    format: Optional[ImportFormat] = Query(None, description="csv | ndjson; por defecto según Content-Type"), # pylint: disable=redefined-builtin
+):
+    fmt = format or _CONTENT_TYPE_FORMATS.get(request.headers.get("content-type", "").split(";")[0].strip().lower())
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Enviar text/csv o application/x-ndjson (o indicar ?format=)",
+        )
+
+    # el archivo se copia a disco a medida que llega (la importación lo lee por
+    # lotes); abrir/escribir/cerrar bloquean, así que van al threadpool
+    tmp = await run_in_threadpool(tempfile.NamedTemporaryFile, prefix=f"import-{entity.value}-", delete=False)
+    try:
+        block = bytearray()
+        async for chunk in request.stream():
+            block += chunk
+            if len(block) >= _WRITE_BLOCK_BYTES:
+                await run_in_threadpool(tmp.write, block)
+                block.clear()
+        if block:
+            await run_in_threadpool(tmp.write, block)
+        await run_in_threadpool(tmp.close)
+    except BaseException:
+        # cliente desconectado o disco lleno: no dejar el archivo a medias
+        await run_in_threadpool(_discard, tmp)
+        raise
+    job = import_jobs.start(engine, entity.value, fmt.value, tmp.name)
+    return job.snapshot()
+
+
+@router.get("/", response_model=ImportJobListResponse, summary="Importaciones recientes")
+async def list_imports():
+    return {"items": [job.snapshot() for job in import_jobs.recent()]}
+
+
+@router.get("/{job_id}", response_model=ImportJobRead, summary="Progreso de una importación")
+async def get_import(job_id: str):
+    job = import_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job.snapshot()
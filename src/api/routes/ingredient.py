@@ -1,9 +1,11 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
-from api.deps import get_db # pylint: disable=import-error, unused-import
+from api.cache import cached_response # pylint: disable=import-error
+from api.deps import DbSession, get_session, run_db, run_db_lazily # pylint: disable=import-error, unused-import
 from crud import ingredient as crud_ingredient # pylint: disable=import-error, unused-import
+from core.config import settings # pylint: disable=import-error
+from crud.pagination import TotalMode # pylint: disable=import-error
 from schemas.ingredient import ( # pylint: disable=import-error, unused-import
     IngredientCreate, 
     IngredientRead, 
@@ -14,20 +16,36 @@ from schemas.ingredient import ( # pylint: disable=import-error, unused-import
 router = APIRouter()
 
 
+def _catalog_cache_control() -> dict:
+    # catálogo: cambia poco, los clientes pueden reusarlo sin revalidar un rato
+    return {"Cache-Control": f"public, max-age={settings.catalog_max_age_seconds}"}
+
+
 @router.get("/", response_model=IngredientListResponse, summary="Listar ingredientes")
-def list_ingredients(
+async def list_ingredients(
+    request: Request,
     q: Optional[str] = Query(None, description="Término de búsqueda (nombre, unidad o categoría)"),
     limit: int = Query(100, ge=1, le=1000, description="Máximo resultados a devolver"),
     offset: int = Query(0, ge=0, description="Offset para paginación"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor de paginación keyset (next_cursor de la página anterior); si se envía, se ignora offset"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="Cálculo del total: exact | estimate (estimación del planner) | none (solo has_more)"),
 ):
-    return crud_ingredient.get_ingredients(db=db, q=q, limit=limit, offset=offset)
+    # la sesión se abre recién en build: un hit del cache no toma conexión
+    return await cached_response(
+        request,
+        tags=("ingredients",),
+        model=IngredientListResponse,
+        build=lambda: run_db_lazily(request, crud_ingredient.get_ingredients, q=q, limit=limit, offset=offset, cursor=cursor, total_mode=total_mode),
+        headers=_catalog_cache_control(),
+    )
 
 
 @router.get("/{ingredient_id}", response_model=IngredientRead, summary="Obtener ingrediente por id")
-def get_ingredient(ingredient_id: int, db: Session = Depends(get_db)):
+async def get_ingredient(ingredient_id: int, response: Response, db: DbSession = Depends(get_session)):
     # El CRUD ya lanza HTTPException(404) si no existe
-    return crud_ingredient.get_ingredient(db, ingredient_id)
+    ingredient = await run_db(db, crud_ingredient.get_ingredient, ingredient_id)
+    response.headers.update(_catalog_cache_control())
+    return ingredient
 
 
 @router.post(
@@ -36,8 +54,8 @@ def get_ingredient(ingredient_id: int, db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED, 
     summary="Crear ingrediente"
 )
-def create_ingredient(payload: IngredientCreate, db: Session = Depends(get_db)):
-    ingredient = crud_ingredient.create_ingredient(db, payload)
+async def create_ingredient(payload: IngredientCreate, db: DbSession = Depends(get_session)):
+    ingredient = await run_db(db, crud_ingredient.create_ingredient, payload)
     return ingredient
 
 
@@ -46,8 +64,8 @@ def create_ingredient(payload: IngredientCreate, db: Session = Depends(get_db)):
     response_model=IngredientRead, 
     summary="Actualizar ingrediente parcialmente"
 )
-def patch_ingredient(ingredient_id: int, payload: IngredientUpdate, db: Session = Depends(get_db)):
-    updated = crud_ingredient.update_ingredient(db, ingredient_id, payload)
+async def patch_ingredient(ingredient_id: int, payload: IngredientUpdate, db: DbSession = Depends(get_session)):
+    updated = await run_db(db, crud_ingredient.update_ingredient, ingredient_id, payload)
     if not updated:
         raise HTTPException(status_code=404, detail="Ingredient not found")
     return updated
@@ -58,8 +76,8 @@ def patch_ingredient(ingredient_id: int, payload: IngredientUpdate, db: Session
     status_code=status.HTTP_204_NO_CONTENT, 
     summary="Eliminar ingrediente"
 )
-def delete_ingredient(ingredient_id: int, db: Session = Depends(get_db)): # pylint: disable=useless-return
-    deleted = crud_ingredient.delete_ingredient(db, ingredient_id)
+async def delete_ingredient(ingredient_id: int, db: DbSession = Depends(get_session)): # pylint: disable=useless-return
+    deleted = await run_db(db, crud_ingredient.delete_ingredient, ingredient_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Ingredient not found")
     return None
@@ -0,0 +1,35 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from core import cache # pylint: disable=import-error
+from core.config import settings # pylint: disable=import-error
+from db.pool import pool_status # pylint: disable=import-error
+from db.session import async_engine, async_replicas, engine, replicas # pylint: disable=import-error
+
+def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Si settings.internal_token está definido, exige el mismo valor en X-Internal-Token."""
+    if settings.internal_token and x_internal_token != settings.internal_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/db-pool", summary="Estado y métricas de los pools de conexiones (este proceso)")
+async def db_pool():
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine) if async_engine is not None else None,
+        "replicas": [pool_status(replica) for replica in replicas.engines],
+        "async_replicas": [pool_status(replica.sync_engine) for replica in async_replicas.engines],
+    }
+
+
+@router.get("/cache", summary="Hits/misses del cache de respuestas (este proceso)")
+async def response_cache_stats():
+    return {
+        "enabled": settings.response_cache_enabled,
+        "backend": settings.response_cache_backend,
+        "entries": cache.backend.size(),
+        **cache.stats.snapshot(),
+    }
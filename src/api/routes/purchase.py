@@ -1,9 +1,10 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
 
-from api.deps import get_db  # pylint: disable=import-error, unused-import
+from api.deps import DbSession, get_session, run_db  # pylint: disable=import-error, unused-import
+from api.serialization import fast_json_response  # pylint: disable=import-error
 from crud import purchase as crud_purchase  # pylint: disable=import-error, unused-import
+from crud.pagination import TotalMode # pylint: disable=import-error
 from schemas.purchase import (  # pylint: disable=import-error, unused-import
     PurchaseCreate,
     PurchaseRead,
@@ -15,19 +16,22 @@ router = APIRouter()
 
 
 @router.get("/", response_model=PurchaseListResponse, summary="Listar compras")
-def list_purchases(
+async def list_purchases(
     q: Optional[str] = Query(None, description="Término de búsqueda (supplier o notes)"),
     limit: int = Query(100, ge=1, le=1000, description="Máximo resultados a devolver"),
     offset: int = Query(0, ge=0, description="Offset para paginación"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor de paginación keyset (next_cursor de la página anterior); si se envía, se ignora offset"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="Cálculo del total: exact | estimate (estimación del planner) | none (solo has_more)"),
+    db: DbSession = Depends(get_session),
 ):
-    return crud_purchase.get_purchases(db=db, q=q, limit=limit, offset=offset)
+    page = await run_db(db, crud_purchase.get_purchases, q=q, limit=limit, offset=offset, cursor=cursor, total_mode=total_mode)
+    return fast_json_response(page, PurchaseListResponse)
 
 
 @router.get("/{purchase_id}", response_model=PurchaseRead, summary="Obtener compra por id")
-def get_purchase(purchase_id: int, db: Session = Depends(get_db)):
+async def get_purchase(purchase_id: int, db: DbSession = Depends(get_session)):
     # El CRUD ya lanza HTTPException(404) si no existe
-    return crud_purchase.get_purchase(db, purchase_id)
+    return await run_db(db, crud_purchase.get_purchase, purchase_id)
 
 
 @router.post(
@@ -36,8 +40,8 @@ def get_purchase(purchase_id: int, db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED,
     summary="Crear compra"
 )
-def create_purchase(payload: PurchaseCreate, db: Session = Depends(get_db)):
-    purchase = crud_purchase.create_purchase(db, payload)
+async def create_purchase(payload: PurchaseCreate, db: DbSession = Depends(get_session)):
+    purchase = await run_db(db, crud_purchase.create_purchase, payload)
     return purchase
 
 
@@ -46,8 +50,8 @@ def create_purchase(payload: PurchaseCreate, db: Session = Depends(get_db)):
     response_model=PurchaseRead,
     summary="Actualizar compra parcialmente"
 )
-def patch_purchase(purchase_id: int, payload: PurchaseUpdate, db: Session = Depends(get_db)):
-    updated = crud_purchase.update_purchase(db, purchase_id, payload)
+async def patch_purchase(purchase_id: int, payload: PurchaseUpdate, db: DbSession = Depends(get_session)):
+    updated = await run_db(db, crud_purchase.update_purchase, purchase_id, payload)
     if not updated:
         raise HTTPException(status_code=404, detail="Purchase not found")
     return updated
@@ -58,8 +62,8 @@ def patch_purchase(purchase_id: int, payload: PurchaseUpdate, db: Session = Depe
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Eliminar compra"
 )
-def delete_purchase(purchase_id: int, db: Session = Depends(get_db)):  # pylint: disable=useless-return
-    deleted = crud_purchase.delete_purchase(db, purchase_id)
+async def delete_purchase(purchase_id: int, db: DbSession = Depends(get_session)):  # pylint: disable=useless-return
+    deleted = await run_db(db, crud_purchase.delete_purchase, purchase_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Purchase not found")
     return None
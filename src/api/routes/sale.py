@@ -1,25 +1,93 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+import json
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import ValidationError
 
-from api.deps import get_db # pylint: disable=import-error
+from api.conditional import conditional_response # pylint: disable=import-error
+from api.deps import DbSession, get_session, run_db # pylint: disable=import-error
+from api.serialization import fast_json_response # pylint: disable=import-error
 from crud import sale as crud_sale # pylint: disable=import-error
-from schemas.sale import SaleCreate, SaleRead, SaleUpdate, SaleListResponse # pylint: disable=import-error
+from core.config import settings # pylint: disable=import-error
+from crud.pagination import TotalMode # pylint: disable=import-error
+from schemas.sale import ( # pylint: disable=import-error
+    SaleBulkResponse,
+    SaleBulkUpdate,
+    SaleBulkUpdateResponse,
+    SaleCreate,
+    SaleListResponse,
+    SaleRead,
+    SaleUpdate,
+)
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class _BadLine:
+    # línea NDJSON que no es JSON válido; se informa como fila inválida
+    def __init__(self, detail: str) -> None:
+        self.detail = detail
+
+
+def _too_many_rows() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Máximo {settings.sale_bulk_max_rows} ventas por pedido",
+    )
+
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return _BadLine(f"JSON inválido: {exc}")
+
+
+async def _read_bulk_rows(request: Request) -> List[Any]:
+    """Filas del pedido: array JSON o NDJSON (una venta por línea, leído en streaming)."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_MEDIA_TYPES:
+        rows: List[Any] = []
+        pending = b""
+        async for chunk in request.stream():
+            *lines, pending = (pending + chunk).split(b"\n")
+            rows.extend(_parse_ndjson_line(line) for line in lines if line.strip())
+            if len(rows) > settings.sale_bulk_max_rows:
+                raise _too_many_rows()
+        if pending.strip():
+            rows.append(_parse_ndjson_line(pending))
+        return rows
+
+    try:
+        rows = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cuerpo JSON inválido")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Se espera un array JSON de ventas")
+    return rows
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'body'}: {err['msg']}" for err in exc.errors())
+
 
 @router.get("/", response_model=SaleListResponse, summary="Listar ventas")
-def list_sales(
+async def list_sales(
     limit: int = Query(100, ge=1, le=1000, description="Máximo resultados a devolver"),
     offset: int = Query(0, ge=0, description="Offset para paginación"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor de paginación keyset (next_cursor de la página anterior); si se envía, se ignora offset"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="Cálculo del total: exact | estimate (estimación del planner) | none (solo has_more)"),
+    include: Optional[str] = Query(None, description="Modo normalizado: items solo con ids y entidades una sola vez en mapas (customer,edition)"),
+    db: DbSession = Depends(get_session),
 ):
-    return crud_sale.get_sales(db=db, limit=limit, offset=offset)
+    page = await run_db(db, crud_sale.get_sales, limit=limit, offset=offset, cursor=cursor, total_mode=total_mode, include=include)
+    return fast_json_response(page, SaleListResponse)
 
 @router.get("/edition/{edition_id}", response_model=SaleListResponse, summary="Listar ventas por edición")
-def list_sales_edition(
+async def list_sales_edition(
     edition_id: int,
+    request: Request,
     customer_q: Optional[str] = Query(None, description="Buscar por nombre del cliente (ILIKE)"),
     payment_status: Optional[str] = Query(None, description="Estado de pago: PENDING|PAID"),
     payment_transfer: Optional[bool] = Query(None, description="Filtro por pago por transferencia"),
@@ -29,44 +97,114 @@ def list_sales_edition(
     saved: Optional[bool] = Query(None, description="Filtro por guardado"),
     limit: int = Query(100, ge=1, le=1000, description="Máximo resultados a devolver"),
     offset: int = Query(0, ge=0, description="Offset para paginación"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor de paginación keyset (next_cursor de la página anterior); si se envía, se ignora offset"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, description="Cálculo del total: exact | estimate (estimación del planner) | none (solo has_more)"),
+    include: Optional[str] = Query(None, description="Modo normalizado: items solo con ids y entidades una sola vez en mapas (customer,edition)"),
+    db: DbSession = Depends(get_session),
 ):
-    return crud_sale.get_sales_edition(
-        db=db,
-        edition_id=edition_id,
-        customer_q=customer_q,
-        payment_status=payment_status,
-        payment_transfer=payment_transfer,
-        delivered=delivered,
-        delivery=delivery,
-        freeze=freeze,
-        saved=saved,
-        limit=limit,
-        offset=offset,
+    # polling de las tablets: If-None-Match con el ETag anterior -> 304 sin consultar la página
+    return await conditional_response(
+        request,
+        probe=lambda: run_db(db, crud_sale.get_sales_edition_version, edition_id),
+        build=lambda: run_db(
+            db,
+            crud_sale.get_sales_edition,
+            edition_id=edition_id,
+            customer_q=customer_q,
+            payment_status=payment_status,
+            payment_transfer=payment_transfer,
+            delivered=delivered,
+            delivery=delivery,
+            freeze=freeze,
+            saved=saved,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            total_mode=total_mode,
+            include=include,
+        ),
+        model=SaleListResponse,
     )
 @router.get("/{sale_id}", response_model=SaleRead, summary="Obtener venta por id")
-def get_sale(sale_id: int, db: Session = Depends(get_db)):
+async def get_sale(sale_id: int, db: DbSession = Depends(get_session)):
     # El CRUD ya lanza HTTPException(404) si no existe
-    return crud_sale.get_sale(db, sale_id)
+    return await run_db(db, crud_sale.get_sale, sale_id)
 
 
 @router.post("/", response_model=SaleRead, status_code=status.HTTP_201_CREATED, summary="Crear venta")
-def create_sale(payload: SaleCreate, db: Session = Depends(get_db)):
-    sale = crud_sale.create_sale(db, payload)
+async def create_sale(payload: SaleCreate, db: DbSession = Depends(get_session)):
+    sale = await run_db(db, crud_sale.create_sale, payload)
     return sale
 
 
+@router.post(
+    "/bulk",
+    response_model=SaleBulkResponse,
+    summary="Crear ventas en lote (array JSON o NDJSON)",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/SaleCreate"}}},
+                "application/x-ndjson": {"schema": {"type": "string", "description": "Una SaleCreate JSON por línea"}},
+            },
+        }
+    },
+)
+async def create_sales_bulk(request: Request, db: DbSession = Depends(get_session)):
+    # cada fila se valida por separado: una fila mala no invalida el lote
+    rows = await _read_bulk_rows(request)
+    if len(rows) > settings.sale_bulk_max_rows:
+        raise _too_many_rows()
+
+    results: List[dict] = []
+    sales = []
+    for index, raw in enumerate(rows):
+        if isinstance(raw, _BadLine):
+            results.append({"index": index, "status": "invalid", "detail": raw.detail})
+            continue
+        try:
+            sales.append((index, SaleCreate.model_validate(raw)))
+        except ValidationError as exc:
+            results.append({"index": index, "status": "invalid", "detail": _validation_detail(exc)})
+
+    results.extend(await run_db(db, crud_sale.create_sales_bulk, sales))
+    results.sort(key=lambda r: r["index"])
+    statuses = [r["status"] for r in results]
+    response = {
+        "created": statuses.count("created"),
+        "duplicates": statuses.count("duplicate"),
+        "invalid": statuses.count("invalid"),
+        "errors": statuses.count("error"),
+        "results": results,
+    }
+    return fast_json_response(response, SaleBulkResponse)
+
+
+# antes de PATCH /{sale_id}: "bulk" no es un id
+@router.patch("/bulk", response_model=SaleBulkUpdateResponse, summary="Actualizar muchas ventas (por ids o por filtro)")
+async def patch_sales_bulk(payload: SaleBulkUpdate, db: DbSession = Depends(get_session)):
+    updated = await run_db(
+        db,
+        crud_sale.update_sales_bulk,
+        payload.changes.model_dump(exclude_unset=True),
+        ids=payload.ids,
+        filters=payload.filter.model_dump(exclude_none=True) if payload.filter is not None else None,
+    )
+    return fast_json_response(updated, SaleBulkUpdateResponse)
+
+
 @router.patch("/{sale_id}", response_model=SaleRead, summary="Actualizar venta parcialmente")
-def patch_sale(sale_id: int, payload: SaleUpdate, db: Session = Depends(get_db)):
-    updated = crud_sale.update_sale(db, sale_id, payload)
+async def patch_sale(sale_id: int, payload: SaleUpdate, db: DbSession = Depends(get_session)):
+    updated = await run_db(db, crud_sale.update_sale, sale_id, payload)
     if not updated:
         raise HTTPException(status_code=404, detail="Sale not found")
     return updated
 
 
 @router.delete("/{sale_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Eliminar venta")
-def delete_sale(sale_id: int, db: Session = Depends(get_db)): # pylint: disable=useless-return
-    deleted = crud_sale.delete_sale(db, sale_id)
+async def delete_sale(sale_id: int, db: DbSession = Depends(get_session)): # pylint: disable=useless-return
+    deleted = await run_db(db, crud_sale.delete_sale, sale_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Sale not found")
     return None
@@ -0,0 +1,57 @@
+"""
+Serialización directa de respuestas JSON (settings.fast_json_enabled).
+
+Los listados ya devuelven modelos Pydantic validados por el CRUD
+(`SaleRead.model_validate(...)`, ...). Por el camino normal FastAPI vuelve a
+validar el resultado contra `response_model`, lo pasa por `jsonable_encoder` y
+lo codifica con `json` de la stdlib: tres pasadas sobre cada fila.
+
+`fast_json_response` serializa una sola vez con `model_dump_json`
+(pydantic-core) y devuelve los bytes tal cual. El envoltorio del listado (dict
+con items + metadatos de paginación) se arma con `model_validate`; los items
+que ya son instancias del modelo no se revalidan, así que solo se validan los
+metadatos. El `response_model` de la ruta se mantiene para el esquema OpenAPI.
+
+Si el cliente negoció MessagePack/CBOR (api/formats.py) el cuerpo se arma con
+`model_dump(mode="json")` y el `dumps` del codec, sin pasar por texto JSON.
+"""
+from typing import Any, Optional, Tuple, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from api.formats import JSON_MEDIA_TYPE, response_codec  # pylint: disable=import-error
+from core.config import settings  # pylint: disable=import-error
+
+
+def dump_json(data: Any, model: Type[BaseModel]) -> str:
+    """JSON de `data` según `model`; si ya es una instancia de `model` no se revalida."""
+    if not isinstance(data, model):
+        data = model.model_validate(data)
+    return data.model_dump_json()
+
+
+def render(data: Any, model: Type[BaseModel]) -> Tuple[bytes, str]:
+    """Cuerpo y media type de `data` en el formato negociado para el request en curso."""
+    codec = response_codec()
+    if codec is None:
+        return dump_json(data, model).encode("utf-8"), JSON_MEDIA_TYPE
+    if not isinstance(data, model):
+        data = model.model_validate(data)
+    return codec.dumps(data.model_dump(mode="json")), codec.media_type
+
+
+def json_response(data: Any, model: Type[BaseModel], headers: Optional[dict] = None) -> Response:
+    """Respuesta serializada con `model`; JSON salvo que el cliente haya pedido un formato binario."""
+    body, media_type = render(data, model)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def fast_json_response(data: Any, model: Type[BaseModel]) -> Any:
+    """
+    Respuesta ya serializada para rutas de listado. Con fast_json_enabled=False
+    devuelve `data` sin tocar y FastAPI aplica el response_model como siempre.
+    """
+    if not settings.fast_json_enabled:
+        return data
+    return json_response(data, model)
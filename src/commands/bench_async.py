@@ -0,0 +1,137 @@
+"""
+Throughput de la API con la sesión sync (threadpool) contra AsyncSession
+(settings.db_async), en proceso y contra la misma base (correr desde src/):
+
+    python -m commands.bench_async [--edition-id 1] [--concurrency 200] [--requests 2000] [--path /sales/?limit=100 ...]
+
+Cada modo recibe la misma ráfaga: `--concurrency` clientes concurrentes
+repartiendo `--requests` GETs entre los endpoints. El modo sync corre cada
+CRUD en el threadpool (settings.threadpool_size hilos, el techo bajo ráfagas);
+el async los corre con `run_sync` sobre el event loop. Se informa requests/s,
+latencia p50/p95 y errores. El cache de respuestas se desactiva y las lecturas
+van siempre al primario (sin réplicas) para medir solo la sesión.
+
+La URL async sale de --async-database-url, o de settings.async_database_url /
+database_url con el driver asyncpg.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Tuple
+
+import httpx
+from anyio import to_thread
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.deps import get_session  # pylint: disable=import-error
+from core.config import settings  # pylint: disable=import-error
+from db.pool import engine_pool_kwargs  # pylint: disable=import-error
+from db.session import _async_database_url  # pylint: disable=import-error
+from main import app  # pylint: disable=import-error
+
+DEFAULT_PATHS = (
+    "/sales/?limit=100",
+    "/sales/edition/{edition_id}?limit=100",
+    "/edition_ingredients/{edition_id}?limit=100",
+    "/editions/?limit=50",
+    "/customers/?limit=100",
+)
+
+
+def _sync_dependency(database_url: str):
+    engine = create_engine(database_url, **engine_pool_kwargs())
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    def _session():
+        with session_factory() as db:
+            yield db
+
+    return _session, engine.dispose
+
+
+def _async_dependency(async_database_url: str):
+    engine = create_async_engine(async_database_url, **engine_pool_kwargs(is_async=True))
+    session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def _session():
+        async with session_factory() as db:
+            yield db
+
+    return _session, engine.dispose
+
+
+async def _burst(paths: List[str], concurrency: int, total: int) -> Tuple[float, List[float], int]:
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(range(total))
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for i in pending:
+            started = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return elapsed, latencies, errors
+
+
+async def _run(args, paths: List[str]) -> int:
+    # lo mismo que hace el lifespan de la app (ASGITransport no lo ejecuta)
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+    status = 0
+    print(f"{args.requests} requests, {args.concurrency} clientes concurrentes, "
+          f"threadpool de {settings.threadpool_size} hilos")
+    for mode in args.modes:
+        if mode == "sync":
+            dependency, dispose = _sync_dependency(args.database_url)
+        else:
+            dependency, dispose = _async_dependency(args.async_database_url)
+        app.dependency_overrides[get_session] = dependency
+        try:
+            # calentar pools y caches de compilación de SQLAlchemy
+            await _burst(paths, min(args.concurrency, len(paths)), len(paths))
+            elapsed, latencies, errors = await _burst(paths, args.concurrency, args.requests)
+        finally:
+            app.dependency_overrides.pop(get_session, None)
+            result = dispose()
+            if asyncio.iscoroutine(result):
+                await result
+        p50 = statistics.median(latencies)
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else p50
+        print(f"  {mode:6} {args.requests / elapsed:9.1f} req/s  p50 {p50:8.1f} ms  p95 {p95:8.1f} ms  errores {errors}")
+        status = status or (1 if errors else 0)
+    return status
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="commands.bench_async", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edition-id", type=int, default=1, help="Edición para los endpoints por edición")
+    parser.add_argument("--concurrency", type=int, default=200, help="Clientes concurrentes")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests por modo")
+    parser.add_argument("--path", action="append", default=None, help="Endpoint a medir (se puede repetir)")
+    parser.add_argument("--mode", dest="modes", action="append", choices=("sync", "async"), default=None,
+                        help="Modo a medir (se puede repetir; por defecto ambos)")
+    parser.add_argument("--database-url", default=settings.database_url, help="URL del engine sync")
+    parser.add_argument("--async-database-url", default=None, help="URL del engine async")
+    args = parser.parse_args(argv)
+    args.modes = args.modes or ["sync", "async"]
+    args.async_database_url = args.async_database_url or _async_database_url()
+
+    settings.response_cache_enabled = False
+    paths = [p.format(edition_id=args.edition_id) for p in (args.path or DEFAULT_PATHS)]
+    return asyncio.run(_run(args, paths))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+"""
+Throughput de altas de ingredientes con escritores concurrentes sobre la misma
+fila (edition_id, ingredient_id), contra la base configurada (correr desde src/):
+
+    python -m commands.bench_edition_ingredients --edition-id 1 --ingredient-id 1 [--writers 8] [--per-writer 50]
+
+Compara la estrategia `sum` (INSERT ... ON CONFLICT DO UPDATE acumulativo)
+con `replace`, que sigue tomando SELECT ... FOR UPDATE antes de escribir, y
+verifica que la cantidad acumulada por `sum` sea exacta. Crea compras reales:
+al terminar borra las compras generadas y deja la fila como estaba.
+
+Los escritores usan un pool de exactamente una conexión por escritor
+(max_overflow=0): si un alta necesitara una segunda conexión, los escritores
+se quedarían esperando el pool y la corrida falla por pool_timeout. Se
+informa el pico de conexiones en uso.
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy import create_engine, delete, event, func, select
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings  # pylint: disable=import-error
+from crud.edition_ingredient import create_edition_ingredient  # pylint: disable=import-error
+from db.session import SessionLocal  # pylint: disable=import-error
+from models.edition_ingredient import EditionIngredient  # pylint: disable=import-error
+from models.purchase import Purchase  # pylint: disable=import-error
+from schemas.edition_ingredient import EditionIngredientCreate  # pylint: disable=import-error
+
+SNAPSHOT_FIELDS = ("quantity", "unit_price", "subtotal", "notes", "purchase_id", "updated_at")
+
+
+def _current_row(db, edition_id: int, ingredient_id: int) -> Optional[EditionIngredient]:
+    return db.execute(
+        select(EditionIngredient).where(
+            EditionIngredient.edition_id == edition_id,
+            EditionIngredient.ingredient_id == ingredient_id,
+        )
+    ).scalar_one_or_none()
+
+
+class PoolUsage:
+    """Pico de conexiones tomadas del pool (eventos checkout/checkin)."""
+
+    def __init__(self, engine) -> None:
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.peak = 0
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+
+    def _checkout(self, *_) -> None:
+        with self._lock:
+            self.in_use += 1
+            self.peak = max(self.peak, self.in_use)
+
+    def _checkin(self, *_) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+
+def _pool_exhausted(exc: BaseException) -> bool:
+    # el CRUD traduce los errores de SQLAlchemy a HTTPException 500: buscar en la cadena
+    while exc is not None:
+        if isinstance(exc, PoolTimeout):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def _run(strategy: str, args, session_factory) -> float:
+    payload = EditionIngredientCreate(ingredient_id=args.ingredient_id, quantity=args.quantity)
+
+    def writer(_: int) -> None:
+        db = session_factory()
+        try:
+            for _ in range(args.per_writer):
+                create_edition_ingredient(db, args.edition_id, payload, strategy=strategy)
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.writers) as pool:
+        list(pool.map(writer, range(args.writers)))
+    return time.perf_counter() - started
+
+
+def _restore(db, args, snapshot: Optional[dict], last_purchase_id: int) -> None:
+    db.execute(delete(Purchase).where(
+        Purchase.id > last_purchase_id,
+        Purchase.edition_id == args.edition_id,
+        Purchase.ingredient_id == args.ingredient_id,
+    ))
+    row = _current_row(db, args.edition_id, args.ingredient_id)
+    if snapshot is None and row is not None:
+        db.delete(row)
+    elif row is not None:
+        for field, value in snapshot.items():
+            setattr(row, field, value)
+    db.commit()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="commands.bench_edition_ingredients", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edition-id", type=int, required=True, help="Edición sobre la que se escribe")
+    parser.add_argument("--ingredient-id", type=int, required=True, help="Ingrediente que se acumula")
+    parser.add_argument("--writers", type=int, default=8, help="Escritores concurrentes (threads)")
+    parser.add_argument("--per-writer", type=int, default=50, help="Altas por escritor")
+    parser.add_argument("--quantity", type=float, default=1.0, help="Cantidad de cada alta")
+    parser.add_argument("--pool-timeout", type=float, default=10.0, help="Espera máxima por una conexión (s)")
+    args = parser.parse_args(argv)
+
+    total = args.writers * args.per_writer
+    engine = create_engine(settings.database_url, pool_size=args.writers, max_overflow=0,
+                           pool_timeout=args.pool_timeout)
+    usage = PoolUsage(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    status = 0
+    db = SessionLocal()
+    try:
+        row = _current_row(db, args.edition_id, args.ingredient_id)
+        snapshot = {f: getattr(row, f) for f in SNAPSHOT_FIELDS} if row is not None else None
+        last_purchase_id = db.execute(select(func.coalesce(func.max(Purchase.id), 0))).scalar_one()
+        db.rollback()
+
+        print(f"{total} altas ({args.writers} escritores x {args.per_writer}, pool de {args.writers} conexiones) "
+              f"sobre edition={args.edition_id} ingredient={args.ingredient_id}")
+        try:
+            for strategy in ("sum", "replace"):
+                try:
+                    elapsed = _run(strategy, args, session_factory)
+                except Exception as exc:  # pylint: disable=broad-except
+                    if not _pool_exhausted(exc):
+                        raise
+                    print(f"  {strategy:8} pool agotado: un alta necesitó más de una conexión")
+                    status = 1
+                    continue
+                line = f"  {strategy:8} {elapsed:8.2f} s  {total / elapsed:9.1f} altas/s"
+                if strategy == "sum":
+                    db.expire_all()
+                    expected = (snapshot["quantity"] if snapshot else 0.0) + total * args.quantity
+                    got = _current_row(db, args.edition_id, args.ingredient_id).quantity
+                    db.rollback()
+                    line += f"  cantidad {got:g} (esperada {expected:g})"
+                print(line)
+            print(f"  pico de conexiones en uso: {usage.peak} de {args.writers}")
+        finally:
+            _restore(db, args, snapshot, last_purchase_id)
+    finally:
+        db.close()
+        engine.dispose()
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
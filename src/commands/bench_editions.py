@@ -0,0 +1,142 @@
+"""
+Latencia del listado de ediciones según el tamaño del historial (correr desde src/):
+
+    python -m commands.bench_editions --database-url postgresql://.../bench_scratch [--editions 200] [--repeat 20]
+
+Carga N ediciones (con ventas e ingredientes cada una), mide la primera
+página y una página profunda de `get_editions`, agrega 9 x N ediciones
+históricas (más viejas, así no entran en la primera página) y vuelve a medir
+con 10 x N. Con los agregados calculados solo para las ediciones de la página,
+la latencia de la primera página debería quedar plana.
+
+Se mide el camino en vivo (edition_summary_enabled=False) y, en Postgres, el de
+edition_summary (se reconstruye antes de medir). La base debe ser de descarte:
+se crean las tablas de los modelos, se rechaza si ya tienen ediciones y se
+borran al terminar (--keep las deja).
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings  # pylint: disable=import-error
+from crud.edition import get_editions  # pylint: disable=import-error
+from crud.edition_summary import rebuild_edition_summaries  # pylint: disable=import-error
+from db.base import Base  # pylint: disable=import-error
+from models.customer import Customer  # pylint: disable=import-error
+from models.edition import Edition  # pylint: disable=import-error
+from models.edition_ingredient import EditionIngredient  # pylint: disable=import-error
+from models.ingredient import Category, Ingredient  # pylint: disable=import-error
+from models.sale import Sale  # pylint: disable=import-error
+
+CUSTOMERS = 100
+
+
+def _seed_catalog(conn, ingredients: int) -> None:
+    now = datetime.now(timezone.utc)
+    conn.execute(insert(Customer), [
+        {"id": i, "name": f"Cliente {i}", "phone": f"bench-{i}", "created_at": now}
+        for i in range(1, CUSTOMERS + 1)
+    ])
+    conn.execute(insert(Ingredient), [
+        {"id": i, "name": f"Ingrediente {i}", "unit_price": float(i), "category": Category.OTHER, "created_at": now}
+        for i in range(1, ingredients + 1)
+    ])
+
+
+def _seed_editions(conn, first_id: int, count: int, args) -> None:
+    """Ediciones `first_id`.. con fechas hacia atrás desde hoy (ids más altos = más viejas)."""
+    today = datetime.now(timezone.utc).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+    for start in range(first_id, first_id + count, 500):
+        ids = range(start, min(start + 500, first_id + count))
+        conn.execute(insert(Edition), [
+            {"id": e, "name": f"Edición {e}", "date": today - timedelta(days=e), "status": "FINISHED",
+             "portion_price": 10.0, "created_at": today}
+            for e in ids
+        ])
+        conn.execute(insert(Sale), [
+            {"id": e * args.sales + s, "edition_id": e, "customer_id": s % CUSTOMERS + 1,
+             "total_portions": s % 4 + 1, "total_amount": (s % 4 + 1) * 10.0, "payment_status": "PAID",
+             "created_at": today}
+            for e in ids for s in range(args.sales)
+        ])
+        conn.execute(insert(EditionIngredient), [
+            {"id": e * args.ingredients + k, "edition_id": e, "ingredient_id": k + 1,
+             "quantity": 2.0, "unit_price": float(k + 1), "subtotal": 2.0 * (k + 1)}
+            for e in ids for k in range(args.ingredients)
+        ])
+
+
+def _page_ms(session_factory, args, offset: int) -> float:
+    samples = []
+    for _ in range(args.repeat):
+        with session_factory() as db:
+            started = time.perf_counter()
+            get_editions(db, limit=args.limit, offset=offset)
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _measure(session_factory, args, modes, label: str, results: dict) -> None:
+    for mode in modes:
+        settings.edition_summary_enabled = mode == "summary"
+        if mode == "summary":
+            with session_factory() as db:
+                rebuild_edition_summaries(db)
+        first = _page_ms(session_factory, args, 0)
+        deep = _page_ms(session_factory, args, max(args.editions - args.limit, 0))
+        results[(mode, label)] = first
+        print(f"  {mode:8} {label:>8} ediciones  primera página {first:8.2f} ms  offset {args.editions - args.limit:>6} {deep:8.2f} ms")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="commands.bench_editions", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Base de descarte donde se cargan los datos")
+    parser.add_argument("--editions", type=int, default=200, help="N: ediciones de la primera medición")
+    parser.add_argument("--sales", type=int, default=50, help="Ventas por edición")
+    parser.add_argument("--ingredients", type=int, default=20, help="Ingredientes por edición")
+    parser.add_argument("--limit", type=int, default=50, help="Tamaño de página")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests por medición (se informa la mediana)")
+    parser.add_argument("--keep", action="store_true", help="No borrar las tablas al terminar")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Edition)).scalar_one():  # pylint: disable=not-callable
+            print("La base ya tiene ediciones: usar una base de descarte")
+            return 2
+
+    settings.count_cache_ttl_seconds = 0.0
+    modes = ("live", "summary") if engine.dialect.name == "postgresql" else ("live",)
+    summary_enabled = settings.edition_summary_enabled
+    results = {}
+    try:
+        with engine.begin() as conn:
+            _seed_catalog(conn, args.ingredients)
+            _seed_editions(conn, 1, args.editions, args)
+        print(f"{args.sales} ventas y {args.ingredients} ingredientes por edición, páginas de {args.limit}")
+        _measure(session_factory, args, modes, str(args.editions), results)
+
+        with engine.begin() as conn:
+            _seed_editions(conn, args.editions + 1, 9 * args.editions, args)
+        _measure(session_factory, args, modes, str(10 * args.editions), results)
+
+        for mode in modes:
+            ratio = results[(mode, str(10 * args.editions))] / results[(mode, str(args.editions))]
+            print(f"  {mode:8} primera página con 10x historial: x{ratio:.2f}")
+    finally:
+        settings.edition_summary_enabled = summary_enabled
+        if not args.keep:
+            Base.metadata.drop_all(engine)
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
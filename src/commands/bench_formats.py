@@ -0,0 +1,77 @@
+"""
+Compara JSON / MessagePack / CBOR por endpoint contra la base configurada
+(correr desde src/):
+
+    python -m commands.bench_formats [--edition-id 1] [--repeat 20] [--path /sales/?limit=1000 ...]
+
+Para cada endpoint y formato informa el tamaño del cuerpo (y comprimido con
+gzip, como viajaría por datos móviles), la latencia media del request en
+proceso (incluye la re-codificación del middleware) y el tiempo de
+decodificación del lado del cliente. El cache de respuestas se desactiva para
+medir siempre el camino completo.
+"""
+import argparse
+import gzip
+import json
+import time
+from typing import Callable, List, Tuple
+
+from fastapi.testclient import TestClient
+
+from api.formats import CBOR, MSGPACK  # pylint: disable=import-error
+from core.config import settings  # pylint: disable=import-error
+from main import app  # pylint: disable=import-error
+
+DEFAULT_PATHS = (
+    "/sales/?limit=1000",
+    "/sales/edition/{edition_id}?limit=1000",
+    "/edition_ingredients/{edition_id}?limit=1000",
+    "/customers/?limit=1000",
+    "/editions/{edition_id}",
+)
+
+
+def _formats() -> List[Tuple[str, str, Callable[[bytes], object]]]:
+    formats = [("json", "application/json", json.loads)]
+    for codec in (MSGPACK, CBOR):
+        if codec.available:
+            formats.append((codec.media_type.split("/")[1], codec.media_type, codec.loads))
+    return formats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="commands.bench_formats", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edition-id", type=int, default=1, help="Edición para los endpoints por edición")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests por endpoint y formato")
+    parser.add_argument("--path", action="append", default=None, help="Endpoint a medir (se puede repetir)")
+    args = parser.parse_args(argv)
+
+    settings.response_cache_enabled = False
+    paths = [p.format(edition_id=args.edition_id) for p in (args.path or DEFAULT_PATHS)]
+    formats = _formats()
+
+    print(f"{'endpoint':45} {'formato':8} {'bytes':>9} {'gzip':>8} {'request ms':>11} {'decode ms':>10}")
+    with TestClient(app) as client:
+        for path in paths:
+            for name, media_type, decode in formats:
+                headers = {"Accept": media_type}
+                response = client.get(path, headers=headers)
+                if response.status_code != 200:
+                    print(f"{path:45} {name:8} HTTP {response.status_code}")
+                    break
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    client.get(path, headers=headers)
+                request_ms = (time.perf_counter() - started) / args.repeat * 1000
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    decode(response.content)
+                decode_ms = (time.perf_counter() - started) / args.repeat * 1000
+                print(f"{path:45} {name:8} {len(response.content):9d} {len(gzip.compress(response.content)):8d} "
+                      f"{request_ms:11.2f} {decode_ms:10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+"""
+Mide el CPU por página de serializar un listado de ventas (correr desde src/):
+
+    python -m commands.bench_serialization [--rows 1000] [--repeat 50]
+
+Compara el camino normal de FastAPI (validar contra response_model +
+jsonable_encoder + json de la stdlib, como en `fastapi.routing.serialize_response`)
+con `api.serialization.dump_json` (una sola pasada con model_dump_json).
+No toca la base: arma una página de SaleRead en memoria.
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from api.serialization import dump_json  # pylint: disable=import-error
+from schemas.customer import CustomerRead  # pylint: disable=import-error
+from schemas.edition import EditionRead  # pylint: disable=import-error
+from schemas.sale import SaleListResponse, SaleRead  # pylint: disable=import-error
+
+
+def build_page(rows: int) -> dict:
+    edition = EditionRead(id=1, date=date(2025, 8, 1), name="Locro Agosto 2025", portion_price=9500.0,
+                          created_at=datetime(2025, 7, 1), sales_count=rows, edition_costs=120000, net_profits=500000)
+    items = [
+        SaleRead(
+            id=i, total_portions=2 + i % 5, total_amount=19000.0 + i, edition_id=1, customer_id=i,
+            payment_transfer=bool(i % 2), delivered=bool(i % 3), seller_name="Vendedor",
+            created_at=datetime(2025, 7, 15, 12, 0, i % 60),
+            customer=CustomerRead(id=i, name=f"Cliente {i}", email=f"cliente{i}@example.com",
+                                  phone=f"11{i:08d}", address="Calle Falsa 123"),
+            edition=edition,
+        )
+        for i in range(1, rows + 1)
+    ]
+    return {"items": items, "total": rows, "limit": rows, "offset": 0, "has_more": False}
+
+
+def _time_per_page(fn, repeat: int) -> float:
+    fn()  # calentamiento
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - started) / repeat
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="commands.bench_serialization", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Filas por página")
+    parser.add_argument("--repeat", type=int, default=50, help="Páginas serializadas por medición")
+    args = parser.parse_args(argv)
+
+    page = build_page(args.rows)
+    field = create_model_field(name="Response_list_sales", type_=SaleListResponse, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def fastapi_path() -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=page))
+        return JSONResponse(content).body
+
+    def fast_path() -> bytes:
+        return dump_json(page, SaleListResponse).encode("utf-8")
+
+    try:
+        before = _time_per_page(fastapi_path, args.repeat)
+        after = _time_per_page(fast_path, args.repeat)
+    finally:
+        loop.close()
+
+    print(f"SaleListResponse, {args.rows} filas ({args.repeat} páginas por medición)")
+    print(f"  response_model + jsonable_encoder + json: {before * 1000:8.2f} ms CPU/página")
+    print(f"  model_dump_json directo:                  {after * 1000:8.2f} ms CPU/página")
+    print(f"  mejora: x{before / after:.1f}" if after else "")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
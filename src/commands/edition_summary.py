@@ -0,0 +1,48 @@
+"""
+Mantenimiento de edition_summary desde la línea de comandos (correr desde src/):
+
+    python -m commands.edition_summary rebuild [--edition-id ID]
+    python -m commands.edition_summary check
+
+`check` sale con código 1 si encuentra diferencias contra los agregados en vivo.
+"""
+import argparse
+import logging
+import sys
+
+from db.session import SessionLocal  # pylint: disable=import-error
+from crud.edition_summary import check_edition_summaries, rebuild_edition_summaries  # pylint: disable=import-error
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="commands.edition_summary", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="Recalcular edition_summary desde sale/edition_ingredient")
+    rebuild.add_argument("--edition-id", type=int, default=None, help="Reconstruir solo esta edición")
+    check = sub.add_parser("check", help="Comparar edition_summary contra los agregados en vivo")
+    check.add_argument("--tolerance", type=float, default=0.01, help="Diferencia admitida en edition_costs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            written = rebuild_edition_summaries(db, edition_id=args.edition_id)
+            print(f"edition_summary: {written} ediciones reconstruidas")
+            return 0
+
+        mismatches = check_edition_summaries(db, tolerance=args.tolerance)
+        for m in mismatches:
+            print(
+                f"edition {m['edition_id']}: sales_count {m['stored_sales_count']} != {m['sales_count']}, "
+                f"edition_costs {m['stored_edition_costs']:.2f} != {m['edition_costs']:.2f}"
+            )
+        print(f"edition_summary: {len(mismatches)} diferencias")
+        return 1 if mismatches else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Importación masiva desde la línea de comandos (correr desde src/):
+
+    python -m commands.import_data customers clientes.csv
+    python -m commands.import_data purchases compras.ndjson [--format ndjson] [--batch-size 5000]
+
+Mismo pipeline que POST /imports/{entity} (ver crud/imports.py), en primer plano
+y con el progreso impreso por lote. Sale con código 1 si la importación falla.
+"""
+import argparse
+import logging
+import sys
+import threading
+
+from crud.imports import FORMATS, SPECS, ImportJob, run_import  # pylint: disable=import-error
+from db.session import engine  # pylint: disable=import-error
+
+
+def _print_progress(job: ImportJob) -> None:
+    p = job.snapshot()
+    print(
+        f"{p['status']}: {p['rows_read']} leídas ({p['invalid']} inválidas) | "
+        f"{p['inserted']} insertadas, {p['updated']} actualizadas, {p['skipped']} salteadas, "
+        f"{p['failed']} fallidas | {p['rows_per_second'] or 0:.0f} filas/s",
+        flush=True,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="commands.import_data", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entity", choices=sorted(SPECS), help="Tabla destino")
+    parser.add_argument("path", help="Archivo CSV (con encabezado) o NDJSON")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="Por defecto según la extensión")
+    parser.add_argument("--batch-size", type=int, default=None, help="Filas por lote (default settings.import_batch_size)")
+    parser.add_argument("--progress-seconds", type=float, default=5.0, help="Cada cuánto imprimir el progreso")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    job = ImportJob(entity=args.entity, format=fmt)
+
+    done = threading.Event()
+
+    def report() -> None:
+        while not done.wait(args.progress_seconds):
+            _print_progress(job)
+
+    threading.Thread(target=report, daemon=True).start()
+    try:
+        with open(args.path, "rb") as stream:
+            run_import(engine, job, stream, batch_size=args.batch_size)
+    finally:
+        done.set()
+
+    _print_progress(job)
+    for err in job.errors:
+        print(f"  línea {err['line']}: {err['detail']}")
+    if job.error:
+        print(f"error: {job.error}", file=sys.stderr)
+    return 1 if job.status == "failed" else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
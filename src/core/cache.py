@@ -0,0 +1,178 @@
+"""
+Cache de respuestas con invalidación por tags.
+
+Backends intercambiables (settings.response_cache_backend):
+  - "memory": LRU en proceso con TTL (por defecto),
+  - "redis": compartido entre procesos/instancias (paquete `redis`, en requirements.txt).
+
+Invalidación por versión de tag: cada entrada se guarda bajo una clave que
+incluye la versión actual de sus tags ("ingredients", "editions", ...).
+`invalidate(...)` solo incrementa esas versiones, así las claves viejas dejan
+de consultarse y expiran solas (LRU / TTL). Un request que empezó antes de
+una escritura guarda con la versión anterior y nunca pisa datos nuevos.
+Cada tag recuerda además cuándo se invalidó (`invalidated_at`), para no
+guardar lecturas de réplicas que todavía no aplicaron esa escritura.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.config import settings  # pylint: disable=import-error
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """LRU en proceso con TTL por entrada (thread-safe)."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int) -> None:
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._invalidated_at: Dict[str, float] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            if hit[0] <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return hit[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def versions(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def bump(self, tags: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+                self._invalidated_at[tag] = now
+
+    def invalidated_at(self, tags: Sequence[str]) -> float:
+        """Epoch de la última invalidación de alguno de `tags` (0 si nunca)."""
+        with self._lock:
+            return max((self._invalidated_at.get(tag, 0.0) for tag in tags), default=0.0)
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Backend compartido sobre Redis (o un reemplazo compatible); versiones de tag con INCR."""
+
+    blocking = True
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis  # pylint: disable=import-outside-toplevel
+        except ImportError as exc:
+            raise RuntimeError("response_cache_backend=redis requiere el paquete 'redis'") from exc
+        self._client = redis.Redis.from_url(url)
+        self._prefix = "respcache:"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self._prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(self._prefix + key, value, px=max(int(ttl * 1000), 1))
+
+    def versions(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        raw = self._client.mget([f"{self._prefix}tag:{tag}" for tag in tags])
+        return tuple(int(v) if v is not None else 0 for v in raw)
+
+    def bump(self, tags: Iterable[str]) -> None:
+        now = time.time()
+        pipe = self._client.pipeline()
+        for tag in tags:
+            pipe.incr(f"{self._prefix}tag:{tag}")
+            pipe.set(f"{self._prefix}tag_at:{tag}", f"{now:.3f}")
+        pipe.execute()
+
+    def invalidated_at(self, tags: Sequence[str]) -> float:
+        raw = self._client.mget([f"{self._prefix}tag_at:{tag}" for tag in tags])
+        return max((float(v) for v in raw if v is not None), default=0.0)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def record(self, namespace: str, hit: bool) -> None:
+        with self._lock:
+            counter = self.hits if hit else self.misses
+            counter[namespace] = counter.get(namespace, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            namespaces = sorted(set(self.hits) | set(self.misses))
+            per_namespace = {}
+            for name in namespaces:
+                hits, misses = self.hits.get(name, 0), self.misses.get(name, 0)
+                per_namespace[name] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                }
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "namespaces": per_namespace,
+            }
+
+
+def _build_backend():
+    if settings.response_cache_backend == "redis":
+        return RedisBackend(settings.response_cache_redis_url)
+    return MemoryBackend(settings.response_cache_max_entries)
+
+
+backend = _build_backend()
+stats = CacheStats()
+_invalidation_listeners: List[Callable[[Sequence[str]], None]] = []
+
+
+def on_invalidate(listener: Callable[[Sequence[str]], None]) -> Callable[[Sequence[str]], None]:
+    """
+    Registra `listener(tags)` para que se llame en cada `invalidate(...)`,
+    aunque el cache de respuestas esté desactivado (p. ej. el cache de COUNT(*)).
+    """
+    _invalidation_listeners.append(listener)
+    return listener
+
+
+def invalidate(*tags: str) -> None:
+    """Invalida todas las entradas con alguno de `tags` (llamar después del commit)."""
+    for listener in _invalidation_listeners:
+        listener(tags)
+    if not settings.response_cache_enabled:
+        return
+    try:
+        backend.bump(tags)
+    except Exception:  # pylint: disable=broad-except
+        # un backend compartido caído no debe romper la escritura; las entradas expiran por TTL
+        logger.exception("No se pudo invalidar el cache de respuestas (tags=%s)", tags)
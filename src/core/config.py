@@ -1,9 +1,84 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     app_name: str = "Fast API - Sales"
     app_version: str = "0.0.1"
     database_url: str
+    # stack de base de datos de las rutas: False = psycopg2 sync en el threadpool,
+    # True = engine async (asyncpg) sobre el event loop
+    db_async: bool = False
+    # URL del engine async; si no se define se deriva de database_url con el driver asyncpg
+    async_database_url: Optional[str] = None
+    # hilos del threadpool de Starlette/AnyIO (rutas y dependencias sync); default de AnyIO: 40
+    threadpool_size: int = 40
+    # pool de conexiones (por engine y por proceso): size + max_overflow es el tope
+    # de conexiones abiertas; timeout = espera máxima por una conexión libre;
+    # recycle = segundos antes de reabrir una conexión (-1 nunca)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_use_lifo: bool = False
+    # PgBouncer en modo transacción: sin prepared statements cacheados (asyncpg);
+    # db_null_pool deja todo el pooling a PgBouncer
+    db_pgbouncer: bool = False
+    db_null_pool: bool = False
+    # réplicas de lectura: URLs separadas por coma (mismo usuario/esquema que el primario);
+    # los GET/HEAD se reparten entre ellas salvo dentro de la ventana read-your-writes
+    database_replica_urls: Optional[str] = None
+    # lag de réplica tolerado: ventana read-your-writes y, después de invalidar un
+    # tag, tiempo en que el cache de respuestas no guarda lecturas de réplica
+    read_your_writes_seconds: float = 5.0
+    # segundos que una réplica con errores queda fuera de la rotación
+    replica_retry_seconds: float = 30.0
+    # cache de respuestas GET (catálogo / tablero): backend "memory" (LRU por proceso)
+    # o "redis" (compartido); las escrituras del CRUD lo invalidan por tags
+    response_cache_enabled: bool = True
+    response_cache_backend: str = "memory"
+    response_cache_redis_url: str = "redis://localhost:6379/0"
+    response_cache_ttl_seconds: float = 60.0
+    response_cache_max_entries: int = 512
+    # cuerpos desde este tamaño se guardan con gzip (-1 nunca)
+    response_cache_compress_min_bytes: int = 1024
+    # max-age (segundos) de Cache-Control para datos de catálogo (ingredientes)
+    catalog_max_age_seconds: int = 300
+    # listados serializados una sola vez con model_dump_json (sin revalidar contra response_model)
+    fast_json_enabled: bool = True
+    # respuestas/pedidos MessagePack (y CBOR si está cbor2) por Accept / Content-Type
+    binary_formats_enabled: bool = True
+    # POST /sales/bulk: filas por INSERT/commit y máximo de filas por pedido
+    # (el máximo también acota los parámetros del IN que valida ediciones/clientes)
+    sale_bulk_chunk_size: int = 500
+    sale_bulk_max_rows: int = 10000
+    # POST /edition_ingredients/{edition_id}/batch: máximo de ítems por pedido
+    edition_ingredient_batch_max_items: int = 500
+    # importación masiva (crud/imports.py): filas por lote (COPY + merge + commit),
+    # errores por línea que se guardan, importaciones simultáneas y jobs recordados
+    import_batch_size: int = 5000
+    import_max_errors: int = 100
+    import_max_concurrent: int = 2
+    import_jobs_retained: int = 50
+    # token requerido en X-Internal-Token para /internal/*; vacío = sin control
+    internal_token: Optional[str] = None
+    # TTL (segundos) del cache de COUNT(*) exactos por filtro en los listados; 0 lo desactiva.
+    # Las escrituras de este proceso lo vacían (invalidate); el TTL acota lo que
+    # escriben otros procesos
+    count_cache_ttl_seconds: float = 5.0
+    # leer sales_count/edition_costs de edition_summary (mantenida por triggers);
+    # False vuelve a agregarlos en vivo sobre sale/edition_ingredient
+    edition_summary_enabled: bool = True
+    # búsqueda aproximada con pg_trgm (además del ILIKE) y umbral de word_similarity (0..1)
+    search_fuzzy_enabled: bool = True
+    search_similarity_threshold: float = 0.5
+    # autocompletado de clientes en memoria: recarga periódica (segundos, 0 la
+    # desactiva) y tope de candidatos evaluados por consulta (los primeros tokens
+    # en orden alfabético del prefijo: con prefijos muy cortos el top-k es aproximado)
+    autocomplete_enabled: bool = True
+    autocomplete_refresh_seconds: float = 300.0
+    autocomplete_max_candidates: int = 5000
     
     # pylint: disable=too-few-public-methods
     class Config:
@@ -1,58 +1,72 @@
 import logging
 from typing import Optional
-from sqlalchemy import or_, func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from models.customer import Customer # pylint: disable=import-error
 from schemas.customer import CustomerCreate, CustomerListResponse, CustomerUpdate, CustomerRead # pylint: disable=import-error
+from crud.pagination import TotalMode, apply_page, count_total, encode_cursor, page_meta, split_page # pylint: disable=import-error
+from core.config import settings # pylint: disable=import-error
+from crud.customer_autocomplete import customer_index # pylint: disable=import-error
+from crud.search import rank_prefix, search_sort_keys, text_search, with_rank # pylint: disable=import-error
+from core.cache import invalidate # pylint: disable=import-error
 from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+# orden del listado; `id` desempata y hace estable el cursor keyset
+CUSTOMER_SORT_KEYS = [(Customer.name, False), (Customer.id, False)]
+
 def get_customers(
     db: Session,
     q: Optional[str] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    total_mode: TotalMode = TotalMode.EXACT
 ) -> CustomerListResponse:
     """
-    Búsqueda con paginación (limit/offset) y total.
-    Retorna dict con keys: items, total, limit, offset, next_offset, prev_offset
+    Búsqueda con paginación (limit/offset o cursor keyset) y total.
+    Retorna dict con keys: items, total, limit, offset, next_offset, prev_offset, next_cursor, has_more
+    total_mode: exact (COUNT cacheado) | estimate (planner) | none (solo has_more)
+    Con `q` en Postgres también trae coincidencias aproximadas (pg_trgm) ordenadas por relevancia.
     """
     try:
         # 1) construir la sentencia base (select) con filtros si aplica
         stmt = select(Customer)
-        if q:
-            term = f"%{q.strip()}%"
-            stmt = stmt.where(
-                or_(
-                    Customer.name.ilike(term),
-                    Customer.email.ilike(term),
-                    Customer.phone.ilike(term),
-                )
-            )
+        search = text_search(db, q, [Customer.name, Customer.email, Customer.phone])
+        if search is not None:
+            stmt = stmt.where(search.condition)
 
-        # 2) calcular total usando select(func.count()) sobre la subquery del stmt
-        #    esto es eficiente y evita problemas de composición directos con Query.count()
-        count_stmt = select(func.count()).select_from(stmt.subquery()) # pylint: disable=not-callable
-        total = db.execute(count_stmt).scalar_one()  # devuelve un int
+        # 2) calcular total según total_mode (exacto cacheado, estimado o ninguno)
+        total = count_total(db, stmt, total_mode)
 
-        # 3) traer las filas aplicando orden/offset/limit
-        rows_stmt = stmt.order_by(Customer.name).offset(offset).limit(limit)
-        rows = db.execute(rows_stmt).scalars().all()
+        # 3) traer las filas aplicando orden y página (offset o cursor)
+        rows_stmt = apply_page(
+            with_rank(stmt, search),
+            search_sort_keys(search, CUSTOMER_SORT_KEYS),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        rows, has_more = split_page(db.execute(rows_stmt).all(), limit)
 
-        items = [CustomerRead.model_validate(r) for r in rows]
+        items = [CustomerRead.model_validate(r[0]) for r in rows]
 
-        next_offset = offset + limit if (offset + limit) < total else None
-        prev_offset = offset - limit if (offset - limit) >= 0 else None
+        last = rows[-1] if rows else None
+        next_cursor = encode_cursor([*rank_prefix(search, last), last[0].name, last[0].id]) if has_more else None
 
         return {
             "items": items,
-            "total": int(total),
-            "limit": limit,
-            "offset": offset,
-            "next_offset": next_offset,
-            "prev_offset": prev_offset,
+            **page_meta(
+                total=total,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                has_more=has_more,
+                page_size=len(items),
+                next_cursor=next_cursor,
+            ),
         }
     except SQLAlchemyError:
         logger.exception("Error al listar customers con búsqueda=%s", q)
@@ -71,6 +85,8 @@ def create_customer(db: Session, customer: CustomerCreate):
     try:
         db.commit()
         db.refresh(db_customer)
+        customer_index.upsert(db_customer)
+        invalidate("customers")
         return db_customer
     except IntegrityError as exc:
         db.rollback()
@@ -98,6 +114,8 @@ def update_customer(db: Session, customer_id: int, customer: CustomerUpdate):
             setattr(db_customer, key, value)
         db.commit()
         db.refresh(db_customer)
+        customer_index.upsert(db_customer)
+        invalidate("customers", "sales")
     return db_customer
 
 def delete_customer(db: Session, customer_id: int):
@@ -105,4 +123,25 @@ def delete_customer(db: Session, customer_id: int):
     if db_customer:
         db.delete(db_customer)
         db.commit()
-    return db_customer
\ No newline at end of file
+        customer_index.remove(customer_id)
+        # borra en cascada sus ventas (agregados de las ediciones)
+        invalidate("customers", "sales", "editions")
+    return db_customer
+
+def autocomplete_from_index(q: str, limit: int = 10) -> Optional[dict]:
+    """Autocompletado desde el índice en memoria; None si está desactivado o todavía no cargó."""
+    if settings.autocomplete_enabled and customer_index.ready:
+        return {"items": customer_index.search(q, limit), "source": "memory"}
+    return None
+
+def autocomplete_customers(db: Session, q: str, limit: int = 10):
+    """
+    Top-`limit` clientes para autocompletar `q` (prefijos de nombre, email o teléfono).
+    Responde desde el índice en memoria; si no está cargado cae a la búsqueda en la base.
+    """
+    result = autocomplete_from_index(q, limit)
+    if result is not None:
+        return result
+
+    page = get_customers(db, q=q, limit=limit, total_mode=TotalMode.NONE)
+    return {"items": [item.model_dump() for item in page["items"]], "source": "database"}
@@ -0,0 +1,277 @@
+"""
+Índice de autocompletado de clientes en memoria (uno por proceso).
+
+Pensado para la pantalla de venta: cada tecla consulta `/customers/autocomplete`
+y se responde desde memoria, sin ir a la base.
+
+Estructura:
+  - `_entries`: {id: (name, phone, email, name_normalizado, tokens)}
+  - `_tokens`: lista ordenada de (token, id). Los tokens son las palabras del
+    nombre y de la parte local del email, el email completo y los dígitos del
+    teléfono, normalizados (minúsculas, sin acentos). Un prefijo se resuelve
+    con dos bisect sobre la lista, así la búsqueda no depende del tamaño total.
+
+Ciclo de vida:
+  - se carga completo al iniciar la app (`load`),
+  - create/update/delete de customer lo actualizan (`upsert` / `remove`),
+  - como cada worker tiene su copia, se recarga en segundo plano cada
+    `settings.autocomplete_refresh_seconds` para levantar cambios hechos en
+    otros procesos.
+"""
+import heapq
+import logging
+import re
+import sys
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from core.config import settings  # pylint: disable=import-error
+from models.customer import Customer  # pylint: disable=import-error
+
+logger = logging.getLogger(__name__)
+
+# (name, phone, email, name_normalizado, tokens)
+Entry = Tuple[str, Optional[str], Optional[str], str, FrozenSet[str]]
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_EMAIL_SPLIT_RE = re.compile(r"[._+\-]+")
+# token máximo para el bisect por prefijo (mayor que cualquier carácter usado)
+_PREFIX_END = "\U0010ffff"
+
+
+def normalize(text: str) -> str:
+    """'José  Pérez' -> 'jose  perez' (minúsculas, sin marcas diacríticas)."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def _tokens_for(name_norm: str, phone: Optional[str], email: Optional[str]) -> FrozenSet[str]:
+    tokens = set(_WORD_RE.findall(name_norm))
+    if email:
+        email_norm = normalize(email)
+        tokens.add(email_norm)
+        local = email_norm.split("@", 1)[0]
+        tokens.update(t for t in _EMAIL_SPLIT_RE.split(local) if t)
+    if phone:
+        digits = "".join(ch for ch in phone if ch.isdigit())
+        if digits:
+            tokens.add(digits)
+    tokens.discard("")
+    return frozenset(tokens)
+
+
+def _query_words(q: str) -> List[str]:
+    q_norm = normalize(q.strip())
+    if "@" in q_norm:
+        # un email se busca entero (el token del email completo)
+        return [q_norm]
+    words = _WORD_RE.findall(q_norm)
+    # "11 2345-6789" -> un único prefijo de dígitos
+    if words and all(w.isdigit() for w in words):
+        return ["".join(words)]
+    return words
+
+
+class CustomerAutocompleteIndex:
+    """Índice de prefijos sobre name/phone/email; thread-safe."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._entries: Dict[int, Entry] = {}
+        self._tokens: List[Tuple[str, int]] = []
+        self._loaded_at: Optional[float] = None
+        self._refreshing = False
+        # cambios recibidos mientras una recarga lee la tabla; se reaplican al reemplazar
+        self._pending: List[Tuple[int, Optional[Entry]]] = []
+
+    # ------------------------------------------------------------------
+    # carga / mantenimiento
+    # ------------------------------------------------------------------
+    @property
+    def ready(self) -> bool:
+        return self._loaded_at is not None
+
+    @staticmethod
+    def _entry(name: str, phone: Optional[str], email: Optional[str]) -> Entry:
+        name_norm = normalize(name)
+        return (name, phone, email, name_norm, _tokens_for(name_norm, phone, email))
+
+    def load(self, db: Session) -> int:
+        """Reconstruye el índice completo desde la tabla customer. Devuelve la cantidad cargada."""
+        entries: Dict[int, Entry] = {}
+        tokens: List[Tuple[str, int]] = []
+        stmt = select(Customer.id, Customer.name, Customer.phone, Customer.email)
+        for customer_id, name, phone, email in db.execute(stmt.execution_options(yield_per=5000)):
+            entry = self._entry(name, phone, email)
+            entries[customer_id] = entry
+            tokens.extend((token, customer_id) for token in entry[4])
+        tokens.sort()
+
+        # se arma aparte y se reemplaza de una vez: las búsquedas nunca ven un índice a medias
+        with self._lock:
+            self._entries = entries
+            self._tokens = tokens
+            self._loaded_at = time.monotonic()
+            for customer_id, entry in self._pending:
+                self._apply_locked(customer_id, entry)
+            self._pending = []
+        logger.info("Autocompletado de clientes cargado: %s clientes, %s tokens", len(entries), len(tokens))
+        return len(entries)
+
+    def _remove_locked(self, customer_id: int) -> None:
+        entry = self._entries.pop(customer_id, None)
+        if entry is None:
+            return
+        for token in entry[4]:
+            pos = bisect_left(self._tokens, (token, customer_id))
+            if pos < len(self._tokens) and self._tokens[pos] == (token, customer_id):
+                del self._tokens[pos]
+
+    def _apply_locked(self, customer_id: int, entry: Optional[Entry]) -> None:
+        self._remove_locked(customer_id)
+        if entry is None:
+            return
+        self._entries[customer_id] = entry
+        for token in entry[4]:
+            insort(self._tokens, (token, customer_id))
+
+    def _apply(self, customer_id: int, entry: Optional[Entry]) -> None:
+        with self._lock:
+            if self._refreshing:
+                self._pending.append((customer_id, entry))
+            if self.ready:
+                self._apply_locked(customer_id, entry)
+
+    def upsert(self, customer: Customer) -> None:
+        """Alta o modificación de un cliente (llamar después del commit)."""
+        self._apply(customer.id, self._entry(customer.name, customer.phone, customer.email))
+
+    def remove(self, customer_id: int) -> None:
+        """Baja de un cliente (llamar después del commit)."""
+        self._apply(customer_id, None)
+
+    def _refresh_in_background(self) -> None:
+        from db.session import SessionLocal  # pylint: disable=import-error,import-outside-toplevel
+
+        try:
+            with SessionLocal() as db:
+                self.load(db)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Error al recargar el autocompletado de clientes")
+        finally:
+            self._refreshing = False
+
+    def refresh(self) -> None:
+        """Recarga el índice en segundo plano (ej. después de una importación masiva)."""
+        if self._refreshing or self._loaded_at is None:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+    def _maybe_refresh(self) -> None:
+        ttl = settings.autocomplete_refresh_seconds
+        if ttl <= 0 or self._loaded_at is None:
+            return
+        if time.monotonic() - self._loaded_at >= ttl:
+            self.refresh()
+
+    # ------------------------------------------------------------------
+    # consulta
+    # ------------------------------------------------------------------
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self._tokens, (prefix,))
+        hi = bisect_left(self._tokens, (prefix + _PREFIX_END,))
+        return lo, hi
+
+    def _ids_in_range(self, lo: int, hi: int) -> Iterable[int]:
+        return (customer_id for _, customer_id in self._tokens[lo:hi])
+
+    def search(self, q: str, limit: int = 10) -> List[dict]:
+        """
+        Top-`limit` clientes cuyos tokens empiezan con cada palabra de `q`.
+        Orden: nombre que empieza con la consulta, palabras que coinciden
+        completas, nombre más corto, nombre alfabético.
+
+        Tope: solo se evalúan los primeros `settings.autocomplete_max_candidates`
+        tokens (en orden alfabético) del prefijo más selectivo. Con prefijos de
+        una o dos letras sobre muchos clientes el top-k es aproximado: se rankea
+        sobre los tokens alfabéticamente primeros, no sobre todos. Los clientes
+        del POS escriben hasta que el prefijo entra en el tope.
+        """
+        words = _query_words(q)
+        if not words:
+            return []
+        self._maybe_refresh()
+
+        with self._lock:
+            # la palabra más selectiva maneja la búsqueda; el resto se verifica por entrada
+            ranges = sorted(
+                ((self._prefix_range(w), w) for w in words),
+                key=lambda item: item[0][1] - item[0][0],
+            )
+            (lo, hi), _ = ranges[0]
+            if lo == hi:
+                return []
+            candidates = set(self._ids_in_range(lo, min(hi, lo + settings.autocomplete_max_candidates)))
+            rest = [w for _, w in ranges[1:]]
+
+            q_norm = " ".join(words)
+            scored = []
+            for customer_id in candidates:
+                entry = self._entries[customer_id]
+                tokens = entry[4]
+                if rest and not all(any(t.startswith(w) for t in tokens) for w in rest):
+                    continue
+                exact = sum(1 for w in words if w in tokens)
+                name_norm = entry[3]
+                key = (not name_norm.startswith(q_norm), -exact, len(name_norm), name_norm, customer_id)
+                scored.append((key, customer_id, entry))
+
+            best = heapq.nsmallest(limit, scored)
+
+        return [
+            {"id": customer_id, "name": entry[0], "phone": entry[1], "email": entry[2]}
+            for _, customer_id, entry in best
+        ]
+
+    # ------------------------------------------------------------------
+    # métricas
+    # ------------------------------------------------------------------
+    def stats(self) -> dict:
+        """Tamaño del índice y memoria aproximada (sys.getsizeof de estructuras y contenidos)."""
+        with self._lock:
+            entries = self._entries
+            tokens = self._tokens
+            size = sys.getsizeof(entries) + sys.getsizeof(tokens)
+            seen: Set[int] = set()
+            for customer_id, entry in entries.items():
+                size += sys.getsizeof(customer_id) + sys.getsizeof(entry)
+                for value in entry:
+                    if value is not None and id(value) not in seen:
+                        seen.add(id(value))
+                        size += sys.getsizeof(value)
+            for pair in tokens:
+                size += sys.getsizeof(pair)
+                if id(pair[0]) not in seen:
+                    seen.add(id(pair[0]))
+                    size += sys.getsizeof(pair[0])
+            loaded_age = None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1)
+            return {
+                "ready": self.ready,
+                "customers": len(entries),
+                "tokens": len(tokens),
+                "memory_bytes": size,
+                "loaded_seconds_ago": loaded_age,
+            }
+
+
+customer_index = CustomerAutocompleteIndex()
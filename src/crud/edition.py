@@ -1,30 +1,52 @@
 import logging
+from datetime import datetime, timezone
 from typing import Optional
-from sqlalchemy import or_, func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, Numeric, cast, insert, literal, or_, func, select
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from fastapi import HTTPException, status
 
 from models.edition import Edition # pylint: disable=import-error
 from models.edition_ingredient import EditionIngredient # pylint: disable=import-error
+from models.edition_summary import EditionSummary # pylint: disable=import-error
+from models.ingredient import Ingredient # pylint: disable=import-error
+from models.purchase import PaymentStatus, Purchase # pylint: disable=import-error
 from models.sale import Sale # pylint: disable=import-error
-from schemas.edition import EditionCreate, EditionListResponse, EditionUpdate, EditionRead # pylint: disable=import-error
+from core.config import settings # pylint: disable=import-error
+from core.cache import invalidate # pylint: disable=import-error
+from schemas.edition import ( # pylint: disable=import-error
+    EditionClone,
+    EditionCloneResponse,
+    EditionCreate,
+    EditionListResponse,
+    EditionRecomputeTotalsResponse,
+    EditionUpdate,
+    EditionRead,
+)
+from crud.sale import recompute_sale_totals # pylint: disable=import-error
+from crud.pagination import TotalMode, apply_page, count_total, encode_cursor, page_meta, split_page # pylint: disable=import-error
 
 logger = logging.getLogger(__name__)
 
+EDITION_SORT_KEYS = [(Edition.date, True), (Edition.id, True)]
+
 
 def get_editions(
     db: Session,
     q: Optional[str] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    total_mode: TotalMode = TotalMode.EXACT
 ) -> EditionListResponse:
     """
-    Búsqueda con paginación (limit/offset) y total.
+    Búsqueda con paginación (limit/offset o cursor keyset) y total.
     Incluye:
       - sales_count: SUM(Sale.total_portions)
       - edition_costs: SUM(EditionIngredient.subtotal)
       - net_profits: (sales_count * portion_price) - edition_costs
+    sales_count / edition_costs se leen de edition_summary (ver settings.edition_summary_enabled).
+    total_mode: exact (COUNT cacheado) | estimate (planner) | none (solo has_more)
     """
     try:
         # construir filtros base
@@ -34,43 +56,43 @@ def get_editions(
             filters.append(or_(Edition.name.ilike(term), Edition.notes.ilike(term)))
 
         # total (sobre la consulta filtrada)
-        base_count_stmt = select(Edition).where(*filters) if filters else select(Edition)
-        count_stmt = select(func.count()).select_from(base_count_stmt.subquery())  # pylint: disable=not-callable
-        total = db.execute(count_stmt).scalar_one()
-
-        # subquery: sum of total_portions por edition
-        sales_subq = (
-            select(
-                Sale.edition_id.label("edition_id"),
-                func.coalesce(func.sum(Sale.total_portions), 0).label("sales_count"),
+        base_count_stmt = select(Edition).where(*filters)
+        total = count_total(db, base_count_stmt, total_mode)
+
+        # 1) paginar solo sobre edition (índice (date, id)): los agregados se
+        #    calculan después y únicamente para las ediciones de esta página,
+        #    así el costo no crece con el historial de ediciones.
+        page = apply_page(
+            base_count_stmt, EDITION_SORT_KEYS, limit=limit, offset=offset, cursor=cursor
+        ).subquery("edition_page")
+        edition_page = aliased(Edition, page)
+
+        # 2) select principal: Edition + sales_count + edition_costs (ambos opcionales)
+        if settings.edition_summary_enabled:
+            # precalculados por triggers en edition_summary: una fila por edición
+            rows_stmt = (
+                select(edition_page, EditionSummary.sales_count, EditionSummary.edition_costs)
+                .outerjoin(EditionSummary, EditionSummary.edition_id == page.c.id)
             )
-            .group_by(Sale.edition_id)
-            .subquery()
-        )
-
-        costs_subq = (
-            select(
-                EditionIngredient.edition_id.label("edition_id"),
-                func.coalesce(func.sum(EditionIngredient.subtotal), 0).label("edition_costs"),
+        else:
+            # agregados en vivo, correlacionados por edición de la página (índices por edition_id)
+            sales_count = (
+                select(func.coalesce(func.sum(Sale.total_portions), 0))
+                .where(Sale.edition_id == page.c.id)
+                .scalar_subquery()
             )
-            .group_by(EditionIngredient.edition_id)
-            .subquery()
-        )
-
-        # select principal: Edition + sales_count + edition_costs (ambos opcionales por LEFT JOIN)
-        rows_stmt = (
-            select(Edition, sales_subq.c.sales_count, costs_subq.c.edition_costs)
-            .outerjoin(sales_subq, sales_subq.c.edition_id == Edition.id)
-            .outerjoin(costs_subq, costs_subq.c.edition_id == Edition.id)
-        )
-
-        # aplicar filtros si existen
-        if filters:
-            rows_stmt = rows_stmt.where(*filters)
+            edition_costs = (
+                select(func.coalesce(func.sum(EditionIngredient.subtotal), 0))
+                .where(EditionIngredient.edition_id == page.c.id)
+                .scalar_subquery()
+            )
+            rows_stmt = select(edition_page, sales_count, edition_costs)
 
-        rows_stmt = rows_stmt.order_by(Edition.date.desc()).offset(offset).limit(limit)
+        # el subquery paginado no garantiza orden hacia afuera: se repite
+        rows_stmt = rows_stmt.order_by(page.c.date.desc(), page.c.id.desc())
 
-        result = db.execute(rows_stmt).all()  # lista de tuples (Edition, sales_count, edition_costs)
+        # lista de tuples (Edition, sales_count, edition_costs)
+        result, has_more = split_page(db.execute(rows_stmt).all(), limit)
 
         items = []
         for edition_obj, sales_count_raw, edition_costs_raw in result:
@@ -97,16 +119,20 @@ def get_editions(
 
             items.append(edition_read)
 
-        next_offset = offset + limit if (offset + limit) < total else None
-        prev_offset = offset - limit if (offset - limit) >= 0 else None
+        last_edition = result[-1][0] if result else None
+        next_cursor = encode_cursor([last_edition.date, last_edition.id]) if has_more else None
 
         return {
             "items": items,
-            "total": int(total),
-            "limit": limit,
-            "offset": offset,
-            "next_offset": next_offset,
-            "prev_offset": prev_offset,
+            **page_meta(
+                total=total,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                has_more=has_more,
+                page_size=len(items),
+                next_cursor=next_cursor,
+            ),
         }
     except SQLAlchemyError:
         logger.exception("Error al listar editions con búsqueda=%s", q)
@@ -117,18 +143,32 @@ def get_editions(
 
 
 def get_edition(db: Session, edition_id: int):
-    edition = db.query(Edition).filter(Edition.id == edition_id).first()
-    if edition is None:
-        raise HTTPException(status_code=404, detail="Edition not found")
-
     try:
-        # sales_count: SUM de total_portions para esta edition
-        sales_count_stmt = select(func.coalesce(func.sum(Sale.total_portions), 0)).where(Sale.edition_id == edition_id)
-        sales_count = db.execute(sales_count_stmt).scalar_one() or 0
+        if settings.edition_summary_enabled:
+            # una sola consulta: la edición + sus agregados precalculados
+            row = db.execute(
+                select(Edition, EditionSummary.sales_count, EditionSummary.edition_costs)
+                .outerjoin(EditionSummary, EditionSummary.edition_id == Edition.id)
+                .where(Edition.id == edition_id)
+            ).first()
+            if row is None:
+                raise HTTPException(status_code=404, detail="Edition not found")
+            edition, sales_count, edition_costs_raw = row
+            sales_count = sales_count or 0
+            edition_costs_raw = edition_costs_raw or 0.0
+        else:
+            edition = db.query(Edition).filter(Edition.id == edition_id).first()
+            if edition is None:
+                raise HTTPException(status_code=404, detail="Edition not found")
+
+            # sales_count: SUM de total_portions para esta edition
+            sales_count_stmt = select(func.coalesce(func.sum(Sale.total_portions), 0)).where(Sale.edition_id == edition_id)
+            sales_count = db.execute(sales_count_stmt).scalar_one() or 0
+
+            # edition_costs: SUM de subtotales de los edition_items para esta edition
+            costs_stmt = select(func.coalesce(func.sum(EditionIngredient.subtotal), 0)).where(EditionIngredient.edition_id == edition_id)
+            edition_costs_raw = db.execute(costs_stmt).scalar_one() or 0.0
 
-        # edition_costs: SUM de subtotales de los edition_items para esta edition
-        costs_stmt = select(func.coalesce(func.sum(EditionIngredient.subtotal), 0)).where(EditionIngredient.edition_id == edition_id)
-        edition_costs_raw = db.execute(costs_stmt).scalar_one() or 0.0
         # normalizamos a float y redondeamos
         edition_costs = round(float(edition_costs_raw), 2)
 
@@ -161,6 +201,7 @@ def create_edition(db: Session, edition: EditionCreate):
     try:
         db.commit()
         db.refresh(db_edition)
+        invalidate("editions")
         return EditionRead.model_validate(db_edition)
     except IntegrityError:
         db.rollback()
@@ -171,20 +212,126 @@ def create_edition(db: Session, edition: EditionCreate):
         )
 
 
+def clone_edition(db: Session, source_id: int, clone: EditionClone) -> EditionCloneResponse:
+    """
+    Crea una edición nueva copiando los ingredientes de `source_id` con
+    INSERT ... SELECT (sin traer las filas a Python): cantidades escaladas por
+    portion_factor, precio unitario de la edición origen o, con reprice, el
+    actual del ingrediente, y subtotal recalculado en SQL.
+
+    Con create_purchases primero inserta una compra PENDING por ingrediente
+    (también INSERT ... SELECT) y cada edition_ingredient queda apuntando a la
+    suya. Todo en una transacción: edición + 1 o 2 INSERT ... SELECT.
+    """
+    source = db.get(Edition, source_id)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Edition not found")
+
+    data = clone.model_dump(include={"date", "name", "notes", "status"})
+    data["portion_price"] = clone.portion_price if clone.portion_price is not None else source.portion_price
+    new_edition = Edition(**data)
+    now = literal(datetime.now(timezone.utc), DateTime(timezone=True))
+
+    quantity = EditionIngredient.quantity * clone.portion_factor
+    unit_price = Ingredient.unit_price if clone.reprice else EditionIngredient.unit_price
+    subtotal = func.round(cast(quantity * unit_price, Numeric), 2)
+    source_items = (
+        select(EditionIngredient.ingredient_id, quantity.label("quantity"), unit_price.label("unit_price"),
+               subtotal.label("subtotal"), EditionIngredient.notes)
+        .join(Ingredient, Ingredient.id == EditionIngredient.ingredient_id)
+        .where(EditionIngredient.edition_id == source_id)
+        .subquery()
+    )
+
+    try:
+        db.add(new_edition)
+        db.flush()
+        new_id = literal(new_edition.id, Edition.id.type)
+
+        purchases_created = 0
+        purchase_id = literal(None, Purchase.id.type)
+        if clone.create_purchases:
+            purchases_created = db.execute(
+                insert(Purchase).from_select(
+                    ["ingredient_id", "edition_id", "purchased_at", "quantity", "unit_price", "total_amount",
+                     "payment_status", "created_at", "updated_at"],
+                    select(
+                        source_items.c.ingredient_id, new_id, now, source_items.c.quantity,
+                        source_items.c.unit_price, source_items.c.subtotal,
+                        literal(PaymentStatus.PENDING, Purchase.payment_status.type), now, now,
+                    ),
+                )
+            ).rowcount
+            # la edición es nueva: sus únicas compras son las recién insertadas, una por ingrediente
+            purchase_id = (
+                select(Purchase.id)
+                .where(Purchase.edition_id == new_edition.id, Purchase.ingredient_id == source_items.c.ingredient_id)
+                .scalar_subquery()
+            )
+
+        ingredients_copied = db.execute(
+            insert(EditionIngredient).from_select(
+                ["edition_id", "ingredient_id", "quantity", "unit_price", "subtotal", "notes", "purchase_id",
+                 "created_at", "updated_at"],
+                select(
+                    new_id, source_items.c.ingredient_id, source_items.c.quantity, source_items.c.unit_price,
+                    source_items.c.subtotal, source_items.c.notes, purchase_id, now, now,
+                ),
+            )
+        ).rowcount
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.exception("Error de integridad al clonar la edición %s", source_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error de integridad en los datos de la edición"
+        )
+
+    invalidate("editions", "edition_ingredients", "purchases")
+    return EditionCloneResponse(
+        edition=get_edition(db, new_edition.id),
+        ingredients_copied=ingredients_copied,
+        purchases_created=purchases_created,
+    )
+
+
 def update_edition(db: Session, edition_id: int, edition: EditionUpdate):
     db_edition = db.query(Edition).filter(Edition.id == edition_id).first()
     if db_edition is None:
         raise HTTPException(status_code=404, detail="Edition not found")
 
     update_data = edition.model_dump(exclude_unset=True)
+    price_changed = "portion_price" in update_data and update_data["portion_price"] != db_edition.portion_price
     for key, value in update_data.items():
         setattr(db_edition, key, value)
 
+    if price_changed:
+        # las ventas existentes pasan al precio nuevo en la misma transacción
+        changed = recompute_sale_totals(db, edition_id, db_edition.portion_price)
+        logger.info("Edición %s: portion_price actualizado, %s ventas recalculadas", edition_id, changed)
+
     db.commit()
     db.refresh(db_edition)
+    invalidate("editions", "sales", "edition_ingredients")
     return EditionRead.model_validate(db_edition)
 
 
+def recompute_edition_sale_totals(db: Session, edition_id: int) -> EditionRecomputeTotalsResponse:
+    """Recalcula total_amount de las ventas de la edición con su portion_price actual."""
+    db_edition = db.get(Edition, edition_id)
+    if db_edition is None:
+        raise HTTPException(status_code=404, detail="Edition not found")
+    if db_edition.portion_price is None:
+        raise HTTPException(status_code=400, detail="La edición no tiene portion_price definido")
+
+    changed = recompute_sale_totals(db, edition_id, db_edition.portion_price)
+    db.commit()
+    if changed:
+        invalidate("editions", "sales")
+    return EditionRecomputeTotalsResponse(edition_id=edition_id, sales_updated=changed)
+
+
 def delete_edition(db: Session, edition_id: int):
     db_edition = db.query(Edition).filter(Edition.id == edition_id).first()
     if db_edition is None:
@@ -192,4 +339,5 @@ def delete_edition(db: Session, edition_id: int):
 
     db.delete(db_edition)
     db.commit()
+    invalidate("editions", "sales", "edition_ingredients", "purchases")
     return EditionRead.model_validate(db_edition)
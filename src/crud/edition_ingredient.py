@@ -1,27 +1,50 @@
 # crud/edition_ingredient.py (adaptado)
 import logging
 from enum import Enum as PyEnum
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
 from datetime import datetime, timezone
 
-from sqlalchemy import func, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Numeric, cast, func, insert, literal, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, aliased, contains_eager
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from fastapi import HTTPException, status
 
 from models.edition_ingredient import EditionIngredient  # pylint: disable=import-error
 from models.edition import Edition  # pylint: disable=import-error
 from models.ingredient import Category, Ingredient  # pylint: disable=import-error
-from models.purchase import Purchase # pylint: disable=import-error
+from models.purchase import PaymentStatus, Purchase # pylint: disable=import-error
+from db.errors import UNIQUE_VIOLATION, integrity_details  # pylint: disable=import-error
+from db.session import begin_read_snapshot, transaction  # pylint: disable=import-error
+from core.config import settings  # pylint: disable=import-error
 from schemas.edition_ingredient import (  # pylint: disable=import-error
+    EditionIngredientBatchResponse,
     EditionIngredientCreate,
     EditionIngredientRead,
+    EditionIngredientRef,
     EditionIngredientListResponse,
     EditionIngredientUpdate,
 )
+from crud.loaders import load_options, parse_include, side_load  # pylint: disable=import-error
+from schemas.preview import EditionPreview, IngredientPreview, PurchasePreview  # pylint: disable=import-error
+from crud.pagination import TotalMode, apply_page, encode_cursor, page_meta, split_page  # pylint: disable=import-error
+from core.cache import invalidate  # pylint: disable=import-error
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# categoría (asc) y luego fecha (más nuevo primero); `id` desempata para el cursor
+EDITION_INGREDIENT_SORT_KEYS = [
+    (Ingredient.category, False),
+    (EditionIngredient.created_at, True),
+    (EditionIngredient.id, True),
+]
+
+# entidades que se pueden side-loadear con include=...
+EDITION_INGREDIENT_INCLUDES = ("ingredient", "edition", "purchase")
+
 def _round2(v: float) -> float:
     return round(float(v or 0.0), 2)
 
@@ -75,6 +98,43 @@ def _make_read_from_instance(instance: EditionIngredient) -> EditionIngredientRe
         return EditionIngredientRead.model_validate(payload)
 
 
+def _load_with_profile(session: Session, ei_id: int) -> Optional[EditionIngredient]:
+    """
+    Carga un EditionIngredient con el perfil de EditionIngredientRead
+    (ingredient, edition y purchase en la misma consulta).
+    populate_existing fuerza las opciones aunque la instancia ya esté en la sesión.
+    """
+    stmt = (
+        select(EditionIngredient)
+        .options(*load_options(EditionIngredientRead))
+        .where(EditionIngredient.id == ei_id)
+        .execution_options(populate_existing=True)
+    )
+    return session.execute(stmt).scalar_one_or_none()
+
+
+def _edition_ingredient_filters(
+    edition_id: Optional[int],
+    parsed_categories: Optional[List[Category]],
+    q: Optional[str],
+) -> list:
+    """Filtros del listado (requieren el join EditionIngredient -> Ingredient)."""
+    filters = []
+    if edition_id is not None:
+        filters.append(EditionIngredient.edition_id == edition_id)
+    if parsed_categories is not None:
+        filters.append(Ingredient.category.in_(parsed_categories))
+    if q:
+        term = f"%{q.strip()}%"
+        filters.append(
+            or_(
+                EditionIngredient.notes.ilike(term),
+                Ingredient.name.ilike(term)
+            )
+        )
+    return filters
+
+
 def _parse_categories_param(categories_param: Optional[str]) -> Optional[List[Category]]:
     """
     Convierte 'MEAT,VEGETABLES' -> [Category.MEAT, Category.VEGETABLES]
@@ -116,139 +176,160 @@ def get_edition_ingredients(
     q: Optional[str] = None,
     categories: Optional[str] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    total_mode: TotalMode = TotalMode.EXACT,
+    include: Optional[str] = None
 ) -> EditionIngredientListResponse:
     """
     Lista los ingredientes de ediciones (opcional: filtrar por edition_id).
     Busca por notes y por nombre del ingrediente si q está presente.
     Retorna totales por categoría y el total de gastos (purchases).
+    Conteo, totales por categoría, total de ingredientes y gastos salen de una
+    sola consulta con GROUPING SETS; las filas de una segunda, ambas en el
+    mismo snapshot de lectura.
     Resultados siempre ordenados por categoría y luego por fecha (más nuevo primero).
+    Con `cursor` pagina por keyset sobre ese mismo orden en lugar de offset.
+    total_mode: none oculta el total; exact/estimate devuelven el conteo exacto (sale gratis)
+    include: 'ingredient,purchase,edition' -> items solo con ids + mapas por entidad
     """
     try:
         parsed_categories = _parse_categories_param(categories)
+        includes = parse_include(include, EDITION_INGREDIENT_INCLUDES)
 
-        # Base query: tomamos EditionIngredient y cargamos relaciones útiles.
-        base_q = db.query(EditionIngredient).options(
-            joinedload(EditionIngredient.ingredient),
-            joinedload(EditionIngredient.edition),
-            joinedload(EditionIngredient.purchase),
-        )
-
-        # Necesitamos el join a Ingredient para buscar por nombre y ordenar por categoría.
-        base_q = base_q.join(Ingredient, Ingredient.id == EditionIngredient.ingredient_id)
-
-        # filtros comunes
-        if edition_id is not None:
-            base_q = base_q.filter(EditionIngredient.edition_id == edition_id)
-
-        if parsed_categories is not None:
-            base_q = base_q.filter(Ingredient.category.in_(parsed_categories))
-
-        if q:
-            term = f"%{q.strip()}%"
-            base_q = base_q.filter(
-                or_(
-                    EditionIngredient.notes.ilike(term),
-                    Ingredient.name.ilike(term)
-                )
-            )
-
-        # total count con distinct para evitar duplicados por joins
-        total = int(
-            base_q.with_entities(func.count(func.distinct(EditionIngredient.id))).scalar() or 0
-        )
+        filters = _edition_ingredient_filters(edition_id, parsed_categories, q)
 
-        # filas paginadas, ordenadas por categoría (asc) y luego por fecha (desc)
-        rows = (
-            base_q
-            .order_by(Ingredient.category.asc(), EditionIngredient.created_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
-        )
-
-        items = [_make_read_from_instance(r) for r in rows]
+        # Todas las consultas del listado leen el mismo snapshot: totales y filas consistentes.
+        begin_read_snapshot(db)
 
         # ---------------------------
-        # Totales por categoría
+        # Totales en una sola consulta:
+        #   filtered CTE -> GROUPING SETS ((category), ())
+        #   filas por categoría + fila "gran total" (grouping = 1) con el conteo,
+        #   y el total de gastos (purchases) como subconsulta escalar.
         # ---------------------------
-        cat_q = db.query(
-            Ingredient.category.label("category"),
-            func.coalesce(func.sum(EditionIngredient.subtotal), 0.0).label("total")
-        ).join(
-            Ingredient,
-            Ingredient.id == EditionIngredient.ingredient_id
+        filtered = (
+            select(
+                Ingredient.category.label("category"),
+                EditionIngredient.subtotal.label("subtotal"),
+            )
+            .select_from(EditionIngredient)
+            .join(Ingredient, Ingredient.id == EditionIngredient.ingredient_id)
+            .where(*filters)
+            .cte("filtered")
         )
-
-        # aplicar mismos filtros que en base_q
+        expenses_q = select(func.coalesce(func.sum(Purchase.total_amount), 0.0))
         if edition_id is not None:
-            cat_q = cat_q.filter(EditionIngredient.edition_id == edition_id)
-        if parsed_categories is not None:
-            cat_q = cat_q.filter(Ingredient.category.in_(parsed_categories))
-        if q:
-            # reutilizamos el mismo término de búsqueda
-            cat_q = cat_q.filter(
-                or_(
-                    EditionIngredient.notes.ilike(term),
-                    Ingredient.name.ilike(term)
-                )
+            expenses_q = expenses_q.where(Purchase.edition_id == edition_id)
+        # sin GROUPING SETS (SQLite) se agrupa solo por categoría y el gran
+        # total se suma acá; la subconsulta de gastos repite el mismo valor
+        grouping_sets = db.get_bind().dialect.name == "postgresql"
+        is_grand = func.grouping(filtered.c.category) if grouping_sets else literal(0)
+        totals_stmt = (
+            select(
+                filtered.c.category,
+                is_grand.label("is_grand"),
+                func.count().label("n"),  # pylint: disable=not-callable
+                func.coalesce(func.sum(filtered.c.subtotal), 0.0).label("total"),
+                expenses_q.scalar_subquery().label("expenses"),
             )
+            .group_by(
+                func.grouping_sets(tuple_(filtered.c.category), tuple_())
+                if grouping_sets else filtered.c.category
+            )
+            .order_by(is_grand, filtered.c.category.asc())
+        )
 
-        cat_q = cat_q.group_by(Ingredient.category).order_by(Ingredient.category.asc())
-        cat_rows = cat_q.all()
-
-        # normalizar a lista de dicts
         category_totals = []
-        for cat, tot in cat_rows:
-            if isinstance(cat, PyEnum):
-                label = cat.value
-            else:
-                label = str(cat)
+        matched = ingredients_total = 0
+        total_expenses = None
+        for cat, grand, n, tot, expenses in db.execute(totals_stmt).all():
+            if grand:
+                matched = int(n or 0)
+                ingredients_total = float(tot or 0.0)
+                total_expenses = float(expenses or 0.0)
+                continue
+            label = cat.value if isinstance(cat, PyEnum) else str(cat)
             category_totals.append({"category": label, "total": float(tot or 0.0)})
+            if not grouping_sets:
+                matched += int(n or 0)
+                ingredients_total += float(tot or 0.0)
+                total_expenses = float(expenses or 0.0)
+        if total_expenses is None:
+            # ningún ingrediente coincide: sin filas de grupo, pero los gastos igual cuentan
+            total_expenses = float(db.execute(expenses_q).scalar_one() or 0.0)
+
+        # el conteo sale gratis del gran total; total_mode=none lo sigue ocultando
+        total = None if total_mode == TotalMode.NONE else matched
 
         # ---------------------------
-        # Total de subtotales (ingredientes)
+        # Filas de la página (las relaciones se cargan solo sobre estas)
         # ---------------------------
-        total_sub_q = db.query(func.coalesce(func.sum(EditionIngredient.subtotal), 0.0)).join(
-            Ingredient, Ingredient.id == EditionIngredient.ingredient_id
+        # Necesitamos el join a Ingredient para buscar por nombre y ordenar por categoría.
+        base_q = (
+            db.query(EditionIngredient)
+            .join(Ingredient, Ingredient.id == EditionIngredient.ingredient_id)
+            .filter(*filters)
         )
-        if edition_id is not None:
-            total_sub_q = total_sub_q.filter(EditionIngredient.edition_id == edition_id)
-        if parsed_categories is not None:
-            total_sub_q = total_sub_q.filter(Ingredient.category.in_(parsed_categories))
-        if q:
-            total_sub_q = total_sub_q.filter(
-                or_(
-                    EditionIngredient.notes.ilike(term),
-                    Ingredient.name.ilike(term)
-                )
+
+        if includes is None:
+            rows_q = base_q.options(*load_options(EditionIngredientRead))
+        else:
+            # el ingredient ya viene en el join: se reutiliza sin consulta extra
+            rows_q = base_q.options(
+                contains_eager(EditionIngredient.ingredient),
+                *load_options(EditionIngredientRef),
             )
-        ingredients_total = float(total_sub_q.scalar() or 0.0)
 
-        # ---------------------------
-        # Total de gastos (purchases)
-        # ---------------------------
-        expenses_q = db.query(func.coalesce(func.sum(Purchase.total_amount), 0.0))
-        if edition_id is not None:
-            expenses_q = expenses_q.filter(Purchase.edition_id == edition_id)
-        total_expenses = float(expenses_q.scalar() or 0.0)
+        # filas paginadas, ordenadas por categoría (asc) y luego por fecha (desc)
+        rows, has_more = split_page(
+            apply_page(
+                rows_q, EDITION_INGREDIENT_SORT_KEYS, limit=limit, offset=offset, cursor=cursor
+            ).all(),
+            limit,
+        )
+
+        side = {}
+        if includes is None:
+            items = [_make_read_from_instance(r) for r in rows]
+        else:
+            items = [EditionIngredientRef.model_validate(r) for r in rows]
+            if "ingredient" in includes:
+                side["ingredients"] = {
+                    r.ingredient.id: IngredientPreview.model_validate(r.ingredient) for r in rows
+                }
+            if "edition" in includes:
+                side["editions"] = side_load(
+                    db, Edition, EditionPreview, (r.edition_id for r in rows)
+                )
+            if "purchase" in includes:
+                side["purchases"] = side_load(
+                    db, Purchase, PurchasePreview, (r.purchase_id for r in rows)
+                )
 
         # ---------------------------
         # construir respuesta
         # ---------------------------
-        next_offset = offset + limit if (offset + limit) < total else None
-        prev_offset = offset - limit if (offset - limit) >= 0 else None
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor([last.ingredient.category, last.created_at, last.id])
 
         return EditionIngredientListResponse(
             items=items,
-            total=int(total),
-            limit=limit,
-            offset=offset,
-            next_offset=next_offset,
-            prev_offset=prev_offset,
+            **page_meta(
+                total=total,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                has_more=has_more,
+                page_size=len(items),
+                next_cursor=next_cursor,
+            ),
             category_totals=category_totals,
             ingredients_total=ingredients_total,
-            total_expenses=total_expenses
+            total_expenses=total_expenses,
+            **side,
         )
 
     except SQLAlchemyError:
@@ -256,22 +337,194 @@ def get_edition_ingredients(
         raise HTTPException(status_code=500, detail="Error de base de datos al listar edition_ingredients")
 
 
-def get_edition_ingredient(db: Session, ei_id: int) -> EditionIngredientRead:
-    ei = (
-        db.query(EditionIngredient)
-        .options(
-            joinedload(EditionIngredient.ingredient),
-            joinedload(EditionIngredient.edition),
-            joinedload(EditionIngredient.purchase),
-        )
-        .filter(EditionIngredient.id == ei_id)
-        .first()
+def get_edition_ingredients_version(db: Session, edition_id: int) -> tuple:
+    """
+    Versión barata del listado de ingredientes de una edición (para ETag): cantidad
+    de filas y último updated_at de las filas, sus ingredientes, sus compras y la
+    edición, en una sola consulta. Retorna (version, last_modified).
+
+    total_expenses suma todas las compras de la edición, no solo las que apunta
+    purchase_id (con `sum` cada alta lo mueve a la compra nueva, y borrar una
+    compra lo pone en NULL sin tocar updated_at): cantidad y último updated_at
+    de purchase WHERE edition_id también entran en la versión.
+    """
+    edition_updated = select(Edition.updated_at).where(Edition.id == edition_id).scalar_subquery()
+    # alias: sin él las subconsultas se correlacionan con el Purchase del join
+    edition_purchase = aliased(Purchase)
+    purchases_updated = (
+        select(func.max(edition_purchase.updated_at))
+        .where(edition_purchase.edition_id == edition_id)
+        .scalar_subquery()
     )
+    purchases_count = (
+        select(func.count(edition_purchase.id))  # pylint: disable=not-callable
+        .where(edition_purchase.edition_id == edition_id)
+        .scalar_subquery()
+    )
+    row = db.execute(
+        select(
+            func.count(EditionIngredient.id),  # pylint: disable=not-callable
+            func.max(EditionIngredient.updated_at),
+            func.max(Ingredient.updated_at),
+            func.max(Purchase.updated_at),
+            edition_updated,
+            purchases_updated,
+            purchases_count,
+        )
+        .select_from(EditionIngredient)
+        .join(Ingredient, Ingredient.id == EditionIngredient.ingredient_id)
+        .outerjoin(Purchase, Purchase.id == EditionIngredient.purchase_id)
+        .where(EditionIngredient.edition_id == edition_id)
+    ).one()
+    stamps = [ts for ts in row[1:-1] if ts is not None]
+    return tuple(row), max(stamps) if stamps else None
+
+
+def get_edition_ingredient(db: Session, ei_id: int) -> EditionIngredientRead:
+    ei = _load_with_profile(db, ei_id)
     if ei is None:
         raise HTTPException(status_code=404, detail="EditionIngredient not found")
     return _make_read_from_instance(ei)
 
 
+def _ei_insert(session: Session):
+    # INSERT ... ON CONFLICT del dialecto (Postgres; SQLite para desarrollo local)
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite_insert(EditionIngredient)
+    return pg_insert(EditionIngredient)
+
+
+def _accumulate(
+    session: Session,
+    edition: Edition,
+    ingredient: Ingredient,
+    quantity: float,
+    unit_price: float,
+    notes: Optional[str],
+    *,
+    keep_unit_price: bool,
+) -> EditionIngredientRead:
+    """
+    Estrategia `sum`: registra la compra y acumula cantidad/subtotal en
+    edition_ingredient con un único INSERT ... ON CONFLICT (edition_id,
+    ingredient_id) DO UPDATE. La suma la hace la base sobre la fila vigente,
+    así que compras concurrentes del mismo ingrediente no se pisan ni esperan
+    un SELECT ... FOR UPDATE (solo el lock de fila del propio UPDATE, hasta el commit).
+
+    En Postgres la compra va como CTE del mismo statement (un round-trip);
+    en SQLite son dos statements en la misma transacción. La respuesta se arma
+    con el RETURNING y las entidades ya validadas, sin volver a consultar.
+    """
+    now = datetime.now(timezone.utc)
+    subtotal = _compute_subtotal(quantity, unit_price)
+    purchase_values = dict(
+        ingredient_id=ingredient.id,
+        edition_id=edition.id,
+        purchased_at=now,
+        quantity=quantity,
+        unit_price=unit_price,
+        payment_status=PaymentStatus.PENDING,
+        total_amount=subtotal,
+        created_at=now,
+        updated_at=now,
+    )
+    purchase_insert = insert(Purchase).values(**purchase_values).returning(Purchase.id)
+
+    stmt = _ei_insert(session)
+    if session.get_bind().dialect.name == "postgresql":
+        new_purchase = purchase_insert.cte("new_purchase")
+        purchase_id = select(new_purchase.c.id).scalar_subquery()
+        stmt = stmt.add_cte(new_purchase)
+    else:
+        purchase_id = session.execute(purchase_insert).scalar_one()
+
+    stmt = stmt.values(
+        edition_id=edition.id,
+        ingredient_id=ingredient.id,
+        quantity=quantity,
+        unit_price=unit_price,
+        subtotal=subtotal,
+        notes=notes,
+        purchase_id=purchase_id,
+        created_at=now,
+        updated_at=now,
+    )
+    excluded = stmt.excluded
+    set_ = {
+        "quantity": EditionIngredient.quantity + excluded.quantity,
+        "subtotal": func.round(cast(EditionIngredient.subtotal + excluded.subtotal, Numeric), 2),
+        # notas vacías no borran las anteriores
+        "notes": func.coalesce(func.nullif(excluded.notes, ""), EditionIngredient.notes),
+        "purchase_id": excluded.purchase_id,
+        "updated_at": excluded.updated_at,
+    }
+    if not keep_unit_price:
+        set_["unit_price"] = excluded.unit_price
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EditionIngredient.edition_id, EditionIngredient.ingredient_id],
+        set_=set_,
+    ).returning(
+        EditionIngredient.id,
+        EditionIngredient.ingredient_id,
+        EditionIngredient.quantity,
+        EditionIngredient.unit_price,
+        EditionIngredient.subtotal,
+        EditionIngredient.notes,
+        EditionIngredient.purchase_id,
+        EditionIngredient.created_at,
+    )
+    row = session.execute(stmt).one()
+
+    return EditionIngredientRead(
+        id=row.id,
+        ingredient_id=row.ingredient_id,
+        quantity=row.quantity,
+        unit_price=row.unit_price,
+        subtotal=row.subtotal,
+        notes=row.notes,
+        created_at=row.created_at,
+        ingredient=IngredientPreview.model_validate(ingredient),
+        edition=EditionPreview.model_validate(edition),
+        purchase=PurchasePreview(id=row.purchase_id, **{
+            k: purchase_values[k]
+            for k in ("ingredient_id", "quantity", "unit_price", "total_amount", "purchased_at", "payment_status")
+        }),
+    )
+
+
+def _write(db: Session, work: Callable[[Session], T], *, retry_on_conflict: bool = False) -> T:
+    """
+    Corre `work(db)` en db.session.transaction y traduce los errores de base a
+    HTTPException. Commit e invalidación del cache solo si la transacción es
+    nuestra; dentro de la del caller queda en un SAVEPOINT y commitea él.
+
+    retry_on_conflict: si `work` choca con una fila que otra transacción
+    insertó y commiteó después de nuestro SELECT (unique violation), se deshace
+    la transacción (o el SAVEPOINT) y se corre `work` una vez más, que ya la ve.
+    """
+    owns_transaction = not db.in_transaction()
+    try:
+        try:
+            with transaction(db):
+                result = work(db)
+        except IntegrityError as e:
+            if not retry_on_conflict or integrity_details(e)[0] != UNIQUE_VIOLATION:
+                raise
+            logger.info("Alta concurrente del mismo ingrediente; se reintenta: %s", e.orig)
+            with transaction(db):
+                result = work(db)
+    except IntegrityError as e:
+        logger.exception("IntegrityError: %s", e)
+        if integrity_details(e)[0] == UNIQUE_VIOLATION:
+            raise HTTPException(status_code=409, detail="Conflict (unique violation)")
+        raise HTTPException(status_code=400, detail="Integrity error")
+    except SQLAlchemyError as e:
+        logger.exception("DB error: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
+    if owns_transaction:
+        invalidate("edition_ingredients", "editions", "purchases")
+    return result
+
 
 def create_edition_ingredient(
     db: Session,
@@ -279,38 +532,42 @@ def create_edition_ingredient(
     payload: EditionIngredientCreate,
     *,
     strategy: str = "sum",         # "sum" | "replace" | "nothing"
-    autonomous: bool = True        # si True abre SU propia sesión y commitea
 ) -> EditionIngredientRead:
     """
-    Crea purchase + edition_ingredient con control de transacción flexible.
-
-    - Si autonomous=True: abre su propia Session/transaction (commit garantizado aquí).
-      Útil para endpoints HTTP donde querés que la operación quede persistida aunque
-      la Session del caller tenga transacciones abiertas.
-    - Si autonomous=False: intenta usar la Session `db` provista. Si ya hay transacción,
-      usa SAVEPOINT (db.begin_nested()). En este modo NO hace commit final (lo hace el caller).
+    Crea purchase + edition_ingredient de forma atómica sobre la conexión de `db`
+    (ver db.session.transaction); no abre una segunda sesión, así que un request
+    ocupa una sola conexión del pool.
+
+    - Si `db` no tiene transacción en curso (el caso de las rutas): BEGIN ... COMMIT
+      acá mismo, e invalida el cache.
+    - Si ya hay una transacción abierta: corre en un SAVEPOINT y NO hace commit;
+      el caller commitea (e invalida) cuando cierra su transacción.
     """
-    # 1) Validaciones rápidas (fuera de la transacción)
-    edition = db.get(Edition, edition_id)
-    if edition is None:
-        raise HTTPException(status_code=404, detail="Edition not found")
-    ingredient = db.get(Ingredient, payload.ingredient_id)
-    if ingredient is None:
-        raise HTTPException(status_code=404, detail="Ingredient not found")
-
     qty_new = float(payload.quantity or 0.0)
-    unit_price_new = (
-        float(payload.unit_price)
-        if getattr(payload, "unit_price", None) is not None
-        else float(ingredient.unit_price or 0.0)
-    )
     notes = getattr(payload, "notes", None)
 
     def _do_work(session: Session) -> EditionIngredientRead:
         """
         Ejecuta la lógica de DB usando la Session `session` (que ya está en un contexto transaction).
         """
-        # bloquear fila existente para concurrencia
+        edition = session.get(Edition, edition_id)
+        if edition is None:
+            raise HTTPException(status_code=404, detail="Edition not found")
+        ingredient = session.get(Ingredient, payload.ingredient_id)
+        if ingredient is None:
+            raise HTTPException(status_code=404, detail="Ingredient not found")
+        unit_price_new = (
+            float(payload.unit_price)
+            if getattr(payload, "unit_price", None) is not None
+            else float(ingredient.unit_price or 0.0)
+        )
+
+        # sum (por defecto): upsert acumulativo atómico, sin SELECT ... FOR UPDATE
+        if strategy not in ("replace", "nothing"):
+            return _accumulate(session, edition, ingredient, qty_new, unit_price_new, notes,
+                               keep_unit_price=getattr(payload, "unit_price", None) is None)
+
+        # bloquear fila existente para concurrencia (replace/nothing)
         existing: Optional[EditionIngredient] = (
             session.query(EditionIngredient)
             .filter(
@@ -351,15 +608,7 @@ def create_edition_ingredient(
             )
             session.add(ei)
             session.flush()
-            ei = (
-                session.query(EditionIngredient)
-                .options(
-                    joinedload(EditionIngredient.ingredient),
-                    joinedload(EditionIngredient.edition),
-                    joinedload(EditionIngredient.purchase),
-                )
-                .get(ei.id)
-            )
+            ei = _load_with_profile(session, ei.id)
             return EditionIngredientRead.model_validate(ei)
 
         # Existe y estrategia nothing
@@ -367,103 +616,161 @@ def create_edition_ingredient(
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Ingredient already added to this edition")
 
         # strategy replace
-        if strategy == "replace":
-            purchase = _create_purchase(qty_new, unit_price_new)
-            existing.quantity = qty_new
-            existing.unit_price = unit_price_new
-            existing.subtotal = _compute_subtotal(qty_new, unit_price_new)
-            existing.notes = notes
-            existing.purchase_id = purchase.id
-            existing.updated_at = datetime.now(timezone.utc)
-            session.add(existing)
-            session.flush()
-            existing = (
-                session.query(EditionIngredient)
-                .options(
-                    joinedload(EditionIngredient.ingredient),
-                    joinedload(EditionIngredient.edition),
-                    joinedload(EditionIngredient.purchase),
-                )
-                .get(existing.id)
-            )
-            return EditionIngredientRead.model_validate(existing)
-
-        # strategy sum (acumular)
         purchase = _create_purchase(qty_new, unit_price_new)
-        prev_qty = float(existing.quantity or 0.0)
-        prev_sub = float(existing.subtotal or 0.0)
-        add_sub = _compute_subtotal(qty_new, unit_price_new)
-
-        existing.quantity = prev_qty + qty_new
-        if getattr(payload, "unit_price", None) is not None:
-            existing.unit_price = unit_price_new
-        existing.subtotal = _round2(prev_sub + add_sub)
-        existing.notes = notes or existing.notes
+        existing.quantity = qty_new
+        existing.unit_price = unit_price_new
+        existing.subtotal = _compute_subtotal(qty_new, unit_price_new)
+        existing.notes = notes
         existing.purchase_id = purchase.id
         existing.updated_at = datetime.now(timezone.utc)
         session.add(existing)
         session.flush()
+        existing = _load_with_profile(session, existing.id)
+        return EditionIngredientRead.model_validate(existing)
 
-        existing = (
-            session.query(EditionIngredient)
-            .options(
-                joinedload(EditionIngredient.ingredient),
-                joinedload(EditionIngredient.edition),
-                joinedload(EditionIngredient.purchase),
+    return _write(db, _do_work)
+
+
+def create_edition_ingredients_batch(
+    db: Session,
+    edition_id: int,
+    items: Sequence[EditionIngredientCreate],
+    *,
+    strategy: str = "sum",
+) -> EditionIngredientBatchResponse:
+    """
+    Agrega varios ingredientes a una edición en una sola transacción (todo o nada),
+    con la misma semántica que llamar create_edition_ingredient ítem por ítem:
+    una compra por ítem, y los ítems repetidos del mismo ingrediente se aplican
+    en orden según `strategy`.
+
+    Consultas fijas por lote: edición, ingredientes (un IN), filas existentes
+    bloqueadas FOR UPDATE en orden de ingredient_id (dos lotes concurrentes las
+    toman en el mismo orden: sin deadlocks), INSERT multi-fila de compras y de
+    filas nuevas, UPDATE por id de las existentes y una sola recarga. Si otra
+    transacción crea una de las filas nuevas en el medio, el lote se reintenta
+    una vez sobre la fila ya existente (ver _write).
+    """
+    if len(items) > settings.edition_ingredient_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.edition_ingredient_batch_max_items} ingredientes por pedido",
+        )
+    ingredient_ids = sorted({item.ingredient_id for item in items})
+
+    def _do_work(session: Session) -> EditionIngredientBatchResponse:
+        edition = session.get(Edition, edition_id)
+        if edition is None:
+            raise HTTPException(status_code=404, detail="Edition not found")
+        prices = dict(session.execute(
+            select(Ingredient.id, Ingredient.unit_price).where(Ingredient.id.in_(ingredient_ids))
+        ).all())
+        missing = [i for i in ingredient_ids if i not in prices]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Ingredients not found: {missing}")
+
+        locked = session.execute(
+            select(
+                EditionIngredient.id,
+                EditionIngredient.ingredient_id,
+                EditionIngredient.quantity,
+                EditionIngredient.unit_price,
+                EditionIngredient.subtotal,
+                EditionIngredient.notes,
             )
-            .get(existing.id)
+            .where(
+                EditionIngredient.edition_id == edition_id,
+                EditionIngredient.ingredient_id.in_(ingredient_ids),
+            )
+            .order_by(EditionIngredient.ingredient_id)
+            .with_for_update(of=EditionIngredient)
+        ).all()
+        rows: Dict[int, dict] = {}
+        for r in locked:
+            rows[r.ingredient_id] = {
+                "id": r.id, "quantity": float(r.quantity or 0.0), "unit_price": r.unit_price,
+                "subtotal": float(r.subtotal or 0.0), "notes": r.notes,
+            }
+        existing_ids = set(rows)
+
+        now = datetime.now(timezone.utc)
+        purchases: List[dict] = []
+        touched: Dict[int, dict] = {}  # orden de aparición en el pedido
+        for item in items:
+            iid = item.ingredient_id
+            qty = float(item.quantity or 0.0)
+            unit_price = float(item.unit_price) if item.unit_price is not None else float(prices[iid] or 0.0)
+            subtotal = _compute_subtotal(qty, unit_price)
+            purchases.append({
+                "ingredient_id": iid,
+                "edition_id": edition_id,
+                "purchased_at": now,
+                "quantity": qty,
+                "unit_price": unit_price,
+                "payment_status": PaymentStatus.PENDING,
+                "total_amount": subtotal,
+            })
+            purchase = len(purchases) - 1
+
+            row = rows.get(iid)
+            if row is None:
+                rows[iid] = {"id": None, "quantity": qty, "unit_price": unit_price, "subtotal": subtotal,
+                             "notes": item.notes, "purchase": purchase}
+            elif strategy == "nothing":
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                    detail=f"Ingredient {iid} already added to this edition")
+            elif strategy == "replace":
+                row.update(quantity=qty, unit_price=unit_price, subtotal=subtotal, notes=item.notes, purchase=purchase)
+            else:
+                row["quantity"] += qty
+                if item.unit_price is not None:
+                    row["unit_price"] = unit_price
+                row["subtotal"] = _round2(row["subtotal"] + subtotal)
+                row["notes"] = item.notes or row["notes"]
+                row["purchase"] = purchase
+            touched.setdefault(iid, rows[iid])
+
+        purchase_ids = session.execute(
+            insert(Purchase).returning(Purchase.id, sort_by_parameter_order=True), purchases
+        ).scalars().all()
+
+        def _values(row: dict) -> dict:
+            return {
+                "quantity": row["quantity"], "unit_price": row["unit_price"], "subtotal": row["subtotal"],
+                "notes": row["notes"], "purchase_id": purchase_ids[row["purchase"]], "updated_at": now,
+            }
+
+        new = [(iid, row) for iid, row in touched.items() if iid not in existing_ids]
+        if new:
+            new_ids = session.execute(
+                insert(EditionIngredient).returning(EditionIngredient.id, sort_by_parameter_order=True),
+                [{"edition_id": edition_id, "ingredient_id": iid, "created_at": now, **_values(row)} for iid, row in new],
+            ).scalars().all()
+            for (_, row), ei_id in zip(new, new_ids):
+                row["id"] = ei_id
+        updated = [{"id": row["id"], **_values(row)} for iid, row in touched.items() if iid in existing_ids]
+        if updated:
+            session.execute(update(EditionIngredient), updated)
+
+        loaded = {
+            ei.id: ei
+            for ei in session.execute(
+                select(EditionIngredient)
+                .options(*load_options(EditionIngredientRead))
+                .where(EditionIngredient.id.in_([row["id"] for row in touched.values()]))
+                .execution_options(populate_existing=True)
+            ).unique().scalars()
+        }
+        return EditionIngredientBatchResponse(
+            created=len(new),
+            updated=len(updated),
+            purchases=len(purchase_ids),
+            items=[EditionIngredientRead.model_validate(loaded[row["id"]]) for row in touched.values()],
         )
-        return EditionIngredientRead.model_validate(existing)
 
-    # -------------------------------------
-    # flujo de transacciones según autonomous y estado del `db`
-    # -------------------------------------
-    # Si el caller pidió que la función sea autónoma, abrimos NUESTRA sesión/transaction
-    if autonomous:
-        # crear una nueva Session ligada al mismo engine/connection
-        bind = db.get_bind()
-        # SessionType es sqlalchemy.orm.Session
-        new_sess = Session(bind=bind)
-        try:
-            with new_sess.begin():
-                result = _do_work(new_sess)
-                # commit se realiza al salir del with
-                return result
-        except IntegrityError as e:
-            new_sess.rollback()
-            pgcode = getattr(getattr(e, "orig", None), "pgcode", None)
-            logger.exception("IntegrityError (autonomous): %s", e)
-            if pgcode == "23505":
-                raise HTTPException(status_code=409, detail="Conflict (unique violation)")
-            raise HTTPException(status_code=400, detail="Integrity error")
-        except SQLAlchemyError as e:
-            new_sess.rollback()
-            logger.exception("DB error (autonomous): %s", e)
-            raise HTTPException(status_code=500, detail="Database error")
-        finally:
-            new_sess.close()
-
-    # Si no es autónoma: operar sobre la Session `db` provista
-    # Si ya hay una transacción abierta, usar SAVEPOINT (begin_nested)
-    try:
-        if db.in_transaction():
-            # usar savepoint; el caller debe hacer commit del outer transaction
-            with db.begin_nested():
-                return _do_work(db)
-        else:
-            # abrir una transacción normal en la session provista
-            with db.begin():
-                return _do_work(db)
-    except IntegrityError as e:
-        # mapear errores
-        pgcode = getattr(getattr(e, "orig", None), "pgcode", None)
-        logger.exception("IntegrityError (non-autonomous): %s", e)
-        if pgcode == "23505":
-            raise HTTPException(status_code=409, detail="Conflict (unique violation)")
-        raise HTTPException(status_code=400, detail="Integrity error")
-    except SQLAlchemyError as e:
-        logger.exception("DB error (non-autonomous): %s", e)
-        raise HTTPException(status_code=500, detail="Database error")
+    # un alta concurrente puede insertar una de las filas "nuevas" entre el
+    # SELECT ... FOR UPDATE y el INSERT: el reintento la encuentra y la bloquea
+    return _write(db, _do_work, retry_on_conflict=True)
 
 
 def update_edition_ingredient(db: Session, id: int, payload: EditionIngredientUpdate):
@@ -480,16 +787,17 @@ def update_edition_ingredient(db: Session, id: int, payload: EditionIngredientUp
         db_ei.compute_subtotal()
 
     db.commit()
-    db.refresh(db_ei)
-    return _make_read_from_instance(db_ei)
+    invalidate("edition_ingredients", "editions")
+    return _make_read_from_instance(_load_with_profile(db, id))
 
 
 def delete_edition_ingredient(db: Session, ei_id: int):
-    db_ei = db.query(EditionIngredient).filter(EditionIngredient.id == ei_id).first()
+    db_ei = _load_with_profile(db, ei_id)
     if db_ei is None:
         raise HTTPException(status_code=404, detail="EditionIngredient not found")
 
     result = _make_read_from_instance(db_ei)
     db.delete(db_ei)
     db.commit()
+    invalidate("edition_ingredients", "editions")
     return result
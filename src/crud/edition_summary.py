@@ -0,0 +1,126 @@
+"""
+Mantenimiento de edition_summary.
+
+Los triggers de Postgres mantienen la tabla al día en cada escritura de sale y
+edition_ingredient; este módulo ofrece lo que los triggers no cubren:
+  - los agregados "en vivo" (fuente de verdad) sobre las tablas base,
+  - reconstruir la tabla completa desde esos agregados,
+  - verificar que la tabla coincide con los agregados.
+"""
+import logging
+from typing import List, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models.edition import Edition  # pylint: disable=import-error
+from models.edition_ingredient import EditionIngredient  # pylint: disable=import-error
+from models.edition_summary import EditionSummary  # pylint: disable=import-error
+from models.sale import Sale  # pylint: disable=import-error
+
+logger = logging.getLogger(__name__)
+
+
+def live_aggregates():
+    """
+    Subqueries (sales_subq, costs_subq) con SUM(total_portions) y SUM(subtotal)
+    agrupados por edition_id, calculados sobre las tablas base.
+    """
+    sales_subq = (
+        select(
+            Sale.edition_id.label("edition_id"),
+            func.coalesce(func.sum(Sale.total_portions), 0).label("sales_count"),
+        )
+        .group_by(Sale.edition_id)
+        .subquery()
+    )
+
+    costs_subq = (
+        select(
+            EditionIngredient.edition_id.label("edition_id"),
+            func.coalesce(func.sum(EditionIngredient.subtotal), 0).label("edition_costs"),
+        )
+        .group_by(EditionIngredient.edition_id)
+        .subquery()
+    )
+    return sales_subq, costs_subq
+
+
+def _live_rows_stmt(edition_id: Optional[int] = None):
+    sales_subq, costs_subq = live_aggregates()
+    stmt = (
+        select(
+            Edition.id.label("edition_id"),
+            func.coalesce(sales_subq.c.sales_count, 0).label("sales_count"),
+            func.coalesce(costs_subq.c.edition_costs, 0.0).label("edition_costs"),
+        )
+        .outerjoin(sales_subq, sales_subq.c.edition_id == Edition.id)
+        .outerjoin(costs_subq, costs_subq.c.edition_id == Edition.id)
+    )
+    if edition_id is not None:
+        stmt = stmt.where(Edition.id == edition_id)
+    return stmt
+
+
+def rebuild_edition_summaries(db: Session, edition_id: Optional[int] = None) -> int:
+    """
+    Recalcula edition_summary desde sale/edition_ingredient y hace commit.
+    Bloquea escrituras sobre las tablas base (SHARE MODE, las lecturas siguen)
+    mientras dura, para que ningún trigger concurrente se pierda entre el
+    cálculo y el upsert. Devuelve la cantidad de ediciones escritas.
+    """
+    db.execute(text("LOCK TABLE sale, edition_ingredient IN SHARE MODE"))
+
+    live = _live_rows_stmt(edition_id).subquery()
+    stmt = pg_insert(EditionSummary).from_select(
+        ["edition_id", "sales_count", "edition_costs", "updated_at"],
+        select(live.c.edition_id, live.c.sales_count, live.c.edition_costs, func.now()),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EditionSummary.edition_id],
+        set_={
+            "sales_count": stmt.excluded.sales_count,
+            "edition_costs": stmt.excluded.edition_costs,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    result = db.execute(stmt)
+    db.commit()
+    logger.info("edition_summary reconstruida: %s ediciones", result.rowcount)
+    return result.rowcount
+
+
+def check_edition_summaries(db: Session, tolerance: float = 0.01) -> List[dict]:
+    """
+    Compara edition_summary contra los agregados en vivo.
+    Devuelve una lista de diferencias (vacía si todo coincide); una edición sin
+    fila en edition_summary cuenta como ceros.
+    """
+    live = _live_rows_stmt().subquery()
+    stmt = (
+        select(
+            live.c.edition_id,
+            live.c.sales_count,
+            live.c.edition_costs,
+            func.coalesce(EditionSummary.sales_count, 0).label("stored_sales_count"),
+            func.coalesce(EditionSummary.edition_costs, 0.0).label("stored_edition_costs"),
+        )
+        .outerjoin(EditionSummary, EditionSummary.edition_id == live.c.edition_id)
+        .order_by(live.c.edition_id)
+    )
+
+    mismatches = []
+    for row in db.execute(stmt).all():
+        if (
+            int(row.sales_count) != int(row.stored_sales_count)
+            or abs(float(row.edition_costs) - float(row.stored_edition_costs)) > tolerance
+        ):
+            mismatches.append({
+                "edition_id": row.edition_id,
+                "sales_count": int(row.sales_count),
+                "stored_sales_count": int(row.stored_sales_count),
+                "edition_costs": float(row.edition_costs),
+                "stored_edition_costs": float(row.stored_edition_costs),
+            })
+    return mismatches
@@ -0,0 +1,549 @@
+"""
+Importación masiva de customers / ingredients / purchases desde CSV o NDJSON.
+
+Pipeline, con memoria acotada a un lote de settings.import_batch_size filas:
+  1. lectura en streaming del archivo (csv.DictReader / una línea JSON por vez),
+  2. validación del lote con los schemas de alta (CustomerCreate, IngredientCreate,
+     PurchaseCreate); las filas inválidas se cuentan y se informan por línea,
+  3. carga del lote en una tabla temporal de staging con COPY (Postgres; en
+     otros motores un INSERT multi-fila),
+  4. merge staging -> tabla final con semántica de upsert:
+       - customer: la fila actualiza al cliente con el mismo email, si no al del
+         mismo teléfono; el resto se inserta,
+       - ingredient: INSERT ... ON CONFLICT (name) DO UPDATE,
+       - purchase: no tiene clave única, solo altas; total_amount = quantity * unit_price
+         y se descartan las filas con ingredient_id inexistente,
+  5. commit por lote y actualización del progreso.
+
+Dentro de un lote gana la última fila de cada clave (email/teléfono, name); entre
+lotes también, porque se mergean en orden. Si el merge de un lote falla (ej. un
+email que ya usa otro cliente) se revierte ese lote y sus filas cuentan como
+`failed`; los lotes anteriores quedan confirmados.
+
+Las importaciones corren en hilos (`import_jobs`) y se consultan por id
+(api/routes/imports.py); también se pueden correr desde la línea de comandos
+(commands/import_data.py).
+"""
+import codecs
+import csv
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.cache import invalidate  # pylint: disable=import-error
+from core.config import settings  # pylint: disable=import-error
+from crud.customer_autocomplete import customer_index  # pylint: disable=import-error
+from models.customer import Customer  # pylint: disable=import-error
+from models.ingredient import Ingredient  # pylint: disable=import-error
+from models.purchase import Purchase  # pylint: disable=import-error
+from schemas.customer import CustomerCreate  # pylint: disable=import-error
+from schemas.ingredient import IngredientCreate  # pylint: disable=import-error
+from schemas.purchase import PurchaseCreate  # pylint: disable=import-error
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+
+Row = Tuple[int, dict]  # (línea del archivo, campos validados)
+
+
+# ---------------------------------------------------------------------------
+# lectura
+# ---------------------------------------------------------------------------
+def _read_csv(stream: IO[bytes]) -> Iterator[Tuple[int, Any]]:
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text_stream)
+    for record in reader:
+        # en CSV una celda vacía es "sin dato"
+        yield reader.line_num, {k: (v if v != "" else None) for k, v in record.items() if k is not None}
+
+
+def _read_ndjson(stream: IO[bytes]) -> Iterator[Tuple[int, Any]]:
+    decoder = codecs.getreader("utf-8-sig")(stream)
+    for line_num, line in enumerate(decoder, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except ValueError as exc:
+            yield line_num, _BadRecord(f"JSON inválido: {exc}")
+
+
+class _BadRecord:
+    def __init__(self, detail: str) -> None:
+        self.detail = detail
+
+
+READERS: Dict[str, Callable[[IO[bytes]], Iterator[Tuple[int, Any]]]] = {
+    "csv": _read_csv,
+    "ndjson": _read_ndjson,
+}
+
+
+# ---------------------------------------------------------------------------
+# staging + merge
+# ---------------------------------------------------------------------------
+def _dialect_insert(conn: Connection, table: Table):
+    # INSERT ... ON CONFLICT del dialecto (Postgres; SQLite para desarrollo local)
+    if conn.dialect.name == "sqlite":
+        return sqlite_insert(table)
+    return pg_insert(table)
+
+
+def _dedupe_customers(rows: List[Row]) -> Tuple[List[Row], int]:
+    """Última fila por email y por teléfono dentro del lote."""
+    keep: "OrderedDict[int, dict]" = OrderedDict()
+    by_key: Dict[Tuple[str, str], int] = {}
+    for line, row in rows:
+        for key in (("email", row["email"]), ("phone", row["phone"])):
+            if key[1] is not None:
+                keep.pop(by_key.get(key, -1), None)
+        for key in (("email", row["email"]), ("phone", row["phone"])):
+            if key[1] is not None:
+                by_key[key] = line
+        keep[line] = row
+    return list(keep.items()), len(rows) - len(keep)
+
+
+def _dedupe_ingredients(rows: List[Row]) -> Tuple[List[Row], int]:
+    """Última fila por name dentro del lote (ON CONFLICT DO UPDATE no admite claves repetidas)."""
+    keep: Dict[str, Row] = {}
+    for line, row in rows:
+        keep.pop(row["name"], None)
+        keep[row["name"]] = (line, row)
+    return list(keep.values()), len(rows) - len(keep)
+
+
+def _merge_customers(conn: Connection, staging: Table, job: "ImportJob") -> Dict[str, int]:  # pylint: disable=unused-argument
+    customer = Customer.__table__
+    # 1) destino de cada fila: cliente con el mismo email, si no con el mismo teléfono
+    conn.execute(update(staging).values(target_id=func.coalesce(
+        select(customer.c.id).where(customer.c.email == staging.c.email).scalar_subquery(),
+        select(customer.c.id).where(customer.c.phone == staging.c.phone).scalar_subquery(),
+    )))
+    # 2) dos filas que apuntan al mismo cliente (una por email, otra por teléfono): gana la última
+    later = staging.alias("later")
+    superseded = conn.execute(delete(staging).where(
+        staging.c.target_id.is_not(None),
+        exists().where(later.c.target_id == staging.c.target_id, later.c.line > staging.c.line),
+    )).rowcount
+    new_rows = conn.scalar(select(func.count()).select_from(staging).where(staging.c.target_id.is_(None)))
+    # 3) actualizar existentes; los campos vacíos no pisan lo que ya había
+    updated = conn.execute(
+        update(customer)
+        .where(customer.c.id == staging.c.target_id)
+        .values(
+            name=staging.c.name,
+            email=func.coalesce(staging.c.email, customer.c.email),
+            phone=func.coalesce(staging.c.phone, customer.c.phone),
+            address=func.coalesce(staging.c.address, customer.c.address),
+            updated_at=func.now(),
+        )
+    ).rowcount
+    # 4) insertar nuevos (si chocan con otro cliente por la otra clave, se saltean)
+    inserted = conn.execute(
+        _dialect_insert(conn, customer)
+        .from_select(
+            ["name", "email", "phone", "address", "created_at", "updated_at"],
+            select(staging.c.name, staging.c.email, staging.c.phone, staging.c.address, func.now(), func.now())
+            .where(staging.c.target_id.is_(None)),
+        )
+        .on_conflict_do_nothing()
+    ).rowcount
+    return {"inserted": inserted, "updated": updated, "skipped": superseded + new_rows - inserted}
+
+
+def _merge_ingredients(conn: Connection, staging: Table, job: "ImportJob") -> Dict[str, int]:  # pylint: disable=unused-argument
+    ingredient = Ingredient.__table__
+    total = conn.scalar(select(func.count()).select_from(staging))
+    matched = conn.scalar(
+        select(func.count()).select_from(staging.join(ingredient, ingredient.c.name == staging.c.name))
+    )
+    stmt = _dialect_insert(conn, ingredient).from_select(
+        ["name", "unit_price", "unit", "category", "created_at", "updated_at"],
+        select(
+            staging.c.name,
+            staging.c.unit_price,
+            func.coalesce(staging.c.unit, "kg"),
+            cast(staging.c.category, ingredient.c.category.type),
+            func.now(),
+            func.now(),
+        ).where(staging.c.name.is_not(None)),  # SQLite exige WHERE en INSERT ... SELECT ... ON CONFLICT
+    )
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=[ingredient.c.name],
+        set_={
+            "unit_price": stmt.excluded.unit_price,
+            "unit": stmt.excluded.unit,
+            "category": stmt.excluded.category,
+            "updated_at": func.now(),
+        },
+    ))
+    return {"inserted": total - matched, "updated": matched}
+
+
+def _merge_purchases(conn: Connection, staging: Table, job: "ImportJob") -> Dict[str, int]:
+    ingredient = Ingredient.__table__
+    purchase = Purchase.__table__
+    missing = conn.execute(
+        select(staging.c.line)
+        .where(~exists().where(ingredient.c.id == staging.c.ingredient_id))
+        .order_by(staging.c.line)
+    ).scalars().all()
+    for line in missing:
+        job.record_error(line, "Ingredient not found")
+
+    inserted = conn.execute(
+        insert(purchase).from_select(
+            ["ingredient_id", "quantity", "unit_price", "total_amount", "payment_status",
+             "supplier", "notes", "purchased_at", "created_at", "updated_at"],
+            select(
+                staging.c.ingredient_id,
+                staging.c.quantity,
+                staging.c.unit_price,
+                # mismo cálculo que el evento before_insert de Purchase
+                cast(func.round(cast(staging.c.quantity * staging.c.unit_price, Numeric), 2), Float),
+                func.coalesce(staging.c.payment_status, "PENDING"),
+                staging.c.supplier,
+                staging.c.notes,
+                func.coalesce(staging.c.purchased_at, func.now()),
+                func.now(),
+                func.now(),
+            ).select_from(staging.join(ingredient, ingredient.c.id == staging.c.ingredient_id)),
+        )
+    ).rowcount
+    return {"inserted": inserted, "failed": len(missing)}
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    entity: str
+    schema: Type[BaseModel]
+    # columnas de staging que se cargan desde el archivo (en orden de COPY)
+    columns: Tuple[Column, ...]
+    # devuelve los contadores del lote (inserted/updated/skipped/failed), que suman sus filas
+    merge: Callable[[Connection, Table, "ImportJob"], Dict[str, int]]
+    dedupe: Optional[Callable[[List[Row]], Tuple[List[Row], int]]]
+    # tags del cache de respuestas a invalidar al terminar
+    tags: Tuple[str, ...]
+    # columnas extra de staging que no vienen del archivo
+    extra_columns: Tuple[Column, ...] = ()
+
+
+SPECS: Dict[str, ImportSpec] = {
+    "customers": ImportSpec(
+        entity="customers",
+        schema=CustomerCreate,
+        columns=(Column("name", String), Column("email", String), Column("phone", String), Column("address", String)),
+        extra_columns=(Column("target_id", BigInteger),),
+        merge=_merge_customers,
+        dedupe=_dedupe_customers,
+        tags=("customers", "sales"),
+    ),
+    "ingredients": ImportSpec(
+        entity="ingredients",
+        schema=IngredientCreate,
+        columns=(Column("name", String), Column("unit_price", Float), Column("unit", String), Column("category", String)),
+        merge=_merge_ingredients,
+        dedupe=_dedupe_ingredients,
+        tags=("ingredients", "edition_ingredients"),
+    ),
+    "purchases": ImportSpec(
+        entity="purchases",
+        schema=PurchaseCreate,
+        columns=(
+            Column("ingredient_id", BigInteger),
+            Column("quantity", Float),
+            Column("unit_price", Float),
+            Column("payment_status", String),
+            Column("supplier", String),
+            Column("notes", String),
+            Column("purchased_at", DateTime(timezone=True)),
+        ),
+        merge=_merge_purchases,
+        dedupe=None,
+        tags=("purchases", "edition_ingredients"),
+    ),
+}
+
+
+def _staging_table(spec: ImportSpec) -> Table:
+    return Table(
+        f"import_{spec.entity}",
+        MetaData(),
+        Column("line", BigInteger),
+        *(c.copy() for c in spec.columns),
+        *(c.copy() for c in spec.extra_columns),
+        prefixes=["TEMPORARY"],
+    )
+
+
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return "\\N"
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _load_staging(conn: Connection, staging: Table, spec: ImportSpec, rows: List[Row]) -> None:
+    names = ["line", *(c.name for c in spec.columns)]
+    if conn.dialect.name != "postgresql":
+        conn.execute(insert(staging), [
+            {"line": line, **{c.name: _copy_value(row[c.name]) if isinstance(row[c.name], Enum) else row[c.name]
+                              for c in spec.columns}}
+            for line, row in rows
+        ])
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for line, row in rows:
+        writer.writerow([line, *(_copy_value(row[c.name]) for c in spec.columns)])
+    buffer.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {staging.name} ({', '.join(names)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def _clear_staging(conn: Connection, staging: Table) -> None:
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"TRUNCATE {staging.name}"))
+    else:
+        conn.execute(delete(staging))
+
+
+# ---------------------------------------------------------------------------
+# jobs
+# ---------------------------------------------------------------------------
+@dataclass
+class ImportJob:
+    """Estado y progreso de una importación (lo actualiza un solo hilo, se lee desde la API)."""
+
+    entity: str
+    format: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "pending"  # pending | running | done | failed
+    rows_read: int = 0
+    valid: int = 0
+    invalid: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    batches: int = 0
+    errors: List[dict] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _started: Optional[float] = field(default=None, repr=False)
+    _finished: Optional[float] = field(default=None, repr=False)
+
+    def add(self, **counters: int) -> None:
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record_error(self, line: int, detail: str) -> None:
+        with self._lock:
+            if len(self.errors) < settings.import_max_errors:
+                self.errors.append({"line": line, "detail": detail})
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = None
+            if self._started is not None:
+                elapsed = (self._finished or time.monotonic()) - self._started
+            return {
+                "id": self.id,
+                "entity": self.entity,
+                "format": self.format,
+                "status": self.status,
+                "rows_read": self.rows_read,
+                "valid": self.valid,
+                "invalid": self.invalid,
+                "inserted": self.inserted,
+                "updated": self.updated,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "errors": list(self.errors),
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+                "rows_per_second": round(self.rows_read / elapsed, 1) if elapsed else None,
+            }
+
+    def _set_status(self, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.status = status
+            self.error = error
+            if status == "running":
+                self.started_at = datetime.now(timezone.utc)
+                self._started = time.monotonic()
+            elif status in ("done", "failed"):
+                self.finished_at = datetime.now(timezone.utc)
+                self._finished = time.monotonic()
+
+
+def _validate(spec: ImportSpec, records: List[Tuple[int, Any]], job: ImportJob) -> List[Row]:
+    rows: List[Row] = []
+    for line, record in records:
+        if isinstance(record, _BadRecord):
+            job.add(invalid=1)
+            job.record_error(line, record.detail)
+            continue
+        try:
+            rows.append((line, spec.schema.model_validate(record).model_dump()))
+        except ValidationError as exc:
+            job.add(invalid=1)
+            job.record_error(line, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()
+            ))
+    return rows
+
+
+def _process_batch(conn: Connection, staging: Table, spec: ImportSpec, records: List[Tuple[int, Any]], job: ImportJob) -> None:
+    rows = _validate(spec, records, job)
+    job.add(rows_read=len(records), valid=len(rows), batches=1)
+    if spec.dedupe is not None:
+        rows, superseded = spec.dedupe(rows)
+        job.add(skipped=superseded)
+    if not rows:
+        return
+    try:
+        with conn.begin():
+            _load_staging(conn, staging, spec, rows)
+            counters = spec.merge(conn, staging, job)
+            _clear_staging(conn, staging)
+    except SQLAlchemyError as exc:
+        logger.exception("Importación %s: falló el lote de las líneas %s-%s", job.id, rows[0][0], rows[-1][0])
+        job.add(failed=len(rows))
+        job.record_error(rows[0][0], f"Lote de {len(rows)} filas revertido: {getattr(exc, 'orig', exc)}")
+        return
+    job.add(**counters)
+
+
+def run_import(engine: Engine, job: ImportJob, stream: IO[bytes], batch_size: Optional[int] = None) -> ImportJob:
+    """Corre la importación completa de `stream` sobre `engine`, actualizando `job`."""
+    spec = SPECS[job.entity]
+    batch_size = batch_size or settings.import_batch_size
+    staging = _staging_table(spec)
+    job._set_status("running")  # pylint: disable=protected-access
+    try:
+        # una sola conexión: la tabla temporal vive lo que dura la conexión
+        with engine.connect() as conn:
+            with conn.begin():
+                staging.drop(conn, checkfirst=True)
+                staging.create(conn)
+            try:
+                batch: List[Tuple[int, Any]] = []
+                for record in READERS[job.format](stream):
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        _process_batch(conn, staging, spec, batch, job)
+                        batch = []
+                if batch:
+                    _process_batch(conn, staging, spec, batch, job)
+            finally:
+                with conn.begin():
+                    staging.drop(conn, checkfirst=True)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception("Importación %s (%s) abortada", job.id, job.entity)
+        job._set_status("failed", str(exc))  # pylint: disable=protected-access
+    else:
+        job._set_status("done")  # pylint: disable=protected-access
+    finally:
+        if job.inserted or job.updated:
+            invalidate(*spec.tags)
+            if job.entity == "customers":
+                customer_index.refresh()
+    return job
+
+
+class ImportJobRegistry:
+    """Importaciones recientes (en memoria, por proceso) con un límite de importaciones simultáneas."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._slots = threading.BoundedSemaphore(max(settings.import_max_concurrent, 1))
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def recent(self) -> List[ImportJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def start(self, engine: Engine, entity: str, fmt: str, path: str) -> ImportJob:
+        """
+        Encola la importación del archivo `path` (se borra al terminar) y
+        devuelve el job; corre en un hilo propio cuando hay lugar.
+        """
+        job = ImportJob(entity=entity, format=fmt)
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = [j.id for j in self._jobs.values() if j.status in ("done", "failed")]
+            for old_id in finished[:max(len(self._jobs) - settings.import_jobs_retained, 0)]:
+                del self._jobs[old_id]
+        threading.Thread(target=self._run, args=(engine, job, path), name=f"import-{job.id[:8]}", daemon=True).start()
+        return job
+
+    def _run(self, engine: Engine, job: ImportJob, path: str) -> None:
+        try:
+            with self._slots, open(path, "rb") as stream:
+                run_import(engine, job, stream)
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                logger.warning("No se pudo borrar el archivo temporal %s", path)
+
+
+import_jobs = ImportJobRegistry()
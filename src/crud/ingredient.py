@@ -1,62 +1,82 @@
 import logging
 from typing import Optional
-from sqlalchemy import String, cast, or_, func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from fastapi import HTTPException, status
 
-from models.ingredient import Ingredient # pylint: disable=import-error
+from models.ingredient import Category, Ingredient # pylint: disable=import-error
+from core.cache import invalidate # pylint: disable=import-error
 from schemas.ingredient import ( # pylint: disable=import-error
     IngredientCreate, 
     IngredientListResponse, 
     IngredientRead,
     IngredientUpdate
 )
+from crud.pagination import TotalMode, apply_page, count_total, encode_cursor, page_meta, split_page # pylint: disable=import-error
+from crud.search import rank_prefix, search_sort_keys, text_search, with_rank # pylint: disable=import-error
 
 logger = logging.getLogger(__name__)
 
+INGREDIENT_SORT_KEYS = [(Ingredient.created_at, True), (Ingredient.id, True)]
+
 def get_ingredients(
     db: Session,
     q: Optional[str] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    total_mode: TotalMode = TotalMode.EXACT
 ) -> IngredientListResponse:
     """
-    Búsqueda con paginación (limit/offset) y total.
-    Retorna dict con keys: items, total, limit, offset, next_offset, prev_offset
+    Búsqueda con paginación (limit/offset o cursor keyset) y total.
+    Retorna dict con keys: items, total, limit, offset, next_offset, prev_offset, next_cursor, has_more
+    total_mode: exact (COUNT cacheado) | estimate (planner) | none (solo has_more)
+    Con `q` en Postgres también trae coincidencias aproximadas (pg_trgm) ordenadas por relevancia.
     """
     try:
         stmt = select(Ingredient)
-        if q:
-            term = f"%{q.strip()}%"
-            stmt = stmt.where(
-                or_(
-                    Ingredient.name.ilike(term),
-                    Ingredient.unit.ilike(term),
-                    cast(Ingredient.category, String).ilike(term)  # depende si el Enum se guarda como string
-                )
-            )
+        # la categoría se resuelve en Python contra los valores del Enum y se
+        # filtra con IN (índice normal), sin castear la columna a texto
+        categories = [c for c in Category if q and q.strip().lower() in c.value.lower()]
+        search = text_search(
+            db,
+            q,
+            [Ingredient.name, Ingredient.unit],
+            extra_conditions=[Ingredient.category.in_(categories)] if categories else (),
+        )
+        if search is not None:
+            stmt = stmt.where(search.condition)
 
         # total
-        count_stmt = select(func.count()).select_from(stmt.subquery()) # pylint: disable=not-callable
-        total = db.execute(count_stmt).scalar_one()
+        total = count_total(db, stmt, total_mode)
 
         # filas
-        rows_stmt = stmt.order_by(Ingredient.created_at.desc()).offset(offset).limit(limit)
-        rows = db.execute(rows_stmt).scalars().all()
+        rows_stmt = apply_page(
+            with_rank(stmt, search),
+            search_sort_keys(search, INGREDIENT_SORT_KEYS),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        rows, has_more = split_page(db.execute(rows_stmt).all(), limit)
 
-        items = [IngredientRead.model_validate(r) for r in rows]
+        items = [IngredientRead.model_validate(r[0]) for r in rows]
 
-        next_offset = offset + limit if (offset + limit) < total else None
-        prev_offset = offset - limit if (offset - limit) >= 0 else None
+        last = rows[-1] if rows else None
+        next_cursor = encode_cursor([*rank_prefix(search, last), last[0].created_at, last[0].id]) if has_more else None
 
         return {
             "items": items,
-            "total": int(total),
-            "limit": limit,
-            "offset": offset,
-            "next_offset": next_offset,
-            "prev_offset": prev_offset,
+            **page_meta(
+                total=total,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                has_more=has_more,
+                page_size=len(items),
+                next_cursor=next_cursor,
+            ),
         }
     except SQLAlchemyError:
         logger.exception("Error al listar ingredients con búsqueda=%s", q)
@@ -79,6 +99,7 @@ def create_ingredient(db: Session, ingredient: IngredientCreate):
     try:
         db.commit()
         db.refresh(db_ingredient)
+        invalidate("ingredients")
         return IngredientRead.model_validate(db_ingredient)
     except IntegrityError:
         db.rollback()
@@ -100,6 +121,7 @@ def update_ingredient(db: Session, ingredient_id: int, ingredient: IngredientUpd
 
     db.commit()
     db.refresh(db_ingredient)
+    invalidate("ingredients", "edition_ingredients")
     return IngredientRead.model_validate(db_ingredient)
 
 
@@ -110,4 +132,6 @@ def delete_ingredient(db: Session, ingredient_id: int):
 
     db.delete(db_ingredient)
     db.commit()
+    # borra en cascada sus compras y edition_ingredients (costos de las ediciones)
+    invalidate("ingredients", "edition_ingredients", "purchases", "editions")
     return IngredientRead.model_validate(db_ingredient)
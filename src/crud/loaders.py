@@ -0,0 +1,78 @@
+"""
+Perfiles de carga de relaciones por schema de respuesta.
+
+Cada schema de lectura que anida relaciones declara acá cómo cargarlas, así
+todas las rutas que devuelven ese schema hacen la misma cantidad fija de
+consultas sin importar el tamaño de la página (sin N+1 por lazy loads):
+
+  - many-to-one que se repite poco por fila (customer) -> joinedload (0 consultas extra)
+  - many-to-one que se repite mucho (edition)          -> selectinload (1 consulta, ids deduplicados)
+
+`raiseload("*")` al final hace que cualquier relación no prevista en el perfil
+falle en lugar de disparar una consulta por fila.
+
+Para el modo normalizado (`include=...`) los items usan schemas "Ref" sin
+relaciones y las entidades relacionadas se cargan aparte con `side_load`,
+una consulta por tipo con los ids únicos de la página.
+"""
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+
+from models.edition_ingredient import EditionIngredient  # pylint: disable=import-error
+from models.sale import Sale  # pylint: disable=import-error
+from schemas.edition_ingredient import EditionIngredientRead, EditionIngredientRef  # pylint: disable=import-error
+from schemas.purchase import PurchaseRead  # pylint: disable=import-error
+from schemas.sale import SaleRead, SaleRef  # pylint: disable=import-error
+
+LOADER_PROFILES: Dict[type, Tuple] = {
+    SaleRead: (
+        joinedload(Sale.customer),
+        selectinload(Sale.edition),
+        raiseload("*"),
+    ),
+    EditionIngredientRead: (
+        joinedload(EditionIngredient.ingredient),
+        joinedload(EditionIngredient.edition),
+        joinedload(EditionIngredient.purchase),
+        raiseload("*"),
+    ),
+    # schemas sin relaciones anidadas: solo columnas
+    PurchaseRead: (raiseload("*"),),
+    SaleRef: (raiseload("*"),),
+    EditionIngredientRef: (raiseload("*"),),
+}
+
+
+def load_options(schema: type) -> Tuple:
+    """Opciones de carga (para `.options(*...)`) del perfil registrado para `schema`."""
+    return LOADER_PROFILES.get(schema, ())
+
+
+def parse_include(include: Optional[str], allowed: Iterable[str]) -> Optional[FrozenSet[str]]:
+    """
+    Convierte 'customer,edition' -> frozenset({'customer', 'edition'}).
+    Devuelve None si no se pidió modo normalizado. Lanza HTTPException(400)
+    si hay valores no soportados por el listado.
+    """
+    if include is None or not include.strip():
+        return None
+    requested = frozenset(item.strip() for item in include.split(",") if item.strip())
+    invalid = sorted(requested - set(allowed))
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid include values: {', '.join(invalid)}"
+        )
+    return requested
+
+
+def side_load(db: Session, model: type, schema: type, ids: Iterable[Optional[int]]) -> Dict[int, object]:
+    """Carga una vez cada entidad referenciada por la página: {id: schema}."""
+    unique_ids = {i for i in ids if i is not None}
+    if not unique_ids:
+        return {}
+    stmt = select(model).options(*load_options(schema)).where(model.id.in_(unique_ids))
+    return {row.id: schema.model_validate(row) for row in db.execute(stmt).scalars()}
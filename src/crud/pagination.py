@@ -0,0 +1,254 @@
+"""
+Helpers de paginación compartidos por los CRUD de listados.
+
+Soporta dos modos:
+  - offset/limit: el clásico, se mantiene para clientes existentes.
+  - keyset (cursor): el cliente envía el `next_cursor` de la página anterior y
+    la consulta busca directamente a partir de la última fila vista usando las
+    mismas claves de orden + `id` como desempate. Postgres no tiene que
+    recorrer y descartar las filas previas, así que las páginas profundas
+    cuestan lo mismo que la primera.
+
+El cursor es opaco para el cliente (JSON con los valores de las claves,
+codificado en base64 url-safe).
+
+El total es configurable por request (`total_mode`):
+  - exact: COUNT(*) sobre la consulta filtrada, cacheado unos segundos por filtro
+    (el cache se vacía en cada escritura, ver core.cache.invalidate).
+  - estimate: estimación de filas del planner (EXPLAIN), sin recorrer la tabla.
+  - none: no se cuenta; el cliente usa `has_more` (se trae limit + 1 filas).
+"""
+import base64
+import json
+import threading
+import time
+from datetime import date, datetime
+from enum import Enum as PyEnum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, DateTime, Enum as SAEnum, and_, func, or_, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+from fastapi import HTTPException, status
+
+from core.cache import on_invalidate  # pylint: disable=import-error
+from core.config import settings  # pylint: disable=import-error
+
+# (columna, descendente)
+SortKey = Tuple[Any, bool]
+
+
+def order_by_keys(keys: Sequence[SortKey]) -> list:
+    return [col.desc() if desc else col.asc() for col, desc in keys]
+
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, PyEnum):
+        return value.value
+    return value
+
+
+def _from_jsonable(col: Any, raw: Any) -> Any:
+    if raw is None:
+        return None
+    col_type = col.type
+    if isinstance(col_type, DateTime):
+        return datetime.fromisoformat(raw)
+    if isinstance(col_type, Date):
+        return date.fromisoformat(raw)
+    if isinstance(col_type, SAEnum) and col_type.enum_class is not None:
+        return col_type.enum_class(raw)
+    return raw
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_to_jsonable(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> List[Any]:
+    """
+    Decodifica un cursor generado por `encode_cursor` para las claves dadas.
+    Lanza HTTPException(400) si el cursor está corrupto o no corresponde al listado.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, list) or len(payload) != len(keys):
+            raise ValueError("cursor length mismatch")
+        return [_from_jsonable(col, raw) for (col, _), raw in zip(keys, payload)]
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        ) from exc
+
+
+def keyset_condition(keys: Sequence[SortKey], values: Sequence[Any]):
+    """
+    Condición "estrictamente después de `values`" según el orden de `keys`.
+    Si todas las claves van en la misma dirección usa comparación de filas
+    (ROW(a, b) < ROW(x, y)), que Postgres resuelve con un único rango del índice
+    compuesto; con direcciones mixtas expande a OR de prefijos iguales.
+    """
+    directions = {desc for _, desc in keys}
+    if len(directions) == 1:
+        cols = tuple_(*[col for col, _ in keys])
+        vals = tuple_(*values)
+        return cols < vals if directions.pop() else cols > vals
+
+    clauses = []
+    for i, (col, desc) in enumerate(keys):
+        prefix = [keys[j][0] == values[j] for j in range(i)]
+        clauses.append(and_(*prefix, col < values[i] if desc else col > values[i]))
+    return or_(*clauses)
+
+
+def apply_page(
+    stmt,
+    keys: Sequence[SortKey],
+    *,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+):
+    """
+    Aplica orden + página a `stmt` (Select o Query). Trae `limit + 1` filas
+    para saber si hay una página siguiente sin contar; usar `split_page` sobre
+    el resultado. Con `cursor` se ignora `offset`.
+    """
+    stmt = stmt.order_by(*order_by_keys(keys))
+    if cursor:
+        stmt = stmt.where(keyset_condition(keys, decode_cursor(cursor, keys)))
+    else:
+        stmt = stmt.offset(offset)
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[list, bool]:
+    """Separa las filas de la página de la fila extra usada como sonda (has_more)."""
+    rows = list(rows)
+    return rows[:limit], len(rows) > limit
+
+
+class TotalMode(str, PyEnum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
+_COUNT_CACHE: Dict[Tuple[str, str], Tuple[float, int]] = {}
+_COUNT_CACHE_MAX_ENTRIES = 1024
+_count_cache_lock = threading.Lock()
+
+
+@on_invalidate
+def _clear_count_cache(_tags) -> None:
+    # los conteos no guardan de qué tablas dependen: cualquier escritura los descarta
+    with _count_cache_lock:
+        _COUNT_CACHE.clear()
+
+
+def _compiled_key(db: Session, stmt) -> Tuple[Any, Tuple[str, str]]:
+    compiled = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True})
+    return compiled, (str(compiled), repr(sorted(compiled.params.items())))
+
+
+def _exact_count(db: Session, stmt) -> int:
+    count_stmt = select(func.count()).select_from(stmt.subquery())  # pylint: disable=not-callable
+    ttl = settings.count_cache_ttl_seconds
+    if ttl <= 0:
+        return int(db.execute(count_stmt).scalar_one())
+
+    _, key = _compiled_key(db, count_stmt)
+    now = time.monotonic()
+    with _count_cache_lock:
+        hit = _COUNT_CACHE.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+
+    total = int(db.execute(count_stmt).scalar_one())
+    with _count_cache_lock:
+        if len(_COUNT_CACHE) >= _COUNT_CACHE_MAX_ENTRIES:
+            # descartar la entrada más vieja (dict mantiene orden de inserción)
+            _COUNT_CACHE.pop(next(iter(_COUNT_CACHE)))
+        _COUNT_CACHE[key] = (now + ttl, total)
+    return total
+
+
+class _Explain(Executable, ClauseElement):
+    """
+    `EXPLAIN (FORMAT JSON) <stmt>` como sentencia ejecutable: se compila y
+    ejecuta por el camino normal de SQLAlchemy, así los parámetros pasan por
+    los bind processors (Enum -> string, IN expandidos) igual que en la consulta real.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _estimated_count(db: Session, stmt) -> int:
+    """
+    Filas estimadas por el planner para `stmt` (basado en pg_class.reltuples y
+    las estadísticas de columnas). Fuera de Postgres cae a un COUNT exacto.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return _exact_count(db, stmt)
+    plan = db.execute(_Explain(stmt)).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return max(int(plan[0]["Plan"]["Plan Rows"]), 0)
+
+
+def count_total(db: Session, stmt, mode: TotalMode = TotalMode.EXACT) -> Optional[int]:
+    """Total de filas de `stmt` (sin orden ni página) según `mode`; None en modo none."""
+    if mode == TotalMode.NONE:
+        return None
+    if mode == TotalMode.ESTIMATE:
+        return _estimated_count(db, stmt)
+    return _exact_count(db, stmt)
+
+
+def page_meta(
+    *,
+    total: Optional[int],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    has_more: bool,
+    page_size: int,
+    next_cursor: Optional[str],
+) -> dict:
+    """
+    Campos de paginación comunes a todos los *ListResponse.
+    next/prev_offset se derivan de `has_more` (sonda limit + 1), así que son
+    correctos en cualquier `total_mode`. Una estimación nunca se devuelve por
+    debajo de las filas que ya sabemos que existen.
+    """
+    if cursor:
+        next_offset = prev_offset = None
+    else:
+        next_offset = offset + limit if has_more else None
+        prev_offset = offset - limit if (offset - limit) >= 0 else None
+        if total is not None and page_size:
+            total = max(total, offset + page_size + (1 if has_more else 0))
+    return {
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": next_offset,
+        "prev_offset": prev_offset,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
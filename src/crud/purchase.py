@@ -1,6 +1,6 @@
 import logging
 from typing import Optional
-from sqlalchemy import or_, func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from fastapi import HTTPException, status
@@ -12,51 +12,65 @@ from schemas.purchase import (  # pylint: disable=import-error
     PurchaseRead,
     PurchaseUpdate,
 )
+from crud.loaders import load_options  # pylint: disable=import-error
+from crud.pagination import TotalMode, apply_page, count_total, encode_cursor, page_meta, split_page  # pylint: disable=import-error
+from crud.search import rank_prefix, search_sort_keys, text_search, with_rank  # pylint: disable=import-error
+from core.cache import invalidate  # pylint: disable=import-error
 
 logger = logging.getLogger(__name__)
 
+PURCHASE_SORT_KEYS = [(Purchase.purchased_at, True), (Purchase.id, True)]
+
 
 def get_purchases(
     db: Session,
     q: Optional[str] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    total_mode: TotalMode = TotalMode.EXACT
 ) -> PurchaseListResponse:
     """
-    Búsqueda con paginación (limit/offset) y total.
-    Retorna dict con keys: items, total, limit, offset, next_offset, prev_offset
+    Búsqueda con paginación (limit/offset o cursor keyset) y total.
+    Retorna dict con keys: items, total, limit, offset, next_offset, prev_offset, next_cursor, has_more
+    total_mode: exact (COUNT cacheado) | estimate (planner) | none (solo has_more)
+    Con `q` en Postgres también trae coincidencias aproximadas (pg_trgm) ordenadas por relevancia.
     """
     try:
         stmt = select(Purchase)
-        if q:
-            term = f"%{q.strip()}%"
-            stmt = stmt.where(
-                or_(
-                    Purchase.supplier.ilike(term),
-                    Purchase.notes.ilike(term)
-                )
-            )
+        search = text_search(db, q, [Purchase.supplier, Purchase.notes])
+        if search is not None:
+            stmt = stmt.where(search.condition)
 
         # total
-        count_stmt = select(func.count()).select_from(stmt.subquery())  # pylint: disable=not-callable
-        total = db.execute(count_stmt).scalar_one()
+        total = count_total(db, stmt, total_mode)
 
         # filas
-        rows_stmt = stmt.order_by(Purchase.purchased_at.desc()).offset(offset).limit(limit)
-        rows = db.execute(rows_stmt).scalars().all()
+        rows_stmt = apply_page(
+            with_rank(stmt, search).options(*load_options(PurchaseRead)),
+            search_sort_keys(search, PURCHASE_SORT_KEYS),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        rows, has_more = split_page(db.execute(rows_stmt).all(), limit)
 
-        items = [PurchaseRead.model_validate(r) for r in rows]
+        items = [PurchaseRead.model_validate(r[0]) for r in rows]
 
-        next_offset = offset + limit if (offset + limit) < total else None
-        prev_offset = offset - limit if (offset - limit) >= 0 else None
+        last = rows[-1] if rows else None
+        next_cursor = encode_cursor([*rank_prefix(search, last), last[0].purchased_at, last[0].id]) if has_more else None
 
         return {
             "items": items,
-            "total": int(total),
-            "limit": limit,
-            "offset": offset,
-            "next_offset": next_offset,
-            "prev_offset": prev_offset,
+            **page_meta(
+                total=total,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                has_more=has_more,
+                page_size=len(items),
+                next_cursor=next_cursor,
+            ),
         }
     except SQLAlchemyError:
         logger.exception("Error al listar purchases con búsqueda=%s", q)
@@ -67,7 +81,12 @@ def get_purchases(
 
 
 def get_purchase(db: Session, purchase_id: int):
-    purchase = db.query(Purchase).filter(Purchase.id == purchase_id).first()
+    purchase = (
+        db.query(Purchase)
+        .options(*load_options(PurchaseRead))
+        .filter(Purchase.id == purchase_id)
+        .first()
+    )
     if purchase is None:
         raise HTTPException(status_code=404, detail="Purchase not found")
     return PurchaseRead.model_validate(purchase)
@@ -80,6 +99,7 @@ def create_purchase(db: Session, purchase: PurchaseCreate):
     try:
         db.commit()
         db.refresh(db_purchase)
+        invalidate("purchases")
         return PurchaseRead.model_validate(db_purchase)
     except IntegrityError:
         db.rollback()
@@ -101,6 +121,7 @@ def update_purchase(db: Session, purchase_id: int, purchase: PurchaseUpdate):
 
     db.commit()
     db.refresh(db_purchase)
+    invalidate("purchases", "edition_ingredients")
     return PurchaseRead.model_validate(db_purchase)
 
 
@@ -111,4 +132,5 @@ def delete_purchase(db: Session, purchase_id: int):
 
     db.delete(db_purchase)
     db.commit()
+    invalidate("purchases", "edition_ingredients")
     return PurchaseRead.model_validate(db_purchase)
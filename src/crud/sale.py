@@ -1,16 +1,33 @@
 import logging
-from typing import Optional
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import BigInteger, Float, Numeric, any_, bindparam, case, cast, exists, func, literal, null, select, union_all, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload, raiseload
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from fastapi import HTTPException, status
 from models.sale import Sale # pylint: disable=import-error
 from models.edition import Edition # pylint: disable=import-error
 from models.customer import Customer # pylint: disable=import-error
-from schemas.sale import SaleCreate, SaleListResponse, SaleUpdate, SaleRead # pylint: disable=import-error
+from schemas.customer import CustomerRead # pylint: disable=import-error
+from schemas.edition import EditionRead # pylint: disable=import-error
+from schemas.sale import SaleBulkUpdateResponse, SaleCreate, SaleListResponse, SaleUpdate, SaleRead, SaleRef # pylint: disable=import-error
+from crud.loaders import load_options, parse_include, side_load # pylint: disable=import-error
+from crud.pagination import TotalMode, apply_page, count_total, encode_cursor, page_meta, split_page # pylint: disable=import-error
+from crud.search import text_search # pylint: disable=import-error
+from core.cache import invalidate # pylint: disable=import-error
+from core.config import settings # pylint: disable=import-error
+from db.errors import FOREIGN_KEY_VIOLATION, UNIQUE_VIOLATION, integrity_details # pylint: disable=import-error
 
 logger = logging.getLogger(__name__)
 
+SALE_SORT_KEYS = [(Sale.created_at, True), (Sale.id, True)]
+
+# entidades que se pueden side-loadear con include=...
+SALE_INCLUDES = ("customer", "edition")
+
 def _compute_total_amount(
     portions: int, 
     edition_price: float, 
@@ -26,43 +43,149 @@ def _compute_total_amount(
     # Redondear a 2 decimales (asegurate que tu DB almacene con precisión adecuada)
     return round(total, 2)
 
+def _load_sale_read(db: Session, sale_id: int) -> Optional[SaleRead]:
+    """
+    Carga una venta con customer + edition en una sola consulta (para una fila
+    el selectinload del perfil de listados sería un viaje extra).
+    populate_existing fuerza las opciones aunque la instancia ya esté en la sesión.
+    """
+    stmt = (
+        select(Sale)
+        .options(joinedload(Sale.customer), joinedload(Sale.edition), raiseload("*"))
+        .where(Sale.id == sale_id)
+        .execution_options(populate_existing=True)
+    )
+    sale = db.execute(stmt).scalar_one_or_none()
+    return SaleRead.model_validate(sale) if sale is not None else None
+
+def _sale_page_items(db: Session, rows, includes) -> tuple:
+    """
+    Items de la página + mapas side-loaded.
+    Sin include: SaleRead con customer/edition anidados (respuesta clásica).
+    Con include: SaleRef (solo ids) y cada customer/edition una sola vez en su mapa.
+    """
+    if includes is None:
+        return [SaleRead.model_validate(r) for r in rows], {}
+
+    side = {}
+    if "customer" in includes:
+        side["customers"] = side_load(db, Customer, CustomerRead, (r.customer_id for r in rows))
+    if "edition" in includes:
+        side["editions"] = side_load(db, Edition, EditionRead, (r.edition_id for r in rows))
+    return [SaleRef.model_validate(r) for r in rows], side
+
+def get_sales_edition_version(db: Session, edition_id: int) -> tuple:
+    """
+    Versión barata del listado de ventas de una edición (para ETag), en una consulta
+    sobre el índice de sale.edition_id: cantidad de ventas y último updated_at de
+    las ventas, de sus clientes y de la edición. Cualquier alta/baja/modificación
+    que cambie la respuesta cambia la versión.
+    Retorna (version, last_modified).
+    """
+    edition_updated = select(Edition.updated_at).where(Edition.id == edition_id).scalar_subquery()
+    row = db.execute(
+        select(
+            func.count(Sale.id),  # pylint: disable=not-callable
+            func.max(Sale.updated_at),
+            func.max(Customer.updated_at),
+            edition_updated,
+        )
+        .select_from(Sale)
+        .join(Customer, Customer.id == Sale.customer_id)
+        .where(Sale.edition_id == edition_id)
+    ).one()
+    stamps = [ts for ts in row[1:] if ts is not None]
+    return tuple(row), max(stamps) if stamps else None
+
 def get_sales(
     db: Session,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    total_mode: TotalMode = TotalMode.EXACT,
+    include: Optional[str] = None
 ) -> SaleListResponse:
     """
-    Listar ventas con paginación.
-    Retorna dict con keys: items, total, limit, offset, next_offset, prev_offset
+    Listar ventas con paginación (limit/offset o cursor keyset).
+    Retorna dict con keys: items, total, limit, offset, next_offset, prev_offset, next_cursor, has_more
+    total_mode: exact (COUNT cacheado) | estimate (planner) | none (solo has_more)
+    include: 'customer,edition' -> items solo con ids + mapas customers/editions
     """
     try:
+        includes = parse_include(include, SALE_INCLUDES)
+        read_schema = SaleRead if includes is None else SaleRef
         stmt = select(Sale)
 
         # Total de registros
-        count_stmt = select(func.count()).select_from(stmt.subquery())  # pylint: disable=not-callable
-        total = db.execute(count_stmt).scalar_one()
-
-        # Filas con limit/offset
-        rows_stmt = stmt.order_by(Sale.created_at.desc()).offset(offset).limit(limit)
-        rows = db.execute(rows_stmt).scalars().all()
+        total = count_total(db, stmt, total_mode)
+
+        # Filas de la página (offset o cursor), con las relaciones según el perfil del schema
+        rows_stmt = apply_page(
+            stmt.options(*load_options(read_schema)),
+            SALE_SORT_KEYS,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        rows, has_more = split_page(db.execute(rows_stmt).scalars().all(), limit)
 
-        items = [SaleRead.model_validate(r) for r in rows]
+        items, side = _sale_page_items(db, rows, includes)
 
-        next_offset = offset + limit if (offset + limit) < total else None
-        prev_offset = offset - limit if (offset - limit) >= 0 else None
+        next_cursor = encode_cursor([rows[-1].created_at, rows[-1].id]) if has_more else None
 
         return {
             "items": items,
-            "total": int(total),
-            "limit": limit,
-            "offset": offset,
-            "next_offset": next_offset,
-            "prev_offset": prev_offset,
+            **side,
+            **page_meta(
+                total=total,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                has_more=has_more,
+                page_size=len(items),
+                next_cursor=next_cursor,
+            ),
         }
     except SQLAlchemyError:
         logger.exception("Error al listar ventas")
         raise HTTPException(status_code=500, detail="Error de base de datos al listar ventas")
 
+def _sales_edition_filters(
+    db: Session,
+    edition_id: int,
+    *,
+    customer_q: Optional[str] = None,
+    payment_status: Optional[str] = None,
+    payment_transfer: Optional[bool] = None,
+    delivered: Optional[bool] = None,
+    delivery: Optional[bool] = None,
+    freeze: Optional[bool] = None,
+    saved: Optional[bool] = None,
+) -> list:
+    """Condiciones WHERE del listado por edición (las comparte el PATCH masivo)."""
+    # filtro por edición (requerido)
+    conditions = [Sale.edition_id == edition_id]
+
+    # filtro por nombre del cliente (usa la relación Customer)
+    customer_search = text_search(db, customer_q, [Customer.name])
+    if customer_search is not None:
+        # filtra usando existencia de customer con nombre coincidente
+        # (ILIKE + similitud por trigramas sobre customer.name)
+        conditions.append(Sale.customer.has(customer_search.condition))
+
+    # filtros directos por columnas
+    columns = [
+        (Sale.payment_status, payment_status),
+        (Sale.payment_transfer, payment_transfer),
+        (Sale.delivered, delivered),
+        (Sale.delivery, delivery),
+        (Sale.freeze, freeze),
+        (Sale.saved, saved),
+    ]
+    conditions.extend(column == value for column, value in columns if value is not None)
+    return conditions
+
+
 def get_sales_edition(
     db: Session,
     edition_id: int,
@@ -75,11 +198,14 @@ def get_sales_edition(
     freeze: Optional[bool] = None,
     saved: Optional[bool] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    total_mode: TotalMode = TotalMode.EXACT,
+    include: Optional[str] = None
 ) -> SaleListResponse:
     """
     Listar ventas con paginación, filtradas por edition_id y opcionalmente por:
-      - customer_q (nombre del cliente, buscado con ILIKE)
+      - customer_q (nombre del cliente, ILIKE + similitud pg_trgm; no altera el orden)
       - payment_status (string, ej. "PENDING" / "PAID")
       - payment_transfer (bool)
       - delivered (bool)
@@ -87,69 +213,57 @@ def get_sales_edition(
       - freeze (bool)
       - saved (bool)
 
-    Retorna SaleListResponse (items, total, limit, offset, next_offset, prev_offset).
+    Con `cursor` pagina por keyset (created_at, id) en lugar de offset.
+
+    Retorna SaleListResponse (items, total, limit, offset, next_offset, prev_offset, next_cursor, has_more).
+    total_mode: exact (COUNT cacheado) | estimate (planner) | none (solo has_more)
+    include: 'customer,edition' -> items solo con ids + mapas customers/editions
     """
     try:
-        # base statement
-        stmt = select(Sale)
-
-        # filtro por edición (requerido)
-        stmt = stmt.where(Sale.edition_id == edition_id)
-
-        # filtro por nombre del cliente (usa la relación Customer)
-        if customer_q:
-            term = f"%{customer_q.strip()}%"
-            # filtra usando existencia de customer con nombre coincidente
-            stmt = stmt.where(Sale.customer.has(Customer.name.ilike(term)))
-
-        # filtros directos por columnas
-        if payment_status is not None:
-            stmt = stmt.where(Sale.payment_status == payment_status)
-
-        if payment_transfer is not None:
-            stmt = stmt.where(Sale.payment_transfer == payment_transfer)
-
-        if delivered is not None:
-            stmt = stmt.where(Sale.delivered == delivered)
-
-        if delivery is not None:
-            stmt = stmt.where(Sale.delivery == delivery)
-
-        if freeze is not None:
-            stmt = stmt.where(Sale.freeze == freeze)
-
-        if saved is not None:
-            stmt = stmt.where(Sale.saved == saved)
+        includes = parse_include(include, SALE_INCLUDES)
+        read_schema = SaleRead if includes is None else SaleRef
+
+        stmt = select(Sale).where(*_sales_edition_filters(
+            db,
+            edition_id,
+            customer_q=customer_q,
+            payment_status=payment_status,
+            payment_transfer=payment_transfer,
+            delivered=delivered,
+            delivery=delivery,
+            freeze=freeze,
+            saved=saved,
+        ))
 
         # total sobre la consulta filtrada
-        count_stmt = select(func.count()).select_from(stmt.subquery())  # pylint: disable=not-callable
-        total = db.execute(count_stmt).scalar_one()
+        total = count_total(db, stmt, total_mode)
 
         # traer filas (con las relaciones necesarias eager-loaded para pydantic)
-        rows_stmt = (
-            stmt
-            .options(
-                joinedload(Sale.customer),  # traer customer si SaleRead lo necesita
-                joinedload(Sale.edition),
-            )
-            .order_by(Sale.created_at.desc())
-            .offset(offset)
-            .limit(limit)
+        rows_stmt = apply_page(
+            stmt.options(*load_options(read_schema)),
+            SALE_SORT_KEYS,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
         )
-        rows = db.execute(rows_stmt).scalars().all()
+        rows, has_more = split_page(db.execute(rows_stmt).scalars().all(), limit)
 
-        items = [SaleRead.model_validate(r) for r in rows]
+        items, side = _sale_page_items(db, rows, includes)
 
-        next_offset = offset + limit if (offset + limit) < total else None
-        prev_offset = offset - limit if (offset - limit) >= 0 else None
+        next_cursor = encode_cursor([rows[-1].created_at, rows[-1].id]) if has_more else None
 
         return {
             "items": items,
-            "total": int(total),
-            "limit": limit,
-            "offset": offset,
-            "next_offset": next_offset,
-            "prev_offset": prev_offset,
+            **side,
+            **page_meta(
+                total=total,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                has_more=has_more,
+                page_size=len(items),
+                next_cursor=next_cursor,
+            ),
         }
     except SQLAlchemyError:
         logger.exception(
@@ -160,77 +274,199 @@ def get_sales_edition(
 
     
 def get_sale(db: Session, sale_id: int):
-    sale = db.query(Sale).filter(Sale.id == sale_id).first()
+    sale = _load_sale_read(db, sale_id)
     if sale is None:
         raise HTTPException(status_code=404, detail="Sale not found")
-    return SaleRead(**sale.__dict__)
+    return sale
 
 
-def create_sale(db: Session, sale: SaleCreate):
-    # 1) validar existencia de edition y customer
-    edition = db.query(Edition).filter(Edition.id == sale.edition_id).first()
-    if edition is None:
-        raise HTTPException(status_code=404, detail="Edition not found")
-
-    customer = db.query(Customer).filter(Customer.id == sale.customer_id).first()
-    if customer is None:
-        raise HTTPException(status_code=404, detail="Customer not found")
-
-    # 1.1) validar portion_price si lo usas para calcular total
-    if edition.portion_price is None:
-        raise HTTPException(status_code=400, detail="La edición no tiene portion_price definido")
-
-    # 2) validar business rules
-    if sale.total_portions < 0:
-        raise HTTPException(status_code=400, detail="total_portions debe ser >= 0")
-
-    # 3) calcular total en backend (ignorar lo que envía el cliente)
-    total_amount = _compute_total_amount(
-        portions=sale.total_portions,
-        edition_price=edition.portion_price,
-        discount=sale.discount_price,
-        additional_cost=sale.additional_cost
-    )
+def _sale_total_expr(sale: SaleCreate):
+    """Mismo cálculo que _compute_total_amount, en SQL sobre edition.portion_price."""
+    raw = sale.total_portions * Edition.portion_price - (sale.discount_price or 0.0) + (sale.additional_cost or 0.0)
+    return cast(func.round(cast(case((raw < 0, 0.0), else_=raw), Numeric), 2), Float)
 
-    # 4) prevenir duplicados (UX) — aún así la constraint DB protege de race conditions
-    existing = (
-        db.query(Sale)
-        .filter(Sale.edition_id == sale.edition_id, Sale.customer_id == sale.customer_id)
-        .first()
+def _sale_create_failure(db: Session, sale: SaleCreate) -> HTTPException:
+    """
+    Motivo por el que el INSERT de create_sale no devolvió fila (camino lento,
+    una consulta): edición/cliente inexistente, edición sin precio o venta duplicada.
+    """
+    edition_exists, priced, customer_exists = db.execute(select(
+        exists().where(Edition.id == sale.edition_id),
+        exists().where(Edition.id == sale.edition_id, Edition.portion_price.is_not(None)),
+        exists().where(Customer.id == sale.customer_id),
+    )).one()
+    if not edition_exists:
+        return HTTPException(status_code=404, detail="Edition not found")
+    if not customer_exists:
+        return HTTPException(status_code=404, detail="Customer not found")
+    if not priced:
+        return HTTPException(status_code=400, detail="La edición no tiene portion_price definido")
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="El cliente ya tiene una compra registrada para esta edición"
     )
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="El cliente ya tiene una compra registrada para esta edición"
-        )
 
-    # 5) construir payload sobrescribiendo total_amount
-    payload = sale.model_dump(exclude={"total_amount"})
-    payload["total_amount"] = total_amount
+def create_sale(db: Session, sale: SaleCreate):
+    """
+    Alta de una venta en una sola sentencia:
+
+        INSERT INTO sale (...) SELECT ..., <total>, edition.id, customer.id
+        FROM edition JOIN customer ... WHERE edition.portion_price IS NOT NULL
+        ON CONFLICT (edition_id, customer_id) DO NOTHING RETURNING id
 
-    db_sale = Sale(**payload)
-    db.add(db_sale)
+    La existencia de edición y cliente la resuelve el propio SELECT y el total
+    se calcula en SQL con el portion_price de la edición (el valor que envía el
+    cliente se ignora). Si no vuelve fila se consulta el motivo (404/400/409);
+    el camino feliz es INSERT + lectura de la venta creada.
+    """
+    payload = sale.model_dump(exclude={"total_amount", "edition_id", "customer_id"})
+    columns = Sale.__table__.c
+    source = (
+        select(
+            *(literal(value, type_=columns[key].type) for key, value in payload.items()),
+            _sale_total_expr(sale),
+            Edition.id,
+            Customer.id,
+        )
+        .select_from(Edition)
+        .join(Customer, Customer.id == sale.customer_id)
+        .where(Edition.id == sale.edition_id, Edition.portion_price.is_not(None))
+    )
+    stmt = (
+        _sale_insert(db)
+        .from_select([*payload, "total_amount", "edition_id", "customer_id"], source)
+        .on_conflict_do_nothing(index_elements=["edition_id", "customer_id"])
+        .returning(Sale.id)
+    )
     try:
+        sale_id = db.execute(stmt).scalar_one_or_none()
+        if sale_id is None:
+            db.rollback()
+            raise _sale_create_failure(db, sale)
+        created = _load_sale_read(db, sale_id)
         db.commit()
-        db.refresh(db_sale)
-        return SaleRead.model_validate(db_sale)
     except IntegrityError as exc:
         db.rollback()
-        logger.exception("Integrity error creando venta: %s", exc)
-
-        # intentar detectar duplicate key / unique violation
-        orig = getattr(exc, "orig", None)
-        msg = str(orig).lower() if orig is not None else str(exc).lower()
-        if "uq_sale_edition_customer" in msg or "duplicate key" in msg or "unique constraint" in msg or "23505" in msg:
-            # unique constraint fired -> conflicto
+        sqlstate, constraint = integrity_details(exc)
+        logger.warning("Integrity error creando venta: sqlstate=%s constraint=%s", sqlstate, constraint)
+        if sqlstate == FOREIGN_KEY_VIOLATION:
+            # la edición o el cliente se borraron entre el SELECT y el INSERT
+            raise HTTPException(status_code=404, detail="Edition or customer not found")
+        if sqlstate == UNIQUE_VIOLATION and constraint == "uq_sale_edition_customer":
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="El cliente ya tiene una compra registrada para esta edición (constraint)"
             )
-
-        # otros errores de integridad
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Error de integridad al crear la venta")
 
+    invalidate("sales", "editions")
+    return created
+
+
+def _sale_insert(db: Session):
+    # INSERT ... ON CONFLICT del dialecto (Postgres; SQLite para desarrollo local)
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert(Sale)
+    return pg_insert(Sale)
+
+def _bulk_lookup(db: Session, edition_ids: Set[int], customer_ids: Set[int]) -> Tuple[Dict[int, Optional[float]], Set[int]]:
+    """Ediciones existentes (id -> portion_price) y clientes existentes, en una sola consulta."""
+    editions_q = select(literal("edition"), Edition.id, Edition.portion_price).where(Edition.id.in_(edition_ids))
+    customers_q = select(literal("customer"), Customer.id, null()).where(Customer.id.in_(customer_ids))
+    editions: Dict[int, Optional[float]] = {}
+    customers: Set[int] = set()
+    for kind, row_id, price in db.execute(union_all(editions_q, customers_q)):
+        if kind == "edition":
+            editions[row_id] = price
+        else:
+            customers.add(row_id)
+    return editions, customers
+
+def create_sales_bulk(db: Session, sales: Sequence[Tuple[int, SaleCreate]], chunk_size: Optional[int] = None) -> List[dict]:
+    """
+    Alta masiva de ventas (pre-ventas desde planilla). `sales` son pares
+    (índice en el pedido, venta) ya validados por el schema.
+
+    - ediciones y clientes se validan con una sola consulta para todo el lote,
+    - total_amount se calcula en backend igual que en create_sale,
+    - se inserta con INSERT multi-fila ... ON CONFLICT (edition_id, customer_id)
+      DO NOTHING RETURNING, en chunks de settings.sale_bulk_chunk_size con un
+      commit por chunk; si un chunk falla se revierte solo ese chunk.
+
+    Devuelve un resultado por fila (dicts de SaleBulkResult), sin ordenar.
+    """
+    chunk_size = chunk_size or settings.sale_bulk_chunk_size
+    results: List[dict] = []
+    if not sales:
+        return results
+
+    editions, customers = _bulk_lookup(
+        db,
+        {sale.edition_id for _, sale in sales},
+        {sale.customer_id for _, sale in sales},
+    )
+
+    pending: List[Tuple[int, dict]] = []
+    seen: Set[Tuple[int, int]] = set()
+    for index, sale in sales:
+        if sale.edition_id not in editions:
+            results.append({"index": index, "status": "invalid", "detail": "Edition not found"})
+            continue
+        if sale.customer_id not in customers:
+            results.append({"index": index, "status": "invalid", "detail": "Customer not found"})
+            continue
+        portion_price = editions[sale.edition_id]
+        if portion_price is None:
+            results.append({"index": index, "status": "invalid", "detail": "La edición no tiene portion_price definido"})
+            continue
+        key = (sale.edition_id, sale.customer_id)
+        if key in seen:
+            results.append({"index": index, "status": "duplicate", "detail": "Venta repetida en el lote"})
+            continue
+        seen.add(key)
+
+        payload = sale.model_dump(exclude={"total_amount"})
+        payload["total_amount"] = _compute_total_amount(
+            portions=sale.total_portions,
+            edition_price=portion_price,
+            discount=sale.discount_price,
+            additional_cost=sale.additional_cost,
+        )
+        pending.append((index, payload))
+
+    created_any = False
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        stmt = (
+            _sale_insert(db)
+            .values([payload for _, payload in chunk])
+            .on_conflict_do_nothing(index_elements=["edition_id", "customer_id"])
+            .returning(Sale.id, Sale.edition_id, Sale.customer_id)
+        )
+        try:
+            inserted = {(edition_id, customer_id): sale_id for sale_id, edition_id, customer_id in db.execute(stmt)}
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            logger.exception("Error insertando chunk de ventas (filas %s-%s)", chunk[0][0], chunk[-1][0])
+            results.extend({"index": index, "status": "error", "detail": "Error de base de datos"} for index, _ in chunk)
+            continue
+
+        created_any = created_any or bool(inserted)
+        for index, payload in chunk:
+            sale_id = inserted.get((payload["edition_id"], payload["customer_id"]))
+            if sale_id is None:
+                results.append({
+                    "index": index,
+                    "status": "duplicate",
+                    "detail": "El cliente ya tiene una compra registrada para esta edición",
+                })
+            else:
+                results.append({"index": index, "status": "created", "sale_id": sale_id, "total_amount": payload["total_amount"]})
+
+    if created_any:
+        invalidate("sales", "editions")
+    return results
 
 def update_sale(db: Session, sale_id: int, sale: SaleUpdate):
     db_sale = db.query(Sale).filter(Sale.id == sale_id).first()
@@ -263,13 +499,131 @@ def update_sale(db: Session, sale_id: int, sale: SaleUpdate):
 
     try:
         db.commit()
-        db.refresh(db_sale)
-        return SaleRead.model_validate(db_sale)
+        invalidate("sales", "editions")
+        return _load_sale_read(db, db_sale.id)
     except IntegrityError:
         db.rollback()
         logger.exception("Integrity error actualizando venta")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Error de integridad al actualizar la venta")
 
+# campos que cambian el total de una venta
+SALE_PRICING_FIELDS = ("total_portions", "discount_price", "additional_cost")
+
+def _sale_ids_match(db: Session, ids: Sequence[int]):
+    # Postgres: `id = ANY(:ids)`, un solo parámetro array sin importar cuántos ids
+    if db.get_bind().dialect.name == "postgresql":
+        return Sale.id == any_(bindparam("sale_ids", list(ids), type_=ARRAY(BigInteger)))
+    return Sale.id.in_(ids)
+
+def _bulk_total_expr(changes: dict, portion_price: Optional[float] = None):
+    """
+    total_amount recalculado en un UPDATE masivo (mismo cálculo que
+    _compute_total_amount): los valores nuevos donde cambian, la columna
+    actual donde no, y el portion_price dado o, si no se pasa, el de la
+    edición de cada venta. Si no hay precio se conserva el total actual.
+    """
+    def value(name: str):
+        if name in changes:
+            return literal(changes[name], Sale.__table__.c[name].type)
+        return getattr(Sale, name)
+
+    if portion_price is None:
+        portion_price = select(Edition.portion_price).where(Edition.id == Sale.edition_id).scalar_subquery()
+    else:
+        portion_price = literal(portion_price, Edition.portion_price.type)
+    raw = (
+        value("total_portions") * portion_price
+        - func.coalesce(value("discount_price"), 0.0)
+        + func.coalesce(value("additional_cost"), 0.0)
+    )
+    total = cast(func.round(cast(case((raw < 0, 0.0), else_=raw), Numeric), 2), Float)
+    return func.coalesce(total, Sale.total_amount)
+
+def recompute_sale_totals(db: Session, edition_id: int, portion_price: Optional[float]) -> int:
+    """
+    Recalcula total_amount de todas las ventas de la edición con `portion_price`
+    en un solo UPDATE (sin commit: lo hace el caller). Solo toca las filas cuyo
+    total cambia; devuelve cuántas. Sin precio no hay nada que recalcular.
+    """
+    if portion_price is None:
+        return 0
+    total = _bulk_total_expr({}, portion_price)
+    stmt = (
+        update(Sale)
+        .where(Sale.edition_id == edition_id, Sale.total_amount.is_distinct_from(total))
+        .values(total_amount=total, updated_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).rowcount
+
+def update_sales_bulk(
+    db: Session,
+    changes: dict,
+    *,
+    ids: Optional[Sequence[int]] = None,
+    filters: Optional[dict] = None,
+) -> SaleBulkUpdateResponse:
+    """
+    Aplica `changes` a muchas ventas en un solo UPDATE ... WHERE ... RETURNING:
+    las de `ids` o las que cumplen `filters` (los mismos de get_sales_edition).
+    total_amount se recalcula en SQL solo si cambia algún campo de precio.
+    Los ids inexistentes simplemente no aparecen en la respuesta.
+    """
+    max_rows = settings.sale_bulk_max_rows
+    too_many = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Máximo {max_rows} ventas por pedido",
+    )
+    if ids is not None:
+        if len(ids) > max_rows:
+            raise too_many
+        conditions = [_sale_ids_match(db, ids)]
+    else:
+        conditions = _sales_edition_filters(db, **(filters or {}))
+        # el filtro puede abarcar toda la edición: contar hasta max_rows + 1 antes de escribir
+        matched = db.execute(
+            select(func.count()).select_from(  # pylint: disable=not-callable
+                select(Sale.id).where(*conditions).limit(max_rows + 1).subquery()
+            )
+        ).scalar_one()
+        if matched > max_rows:
+            db.rollback()
+            raise too_many
+
+    values = dict(changes)
+    if any(field in changes for field in SALE_PRICING_FIELDS):
+        values["total_amount"] = _bulk_total_expr(changes)
+    # el UPDATE masivo no pasa por el onupdate del ORM: versión para ETags
+    values["updated_at"] = datetime.now(timezone.utc)
+
+    stmt = (
+        update(Sale)
+        .where(*conditions)
+        .values(**values)
+        .returning(Sale)
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        # validar antes del commit: después las instancias quedan expiradas
+        items = [SaleRef.model_validate(sale) for sale in db.execute(stmt).scalars()]
+        if len(items) > max_rows:
+            # ventas agregadas al filtro entre el conteo y el UPDATE
+            db.rollback()
+            raise too_many
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.exception("Integrity error en actualización masiva de ventas")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Error de integridad al actualizar las ventas")
+    except SQLAlchemyError:
+        db.rollback()
+        logger.exception("Error de base de datos en actualización masiva de ventas")
+        raise HTTPException(status_code=500, detail="Error de base de datos al actualizar las ventas")
+
+    if items:
+        invalidate("sales", "editions")
+    return SaleBulkUpdateResponse(updated=len(items), items=items)
+
 def delete_sale(db: Session, sale_id: int):
     db_sale = db.query(Sale).filter(Sale.id == sale_id).first()
     if db_sale is None:
@@ -277,4 +631,5 @@ def delete_sale(db: Session, sale_id: int):
 
     db.delete(db_sale)
     db.commit()
+    invalidate("sales", "editions")
     return db_sale
@@ -0,0 +1,97 @@
+"""
+Búsqueda de texto compartida por los listados (`q`).
+
+En Postgres los campos buscables tienen índices GIN con `gin_trgm_ops`
+(extensión pg_trgm), que resuelven tanto `ILIKE '%q%'` como los operadores de
+similitud sin recorrer la tabla:
+  - ILIKE mantiene las coincidencias de siempre (subcadena),
+  - `col %> q` (word_similarity) agrega coincidencias aproximadas, así un
+    error de tipeo ("gonzales") igual encuentra "María González",
+  - word_similarity() ordena los resultados por relevancia.
+
+En otros motores (o con settings.search_fuzzy_enabled = False) queda solo el
+ILIKE, sin ranking, y el listado conserva su orden habitual.
+"""
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import Float, func, or_, select
+from sqlalchemy.orm import Session
+
+from core.config import settings  # pylint: disable=import-error
+from crud.pagination import SortKey  # pylint: disable=import-error
+
+# con menos caracteres no hay trigramas suficientes para que la similitud aporte
+MIN_FUZZY_LENGTH = 3
+
+
+@dataclass(frozen=True)
+class TextSearch:
+    condition: Any
+    # expresión de relevancia (0..1); None si la búsqueda no rankea
+    rank: Optional[Any] = None
+
+    @property
+    def ranked(self) -> bool:
+        return self.rank is not None
+
+
+def _fuzzy_available(db: Session) -> bool:
+    return settings.search_fuzzy_enabled and db.get_bind().dialect.name == "postgresql"
+
+
+def text_search(
+    db: Session,
+    q: Optional[str],
+    columns: Sequence[Any],
+    extra_conditions: Sequence[Any] = (),
+) -> Optional[TextSearch]:
+    """
+    Condición (y ranking, si aplica) para buscar `q` en `columns`.
+    `extra_conditions` se suman al OR sin participar del ranking (ej. enums).
+    Devuelve None si `q` está vacío.
+    """
+    term = q.strip() if q else ""
+    if not term:
+        return None
+
+    like = f"%{term}%"
+    conditions: List[Any] = [col.ilike(like) for col in columns]
+    conditions.extend(extra_conditions)
+
+    if not _fuzzy_available(db) or len(term) < MIN_FUZZY_LENGTH:
+        return TextSearch(condition=or_(*conditions))
+
+    # umbral del operador %> solo para esta transacción
+    db.execute(select(func.set_config(
+        "pg_trgm.word_similarity_threshold",
+        str(settings.search_similarity_threshold),
+        True,
+    )))
+    conditions.extend(col.op("%>")(term) for col in columns)
+
+    scores = [func.word_similarity(term, col, type_=Float) for col in columns]
+    # greatest() ignora los NULL (columnas opcionales vacías)
+    rank = scores[0] if len(scores) == 1 else func.greatest(*scores, type_=Float)
+    return TextSearch(condition=or_(*conditions), rank=rank)
+
+
+def search_sort_keys(search: Optional[TextSearch], keys: Sequence[SortKey]) -> List[SortKey]:
+    """Claves de orden del listado, precedidas por la relevancia si la búsqueda rankea."""
+    if search is None or not search.ranked:
+        return list(keys)
+    return [(search.rank, True), *keys]
+
+
+def with_rank(stmt, search: Optional[TextSearch]):
+    """Agrega la relevancia como columna extra (`search_rank`) para armar el cursor."""
+    if search is None or not search.ranked:
+        return stmt
+    return stmt.add_columns(search.rank.label("search_rank"))
+
+
+def rank_prefix(search: Optional[TextSearch], row) -> list:
+    """Valor de relevancia de `row` para anteponer en el cursor (vacío sin ranking)."""
+    if search is None or not search.ranked:
+        return []
+    return [row.search_rank]
@@ -6,3 +6,4 @@ from models.sale import Sale # pylint: disable=import-error, unused-import
 from models.purchase import Purchase # pylint: disable=import-error, unused-import
 from models.ingredient import Ingredient # pylint: disable=import-error, unused-import
 from models.edition_ingredient import EditionIngredient # pylint: disable=import-error, unused-import
+from models.edition_summary import EditionSummary # pylint: disable=import-error, unused-import
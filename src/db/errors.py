@@ -0,0 +1,40 @@
+"""
+Datos estructurados de errores de integridad (SQLSTATE y nombre de constraint),
+para no depender del texto del mensaje del driver.
+
+Soporta psycopg2 (`pgcode`, `diag.constraint_name`) y asyncpg vía el adaptador
+de SQLAlchemy (`sqlstate`; el error original de asyncpg trae `constraint_name`).
+Con sqlite3 (desarrollo local y tests) el código extendido se traduce al
+SQLSTATE equivalente; el nombre de la constraint no se conoce.
+"""
+from typing import Optional, Tuple
+
+from sqlalchemy.exc import DBAPIError
+
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+_SQLITE_SQLSTATES = {
+    "SQLITE_CONSTRAINT_UNIQUE": UNIQUE_VIOLATION,
+    "SQLITE_CONSTRAINT_PRIMARYKEY": UNIQUE_VIOLATION,
+    "SQLITE_CONSTRAINT_FOREIGNKEY": FOREIGN_KEY_VIOLATION,
+}
+
+
+def integrity_details(exc: DBAPIError) -> Tuple[Optional[str], Optional[str]]:
+    """(SQLSTATE, nombre de la constraint) del error del driver; None si no se conocen."""
+    orig = exc.orig
+    sqlstate = (
+        getattr(orig, "pgcode", None)
+        or getattr(orig, "sqlstate", None)
+        or _SQLITE_SQLSTATES.get(getattr(orig, "sqlite_errorname", None))
+    )
+
+    constraint = None
+    diag = getattr(orig, "diag", None)
+    if diag is not None:
+        constraint = getattr(diag, "constraint_name", None)
+    if constraint is None:
+        # asyncpg: el adaptador encadena la excepción original
+        constraint = getattr(orig, "constraint_name", None) or getattr(orig.__cause__, "constraint_name", None)
+    return sqlstate, constraint
@@ -0,0 +1,139 @@
+"""
+Pool de conexiones configurable e instrumentado.
+
+Los parámetros salen de settings (db_pool_*), y los pools llevan métricas
+propias para dimensionarlos contra el `max_connections` de Postgres:
+  - checkouts: conexiones entregadas por el pool,
+  - acquire_seconds_total / acquire_seconds_max: tiempo esperando una conexión
+    (incluye abrirla si hizo falta y el pre-ping),
+  - timeouts: pedidos que superaron db_pool_timeout,
+  - overflow_events: conexiones abiertas por encima de db_pool_size.
+
+Con db_pgbouncer=True se asume PgBouncer en modo transacción: asyncpg no
+cachea prepared statements (no sobreviven a un cambio de backend) y, si además
+db_null_pool=True, cada checkout abre/cierra contra PgBouncer y el pooling
+queda solo de su lado.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from core.config import settings  # pylint: disable=import-error
+
+
+class PoolMetrics:
+    """Contadores acumulados de un pool (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_events = 0
+        self.acquire_seconds_total = 0.0
+        self.acquire_seconds_max = 0.0
+
+    def record(self, elapsed: float, *, overflow: bool = False, timeout: bool = False) -> None:
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            if overflow:
+                self.overflow_events += 1
+            self.acquire_seconds_total += elapsed
+            self.acquire_seconds_max = max(self.acquire_seconds_max, elapsed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "overflow_events": self.overflow_events,
+                "acquire_seconds_total": round(self.acquire_seconds_total, 6),
+                "acquire_seconds_avg": round(self.acquire_seconds_total / attempts, 6) if attempts else 0.0,
+                "acquire_seconds_max": round(self.acquire_seconds_max, 6),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Mide cada `connect()` del pool; `_overflow` crece cuando abre una conexión extra."""
+
+    metrics: PoolMetrics
+
+    def connect(self):  # type: ignore[override]
+        overflow_before = self._overflow
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - started, timeout=True)
+            raise
+        self.metrics.record(
+            time.perf_counter() - started,
+            overflow=self._overflow > overflow_before and self._overflow > 0,
+        )
+        return conn
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+def engine_pool_kwargs(is_async: bool = False) -> Dict[str, Any]:
+    """kwargs de create_engine / create_async_engine según settings.db_pool_*."""
+    kwargs: Dict[str, Any] = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if settings.db_null_pool:
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_use_lifo=settings.db_pool_use_lifo,
+        )
+    if settings.db_pgbouncer and is_async:
+        # asyncpg: sin prepared statements cacheados (PgBouncer en modo transacción)
+        kwargs["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    return kwargs
+
+
+def pool_status(engine: Optional[Engine]) -> Optional[Dict[str, Any]]:
+    """Estado actual + métricas acumuladas del pool de `engine` (None si no hay engine)."""
+    if engine is None:
+        return None
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,  # pylint: disable=protected-access
+            timeout=pool.timeout(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            # conexiones abiertas por encima de size (negativo = lugar libre en el pool base)
+            overflow=pool.overflow(),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status["metrics"] = metrics.snapshot()
+    return status
@@ -0,0 +1,84 @@
+"""
+Ruteo de lecturas a réplicas (settings.database_replica_urls).
+
+  - Las réplicas se recorren en round-robin.
+  - Una réplica que falla al entregar una conexión queda fuera de la rotación
+    `settings.replica_retry_seconds`; si no queda ninguna, se lee del primario.
+  - Read-your-writes: después de una escritura exitosa la respuesta lleva la
+    cookie READ_PRIMARY_COOKIE; mientras siga vigente, las lecturas de ese
+    cliente van al primario (la réplica puede no haber aplicado todavía su
+    propia escritura).
+"""
+import logging
+import threading
+import time
+from typing import Generic, List, Optional, TypeVar
+
+from core.config import settings  # pylint: disable=import-error
+
+logger = logging.getLogger(__name__)
+
+READ_PRIMARY_COOKIE = "db_read_primary_until"
+READ_METHODS = frozenset({"GET", "HEAD"})
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+E = TypeVar("E")
+
+
+def replica_urls() -> List[str]:
+    raw = settings.database_replica_urls or ""
+    return [url.strip() for url in raw.split(",") if url.strip()]
+
+
+class ReplicaSet(Generic[E]):
+    """Engines de réplica con round-robin y exclusión temporal de las caídas."""
+
+    def __init__(self, engines: List[E]) -> None:
+        self.engines = engines
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until = [0.0] * len(engines)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def candidates(self) -> List[E]:
+        """Réplicas disponibles, empezando por la siguiente del round-robin."""
+        now = time.monotonic()
+        count = len(self.engines)
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % max(count, 1)
+            order = [(start + i) % count for i in range(count)]
+            return [self.engines[i] for i in order if self._down_until[i] <= now]
+
+    def mark_down(self, engine: E) -> None:
+        with self._lock:
+            idx = self.engines.index(engine)
+            self._down_until[idx] = time.monotonic() + settings.replica_retry_seconds
+        logger.warning("Réplica fuera de rotación por %ss: %r", settings.replica_retry_seconds, engine)
+
+
+def reads_from_replica(method: str, cookies: dict, replicas: Optional[ReplicaSet]) -> bool:
+    """True si el request puede leerse de una réplica."""
+    if not replicas or method not in READ_METHODS:
+        return False
+    try:
+        primary_until = float(cookies.get(READ_PRIMARY_COOKIE, 0))
+    except ValueError:
+        primary_until = 0.0
+    return primary_until <= time.time()
+
+
+def mark_recent_write(response) -> None:
+    """Setea la cookie de read-your-writes en `response` (Starlette Response)."""
+    window = settings.read_your_writes_seconds
+    if window <= 0:
+        return
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        f"{time.time() + window:.3f}",
+        max_age=int(window) + 1,
+        httponly=True,
+        samesite="lax",
+    )
@@ -1,9 +1,85 @@
+from contextlib import contextmanager
+from typing import Iterator
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.orm.session import engine
 from core.config import settings
+from db.pool import engine_pool_kwargs
+from db.replicas import ReplicaSet, replica_urls
 
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, **engine_pool_kwargs())
 SessionLocal = sessionmaker(autocommit=False, 
                             autoflush=False, 
-                            bind=engine)
\ No newline at end of file
+                            bind=engine)
+
+
+def _async_url(url: str) -> str:
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+def _async_database_url() -> str:
+    if settings.async_database_url:
+        return settings.async_database_url
+    return _async_url(settings.database_url)
+
+
+# stack async (settings.db_async): mismo esquema/ORM, driver asyncpg.
+# expire_on_commit=False: los objetos devueltos por el CRUD se serializan fuera
+# de la sesión y no pueden recargar atributos con IO implícito.
+async_engine = (
+    create_async_engine(_async_database_url(), **engine_pool_kwargs(is_async=True))
+    if settings.db_async
+    else None
+)
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
+# réplicas de lectura (settings.database_replica_urls); vacías si no hay configuradas
+replicas = ReplicaSet([create_engine(url, **engine_pool_kwargs()) for url in replica_urls()])
+async_replicas = ReplicaSet(
+    [create_async_engine(_async_url(url), **engine_pool_kwargs(is_async=True)) for url in replica_urls()]
+    if settings.db_async
+    else []
+)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+AsyncReplicaSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+def begin_read_snapshot(db: Session) -> None:
+    """
+    Abre la transacción de `db` como REPEATABLE READ READ ONLY, para que varias
+    consultas de un mismo listado vean el mismo snapshot (totales consistentes
+    con las filas). Solo aplica si la sesión todavía no empezó una transacción
+    y el motor es Postgres; en otro caso no hace nada.
+    """
+    if db.in_transaction() or db.get_bind().dialect.name != "postgresql":
+        return
+    db.connection(execution_options={
+        "isolation_level": "REPEATABLE READ",
+        "postgresql_readonly": True,
+    })
+
+
+@contextmanager
+def transaction(db: Session) -> Iterator[Session]:
+    """
+    Unidad de trabajo atómica sobre la conexión que ya tiene `db` (no abre otra
+    sesión ni toma otra conexión del pool).
+
+    - Si `db` no tiene transacción en curso: BEGIN ... COMMIT al salir del
+      bloque (ROLLBACK si hay una excepción).
+    - Si ya hay una en curso (un caller que agrupa varias operaciones): SAVEPOINT;
+      un error deshace solo este bloque y el COMMIT queda a cargo del caller.
+    """
+    if db.in_transaction():
+        with db.begin_nested():
+            yield db
+    else:
+        with db.begin():
+            yield db
@@ -1,9 +1,39 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from anyio import to_thread
+from fastapi import FastAPI, Request
+from sqlalchemy.exc import SQLAlchemyError
 from starlette.middleware.cors import CORSMiddleware
 from core.config import settings
-from api.routes import customer, sale, edition, ingredient, purchase, edition_ingredient
+from api.formats import BinaryFormatMiddleware
+from api.routes import customer, sale, edition, ingredient, purchase, edition_ingredient, imports, internal
+from crud.customer_autocomplete import customer_index
+from db.replicas import WRITE_METHODS, mark_recent_write
+from db.session import SessionLocal, async_engine, async_replicas
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+    # índice de autocompletado de clientes: si la carga falla, el endpoint usa la base
+    if settings.autocomplete_enabled:
+        try:
+            with SessionLocal() as db:
+                customer_index.load(db)
+        except SQLAlchemyError:
+            logger.exception("No se pudo cargar el autocompletado de clientes")
+    yield
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replicas.engines:
+        await replica.dispose()
 
-app = FastAPI(title=settings.app_name, version=settings.app_version)
+
+app = FastAPI(title=settings.app_name, version=settings.app_version, lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
@@ -18,6 +48,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# MessagePack / CBOR por negociación de contenido (ver api/formats.py)
+app.add_middleware(BinaryFormatMiddleware)
+
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    # después de escribir, las lecturas de este cliente van al primario por un rato
+    response = await call_next(request)
+    if request.method in WRITE_METHODS and response.status_code < 400:
+        mark_recent_write(response)
+    return response
+
 
 app.include_router(customer.router, prefix="/customers", tags=["Clientes (customers)"])
 app.include_router(edition.router, prefix="/editions", tags=["Ediciones (editions)"])
@@ -25,3 +67,5 @@ app.include_router(sale.router, prefix="/sales", tags=["Ventas (sales)"])
 app.include_router(ingredient.router, prefix="/ingredients", tags=["Ingredientes (ingredients)"])
 app.include_router(purchase.router, prefix="/purchases", tags=["Compras (purchases)"])
 app.include_router(edition_ingredient.router, prefix="/edition_ingredients", tags=["Ingredientes por edición (edition_ingredients)"])
+app.include_router(imports.router, prefix="/imports", tags=["Importación masiva (imports)"])
+app.include_router(internal.router, prefix="/internal", tags=["Interno (internal)"])
@@ -4,5 +4,6 @@ from models.sale import Sale
 from models.ingredient import Ingredient
 from models.purchase import Purchase
 from models.edition_ingredient import EditionIngredient
+from models.edition_summary import EditionSummary
 
-__all__ = ["Customer", "Edition", "Sale", "EditionIngredient", "Ingredient", "Purchase"]
\ No newline at end of file
+__all__ = ["Customer", "Edition", "Sale", "EditionIngredient", "Ingredient", "Purchase", "EditionSummary"]
\ No newline at end of file
@@ -1,11 +1,18 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, BigInteger, String, DateTime
+from sqlalchemy import Column, BigInteger, String, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.associationproxy import association_proxy
 from db.base_class import Base # pylint: disable=import-error
 
 class Customer(Base): # pylint: disable=too-few-public-methods
     __tablename__ = "customer"
+    __table_args__ = (
+        Index('ix_customer_name_id', 'name', 'id'),  # paginación keyset
+        # búsqueda por subcadena / similitud (pg_trgm)
+        Index('ix_customer_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_customer_email_trgm', 'email', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}),
+        Index('ix_customer_phone_trgm', 'phone', postgresql_using='gin', postgresql_ops={'phone': 'gin_trgm_ops'}),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
@@ -13,6 +20,9 @@ class Customer(Base): # pylint: disable=too-few-public-methods
     email = Column(String, nullable=True, unique=True, index=True)
     address = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    # versión de la fila para ETags/Last-Modified; los UPDATE masivos deben setearla explícitamente
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc), server_default=func.now())
 
     editions = association_proxy('sales', 'edition') # view-only por defecto
     
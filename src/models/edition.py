@@ -1,6 +1,6 @@
 import sqlalchemy as sa
 from sqlalchemy.types import Enum as SAEnum
-from sqlalchemy import Column, BigInteger, String, DateTime, Float
+from sqlalchemy import Column, BigInteger, String, DateTime, Float, Index, func
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
 from datetime import datetime, timezone
@@ -13,6 +13,9 @@ class EditionStatus(PyEnum):
     CANCELLED = "CANCELLED"
 class Edition(Base): # pylint: disable=too-few-public-methods
     __tablename__ = "edition"
+    __table_args__ = (
+        Index('ix_edition_date_id', 'date', 'id'),  # paginación keyset
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     date = Column(DateTime, nullable=False)
@@ -25,6 +28,9 @@ class Edition(Base): # pylint: disable=too-few-public-methods
     portion_price = Column(Float, nullable=True)
     notes = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    # versión de la fila para ETags/Last-Modified; los UPDATE masivos deben setearla explícitamente
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc), server_default=func.now())
 
     # Una edición tiene muchas ventas
     sales = relationship(
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, BigInteger, Float, DateTime, ForeignKey, UniqueConstraint, String
+from sqlalchemy import Column, BigInteger, Float, DateTime, ForeignKey, UniqueConstraint, String, Index
 from sqlalchemy.orm import relationship
 from db.base_class import Base  # pylint: disable=import-error
 
@@ -7,6 +7,7 @@ class EditionIngredient(Base):
     __tablename__ = "edition_ingredient"
     __table_args__ = (
         UniqueConstraint('edition_id', 'ingredient_id', name='uq_edition_ingredient'),
+        Index('ix_edition_ingredient_edition_created_at_id', 'edition_id', 'created_at', 'id'),
     )
 
     id = Column(BigInteger, primary_key=True, index=True)
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, BigInteger, Float, DateTime, ForeignKey
+from db.base_class import Base  # pylint: disable=import-error
+
+class EditionSummary(Base):  # pylint: disable=too-few-public-methods
+    """
+    Agregados financieros por edición, mantenidos por triggers de Postgres en la
+    misma transacción que los INSERT/UPDATE/DELETE de sale y edition_ingredient
+    (ver migración add_edition_summary). La aplicación solo lee esta tabla;
+    para reconstruirla o verificarla usar `python -m commands.edition_summary`.
+    """
+    __tablename__ = "edition_summary"
+
+    edition_id = Column(BigInteger, ForeignKey("edition.id", ondelete="CASCADE"), primary_key=True)
+    # SUM(sale.total_portions)
+    sales_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    # SUM(edition_ingredient.subtotal)
+    edition_costs = Column(Float, nullable=False, default=0.0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc))
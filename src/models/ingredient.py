@@ -1,6 +1,6 @@
 from enum import Enum as PyEnum
 from datetime import datetime, timezone
-from sqlalchemy import Column, BigInteger, String, DateTime, Float
+from sqlalchemy import Column, BigInteger, String, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import Enum as SAEnum
 from db.base_class import Base  # pylint: disable=import-error
@@ -16,6 +16,12 @@ class Category(PyEnum):
 
 class Ingredient(Base):
     __tablename__ = "ingredient"
+    __table_args__ = (
+        Index('ix_ingredient_created_at_id', 'created_at', 'id'),  # paginación keyset
+        # búsqueda por subcadena / similitud (pg_trgm)
+        Index('ix_ingredient_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_ingredient_unit_trgm', 'unit', postgresql_using='gin', postgresql_ops={'unit': 'gin_trgm_ops'}),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     name = Column(String, nullable=False, unique=True, index=True)
@@ -24,8 +30,8 @@ class Ingredient(Base):
     category = Column(SAEnum(Category, name="category", native_enum=True), nullable=False)
 
     created_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc),
-                        onupdate=datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc))
 
     purchases = relationship(
         "Purchase",
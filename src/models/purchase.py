@@ -61,6 +61,10 @@ class Purchase(Base):
 
     __table_args__ = (
         Index("ix_purchase_ingredient_paymentstatus", "ingredient_id", "payment_status"),
+        Index("ix_purchase_purchased_at_id", "purchased_at", "id"),  # paginación keyset
+        # búsqueda por subcadena / similitud (pg_trgm)
+        Index("ix_purchase_supplier_trgm", "supplier", postgresql_using="gin", postgresql_ops={"supplier": "gin_trgm_ops"}),
+        Index("ix_purchase_notes_trgm", "notes", postgresql_using="gin", postgresql_ops={"notes": "gin_trgm_ops"}),
     )
 
 @event.listens_for(Purchase, "before_insert")
@@ -1,7 +1,7 @@
 from enum import Enum as PyEnum
 from datetime import datetime, timezone
 import sqlalchemy as sa
-from sqlalchemy import Column, Float, Index, DateTime, BigInteger, String, Integer, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Float, Index, DateTime, BigInteger, String, Integer, Boolean, ForeignKey, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import Enum as SAEnum
 from db.base_class import Base # pylint: disable=import-error
@@ -19,6 +19,9 @@ class Sale(Base): # pylint: disable=too-few-public-methods
     __table_args__ = (
         UniqueConstraint('edition_id', 'customer_id', name='uq_sale_edition_customer'),
         Index('ix_sale_customer_edition', 'customer_id', 'edition_id'),  # índice compuesto
+        # paginación keyset: orden (created_at, id), global y por edición
+        Index('ix_sale_created_at_id', 'created_at', 'id'),
+        Index('ix_sale_edition_created_at_id', 'edition_id', 'created_at', 'id'),
     )
 
     id = Column(BigInteger, primary_key=True, index=True)
@@ -40,6 +43,9 @@ class Sale(Base): # pylint: disable=too-few-public-methods
     seller_name = Column(String, nullable=True)
     discount_price = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    # versión de la fila para ETags/Last-Modified; los UPDATE masivos deben setearla explícitamente
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc), server_default=func.now())
 
     customer_id = Column(BigInteger, ForeignKey("customer.id", ondelete="CASCADE"), nullable=False, index=True)
     edition_id = Column(BigInteger, ForeignKey("edition.id", ondelete="CASCADE"), nullable=False, index=True)
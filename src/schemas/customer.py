@@ -39,10 +39,33 @@ class CustomerRead(CustomerBase):
 
 class CustomerListResponse(BaseModel):
     items: List[CustomerRead]
-    total: int
+    # None cuando total_mode=none; aproximado cuando total_mode=estimate
+    total: Optional[int] = None
     limit: int
     offset: int
     next_offset: Optional[int] = None
     prev_offset: Optional[int] = None
+    # cursor opaco para pedir la página siguiente en modo keyset
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+class CustomerAutocompleteItem(BaseModel):
+    id: int
+    name: str
+    phone: Optional[str] = None
+    email: Optional[str] = None
+
+class CustomerAutocompleteResponse(BaseModel):
+    items: List[CustomerAutocompleteItem]
+    # "memory" (índice en memoria) | "database" (índice no disponible)
+    source: str
+
+class CustomerAutocompleteStats(BaseModel):
+    ready: bool
+    customers: int
+    tokens: int
+    # memoria aproximada del índice en este proceso
+    memory_bytes: int
+    loaded_seconds_ago: Optional[float] = None
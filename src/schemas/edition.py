@@ -66,6 +66,24 @@ class EditionUpdate(BaseModel):
         return v
 
 
+# -----------------------
+# Clonado (POST /editions/{id}/clone)
+# -----------------------
+class EditionClone(BaseModel):
+    date: datetime_first.date = Field(..., description="Fecha de la nueva edición (YYYY-MM-DD)")
+    name: str = Field(..., min_length=1, description="Nombre de la nueva edición")
+    portion_price: Optional[float] = Field(None, ge=0, description="Precio por porción; si no se envía, el de la edición origen")
+    notes: Optional[str] = Field(None, description="Notas opcionales")
+    status: EditionStatus = Field(EditionStatus.PENDING, description="Estado de la nueva edición")
+    portion_factor: float = Field(1.0, gt=0, description="Escala las cantidades de ingredientes (ej. 1.5 = 50% más porciones)")
+    reprice: bool = Field(False, description="Tomar el precio unitario actual de cada ingrediente en vez del de la edición origen")
+    create_purchases: bool = Field(False, description="Registrar también una compra pendiente por ingrediente")
+
+    @field_validator("date", mode="before")
+    def parse_date(cls, v): # pylint: disable=no-self-argument
+        return EditionBase.parse_date(v)
+
+
 # -----------------------
 # Read / Response model
 # -----------------------
@@ -78,13 +96,27 @@ class EditionRead(EditionBase):
     net_profits: Optional[float] = None
     model_config = {"from_attributes": True}
     
+class EditionCloneResponse(BaseModel):
+    edition: EditionRead
+    ingredients_copied: int = 0
+    purchases_created: int = 0
+
+class EditionRecomputeTotalsResponse(BaseModel):
+    edition_id: int
+    # ventas cuyo total_amount cambió
+    sales_updated: int = 0
+
 class EditionListResponse(BaseModel):
     items: List[EditionRead]
-    total: int
+    # None cuando total_mode=none; aproximado cuando total_mode=estimate
+    total: Optional[int] = None
     limit: int
     offset: int
     next_offset: Optional[int] = None
     prev_offset: Optional[int] = None
+    # cursor opaco para pedir la página siguiente en modo keyset
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 # -----------------------
 # Nota: si querés incluir la lista de ventas (SaleRead) dentro del EditionRead,
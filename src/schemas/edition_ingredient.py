@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional, Union
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -20,6 +20,13 @@ class EditionIngredientBase(BaseModel):
 class EditionIngredientCreate(EditionIngredientBase):
     unit_price: Optional[float] = None  # opcional si tu flujo rellena desde purchase/ingredient
 
+# sum: acumula sobre la fila existente | replace: la pisa | nothing: 409 si ya existe
+EditionIngredientStrategy = Literal["sum", "replace", "nothing"]
+
+class EditionIngredientBatchCreate(BaseModel):
+    items: List[EditionIngredientCreate] = Field(..., min_length=1)
+    strategy: EditionIngredientStrategy = "sum"
+
 class EditionIngredientUpdate(BaseModel):
     ingredient_id: Optional[int] = None
     quantity: Optional[float] = None
@@ -40,16 +47,44 @@ class EditionIngredientRead(EditionIngredientBase):
 
     model_config = {"from_attributes": True}
 
+# Item sin previews anidados: solo ids (modo normalizado, include=ingredient,purchase,edition)
+class EditionIngredientRef(EditionIngredientBase):
+    id: int
+    edition_id: int
+    purchase_id: Optional[int] = None
+    subtotal: float
+    unit_price: float = Field(..., ge=0.0)
+    created_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
 class EditionIngredientListResponse(BaseModel):
-    items: List[EditionIngredientRead]
-    total: int
+    items: List[Union[EditionIngredientRead, EditionIngredientRef]]
+    # None cuando total_mode=none; aproximado cuando total_mode=estimate
+    total: Optional[int] = None
     limit: int
     offset: int
     next_offset: Optional[int] = None
     prev_offset: Optional[int] = None
+    # cursor opaco para pedir la página siguiente en modo keyset
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
     category_totals: List[CategoryTotal] = []
     ingredients_total: float = 0.0
     total_expenses: Optional[float] = None 
+
+    # entidades side-loaded (solo en modo include), indexadas por id
+    ingredients: Optional[Dict[int, IngredientPreview]] = None
+    editions: Optional[Dict[int, EditionPreview]] = None
+    purchases: Optional[Dict[int, PurchasePreview]] = None
     
     model_config = {"from_attributes": True}
+
+class EditionIngredientBatchResponse(BaseModel):
+    # filas nuevas / filas existentes modificadas / compras registradas (una por ítem)
+    created: int = 0
+    updated: int = 0
+    purchases: int = 0
+    # una por ingrediente, en el orden en que aparecen en el pedido
+    items: List[EditionIngredientRead]
@@ -0,0 +1,51 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ImportEntity(str, Enum):
+    CUSTOMERS = "customers"
+    INGREDIENTS = "ingredients"
+    PURCHASES = "purchases"
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+
+# Estado / progreso de una importación masiva
+class ImportJobRead(BaseModel):
+    id: str
+    entity: ImportEntity
+    format: ImportFormat
+    # pending | running | done | failed
+    status: str
+    rows_read: int
+    valid: int
+    invalid: int
+    inserted: int
+    updated: int
+    # filas válidas reemplazadas por otra posterior con la misma clave (o en conflicto)
+    skipped: int
+    # filas válidas que no se pudieron guardar (lote revertido, ingrediente inexistente, ...)
+    failed: int
+    batches: int
+    # primeros settings.import_max_errors errores por línea
+    errors: List[ImportRowError] = []
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: Optional[float] = None
+    rows_per_second: Optional[float] = None
+
+
+class ImportJobListResponse(BaseModel):
+    items: List[ImportJobRead]
@@ -37,10 +37,14 @@ class IngredientRead(IngredientBase):
 
 class IngredientListResponse(BaseModel):
     items: List[IngredientRead]
-    total: int
+    # None cuando total_mode=none; aproximado cuando total_mode=estimate
+    total: Optional[int] = None
     limit: int
     offset: int
     next_offset: Optional[int] = None
     prev_offset: Optional[int] = None
+    # cursor opaco para pedir la página siguiente en modo keyset
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
     model_config = {"from_attributes": True}
\ No newline at end of file
@@ -3,7 +3,7 @@ from typing import List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
-from models.sale import PaymentStatus # pylint: disable=import-error
+from models.purchase import PaymentStatus # pylint: disable=import-error
 
 class PurchaseBase(BaseModel):
     ingredient_id: int
@@ -36,10 +36,14 @@ class PurchaseRead(PurchaseBase):
 
 class PurchaseListResponse(BaseModel):
     items: List[PurchaseRead]
-    total: int
+    # None cuando total_mode=none; aproximado cuando total_mode=estimate
+    total: Optional[int] = None
     limit: int
     offset: int
     next_offset: Optional[int] = None
     prev_offset: Optional[int] = None
+    # cursor opaco para pedir la página siguiente en modo keyset
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
     model_config = {"from_attributes": True}
@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Dict, Literal, Optional, List, Union
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from schemas.customer import CustomerRead  # pylint: disable=import-error
 from schemas.edition import EditionRead  # pylint: disable=import-error
@@ -54,13 +54,69 @@ class SaleUpdate(BaseModel):
     edition_id: Optional[int] = None
 
 
-# Modelo que devuelve la API (read)
-class SaleRead(SaleBase):
+# PATCH /sales/bulk: campos operativos que se aplican a muchas ventas a la vez;
+# total_portions / discount_price / additional_cost recalculan total_amount en SQL
+class SaleBulkChanges(BaseModel):
+    payment_status: Optional[PaymentStatus] = None
+    payment_transfer: Optional[bool] = None
+    delivered: Optional[bool] = None
+    delivery: Optional[bool] = None
+    freeze: Optional[bool] = None
+    saved: Optional[bool] = None
+    total_portions: Optional[int] = Field(None, ge=0)
+    discount_price: Optional[float] = Field(None, ge=0)
+    additional_cost: Optional[float] = Field(None, ge=0)
+    seller_name: Optional[str] = None
+
+    # omitir el campo = no tocarlo; null explícito solo vale para los que admiten
+    # vaciarse (descuento, costo adicional, vendedor)
+    @field_validator("payment_status", "payment_transfer", "delivered", "delivery", "freeze", "saved",
+                     "total_portions")
+    def not_null(cls, v, info): # pylint: disable=no-self-argument
+        if v is None:
+            raise ValueError(f"{info.field_name} no puede ser null")
+        return v
+
+
+# mismos filtros que GET /sales/edition/{edition_id}
+class SaleBulkFilter(BaseModel):
+    edition_id: int
+    customer_q: Optional[str] = None
+    payment_status: Optional[PaymentStatus] = None
+    payment_transfer: Optional[bool] = None
+    delivered: Optional[bool] = None
+    delivery: Optional[bool] = None
+    freeze: Optional[bool] = None
+    saved: Optional[bool] = None
+
+
+class SaleBulkUpdate(BaseModel):
+    # ventas a modificar: por ids o por filtro (uno de los dos)
+    ids: Optional[List[int]] = Field(None, min_length=1)
+    filter: Optional[SaleBulkFilter] = None
+    changes: SaleBulkChanges
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Enviar 'ids' o 'filter' (uno de los dos)")
+        if not self.changes.model_fields_set:
+            raise ValueError("'changes' no tiene campos para actualizar")
+        return self
+
+
+# Venta sin relaciones anidadas: solo ids (modo normalizado, include=customer,edition)
+class SaleRef(SaleBase):
     id: int
     total_amount: float
     edition_id: int
     created_at: Optional[datetime] = None
-    
+
+    model_config = {"from_attributes": True}
+
+
+# Modelo que devuelve la API (read)
+class SaleRead(SaleRef):
     customer: CustomerRead
     edition: EditionRead
 
@@ -69,9 +125,41 @@ class SaleRead(SaleBase):
 
 # 📦 Respuesta con paginación
 class SaleListResponse(BaseModel):
-    items: List[SaleRead]
-    total: int
+    # SaleRef cuando se pide include=...; las entidades van una sola vez en los mapas
+    items: List[Union[SaleRead, SaleRef]]
+    # None cuando total_mode=none; aproximado cuando total_mode=estimate
+    total: Optional[int] = None
     limit: int
     offset: int
     next_offset: Optional[int] = None
     prev_offset: Optional[int] = None
+    # cursor opaco para pedir la página siguiente en modo keyset
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+    # entidades side-loaded (solo en modo include), indexadas por id
+    customers: Optional[Dict[int, CustomerRead]] = None
+    editions: Optional[Dict[int, EditionRead]] = None
+
+
+# 📥 Carga masiva (POST /sales/bulk): un resultado por fila, en el orden de entrada
+class SaleBulkResult(BaseModel):
+    index: int
+    # created | duplicate (ya existía o repetida en el lote) | invalid | error (falla de base)
+    status: Literal["created", "duplicate", "invalid", "error"]
+    sale_id: Optional[int] = None
+    total_amount: Optional[float] = None
+    detail: Optional[str] = None
+
+
+class SaleBulkResponse(BaseModel):
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: int = 0
+    results: List[SaleBulkResult]
+
+
+class SaleBulkUpdateResponse(BaseModel):
+    updated: int = 0
+    items: List[SaleRef]
@@ -0,0 +1,149 @@
+"""
+Fixtures compartidas: cada test corre contra una base SQLite nueva en un
+archivo temporal (el esquema sale de los modelos, no de las migraciones) y
+la app con `get_db` apuntando a ella. Lo que depende de Postgres (COPY,
+triggers de edition_summary, EXPLAIN) se prueba a nivel de SQL compilado.
+"""
+# pylint: disable=wrong-import-position,import-error,redefined-outer-name
+import os
+from datetime import datetime, timedelta
+
+# la configuración se lee al importar core.config: definirla antes de importar la app
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import BigInteger, create_engine, event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+import main
+from api.deps import get_db
+from core.config import settings
+from crud import pagination
+from db.base import Base
+from models.customer import Customer
+from models.edition import Edition
+from models.edition_ingredient import EditionIngredient
+from models.ingredient import Ingredient
+from models.purchase import Purchase
+from models.sale import Sale
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(_type, _compiler, **_kw):
+    # SQLite solo autoincrementa claves INTEGER PRIMARY KEY
+    return "INTEGER"
+
+
+INGREDIENTS = [
+    ("Carne", 100.0, "MEAT"),
+    ("Chorizo", 50.0, "SAUSAGES"),
+    ("Poroto", 10.0, "LEGUMES"),
+    ("Zapallo", 5.0, "VEGETABLES"),
+]
+
+
+@pytest.fixture(autouse=True)
+def _test_settings(monkeypatch):
+    # sin cache de respuestas ni de conteos: cada request consulta la base
+    monkeypatch.setattr(settings, "response_cache_enabled", False)
+    monkeypatch.setattr(settings, "count_cache_ttl_seconds", 0.0)
+    monkeypatch.setattr(settings, "autocomplete_enabled", False)
+    # los conteos cacheados de otro test (otra base) comparten clave de SQL
+    pagination._COUNT_CACHE.clear()  # pylint: disable=protected-access
+
+
+@pytest.fixture
+def engine(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def seed(session_factory):
+    """
+    seed(n_sales=..., n_ingredients=...) carga dos ediciones, clientes, ventas
+    de la edición 1 e ingredientes (con su compra) en la edición 1.
+    """
+    def _seed(n_sales: int = 10, n_ingredients: int = 4) -> None:
+        now = datetime(2025, 8, 1)
+        with session_factory() as db:
+            e1 = Edition(name="Locro", date=now, portion_price=10.0, status="PENDING", created_at=now)
+            e2 = Edition(name="Pizza", date=now - timedelta(days=30), portion_price=5.0, status="ACTIVE", created_at=now)
+            db.add_all([e1, e2])
+            db.flush()
+            customers = [
+                Customer(name=f"Cliente {i:04d}", email=f"c{i}@x.com", phone=str(1000 + i), created_at=now)
+                for i in range(n_sales)
+            ]
+            db.add_all(customers)
+            db.flush()
+            for i, customer in enumerate(customers):
+                portions = i % 4 + 1
+                db.add(Sale(total_portions=portions, total_amount=portions * 10.0, edition_id=e1.id,
+                            customer_id=customer.id, created_at=now + timedelta(minutes=i), payment_status="PENDING"))
+            catalog = INGREDIENTS + [
+                (f"Ingrediente {i}", 1.0 + i, "OTHER") for i in range(max(n_ingredients - len(INGREDIENTS), 0))
+            ]
+            for k, (name, price, category) in enumerate(catalog[:n_ingredients]):
+                ingredient = Ingredient(name=name, unit_price=price, unit="kg", category=category,
+                                        created_at=now, updated_at=now)
+                db.add(ingredient)
+                db.flush()
+                purchase = Purchase(ingredient_id=ingredient.id, edition_id=e1.id, quantity=2, unit_price=price,
+                                    total_amount=2 * price, purchased_at=now)
+                db.add(purchase)
+                db.flush()
+                db.add(EditionIngredient(edition_id=e1.id, ingredient_id=ingredient.id, quantity=2, unit_price=price,
+                                         subtotal=2 * price, purchase_id=purchase.id,
+                                         created_at=now + timedelta(minutes=k)))
+            db.commit()
+
+    return _seed
+
+
+@pytest.fixture
+def client(session_factory):
+    def _get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = _get_db
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+
+
+class QueryCounter:
+    """Cuenta las sentencias que el engine manda a la base (before_cursor_execute)."""
+
+    def __init__(self, engine) -> None:
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, _conn, _cursor, statement, *_args) -> None:
+        self.statements.append(statement)
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def queries(engine):
+    return QueryCounter(engine)
@@ -0,0 +1,101 @@
+"""
+Las rutas responden igual con la sesión sync (threadpool) que con AsyncSession
+(settings.db_async): con AsyncSession cada CRUD corre por `run_sync` de run_db.
+"""
+# pylint: disable=import-error,redefined-outer-name
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from api.deps import get_session
+
+pytest.importorskip("aiosqlite")
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # pylint: disable=wrong-import-position
+
+# (método, url, body, status esperado): en orden, las escrituras dependen de las anteriores
+ROUTES = [
+    ("GET", "/customers/", None, 200),
+    ("GET", "/customers/autocomplete?q=Cliente", None, 200),
+    ("GET", "/customers/autocomplete/stats", None, 200),
+    ("GET", "/customers/1", None, 200),
+    ("POST", "/customers/", {"name": "Nuevo", "email": "nuevo@x.com"}, 201),
+    ("PATCH", "/customers/11", {"address": "Calle 1"}, 200),
+    ("GET", "/editions/", None, 200),
+    ("GET", "/editions/1", None, 200),
+    ("POST", "/editions/", {"date": "2025-09-01", "name": "Guiso", "portion_price": 8.0}, 201),
+    ("PATCH", "/editions/3", {"notes": "sin sal"}, 200),
+    ("POST", "/editions/1/clone", {"date": "2025-10-01", "name": "Locro II"}, 201),
+    ("POST", "/editions/1/recompute-totals", None, 200),
+    ("GET", "/ingredients/", None, 200),
+    ("GET", "/ingredients/1", None, 200),
+    ("POST", "/ingredients/", {"name": "Cebolla", "unit_price": 2.0, "category": "VEGETABLES"}, 201),
+    ("PATCH", "/ingredients/5", {"unit_price": 3.0}, 200),
+    ("GET", "/purchases/", None, 200),
+    ("GET", "/purchases/1", None, 200),
+    ("POST", "/purchases/", {"ingredient_id": 5, "quantity": 1.0, "unit_price": 3.0}, 201),
+    ("PATCH", "/purchases/5", {"notes": "feria"}, 200),
+    ("GET", "/edition_ingredients/1", None, 200),
+    ("POST", "/edition_ingredients/3", {"ingredient_id": 1, "quantity": 1.0}, 201),
+    ("POST", "/edition_ingredients/3/batch", {"items": [{"ingredient_id": 2, "quantity": 1.0}]}, 201),
+    ("GET", "/sales/", None, 200),
+    ("GET", "/sales/edition/1", None, 200),
+    ("GET", "/sales/1", None, 200),
+    ("POST", "/sales/", {"total_portions": 2, "customer_id": 1, "edition_id": 3}, 201),
+    ("POST", "/sales/bulk", [{"total_portions": 1, "customer_id": 2, "edition_id": 3}], 200),
+    ("PATCH", "/sales/bulk", {"ids": [1, 2], "changes": {"delivered": True}}, 200),
+    ("PATCH", "/sales/1", {"saved": True}, 200),
+    ("DELETE", "/sales/1", None, 204),
+    ("DELETE", "/purchases/5", None, 204),
+    ("DELETE", "/ingredients/5", None, 204),
+    ("DELETE", "/customers/11", None, 204),
+    ("DELETE", "/editions/3", None, 204),
+    ("GET", "/imports/", None, 200),
+    ("GET", "/internal/db-pool", None, 200),
+    ("GET", "/internal/cache", None, 200),
+]
+
+
+@pytest.fixture
+def async_client(engine):
+    async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)  # pylint: disable=invalid-name
+
+    async def _get_session():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    main.app.dependency_overrides[get_session] = _get_session
+    try:
+        # un solo event loop para todos los requests (las conexiones aiosqlite quedan atadas a él)
+        with TestClient(main.app) as client:
+            yield client
+    finally:
+        main.app.dependency_overrides.pop(get_session, None)
+        with TestClient(main.app) as client:
+            client.portal.call(async_engine.dispose)
+
+
+def _run_routes(client) -> None:
+    for method, url, body, expected in ROUTES:
+        resp = client.request(method, url, json=body)
+        assert resp.status_code == expected, f"{method} {url}: {resp.status_code} {resp.text}"
+
+
+def test_routes_with_sync_session(client, seed):
+    seed(n_sales=10, n_ingredients=4)
+    _run_routes(client)
+
+
+def test_routes_with_async_session(async_client, seed, monkeypatch):
+    seed(n_sales=10, n_ingredients=4)
+    calls = []
+    run_sync = AsyncSession.run_sync
+
+    async def _counting_run_sync(self, fn, *args, **kwargs):
+        calls.append(fn.__name__)
+        return await run_sync(self, fn, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncSession, "run_sync", _counting_run_sync)
+    _run_routes(async_client)
+    # todas las rutas que tocan la base (menos autocompletado/stats e internal) pasaron por run_sync
+    assert len(calls) >= len(ROUTES) - 5
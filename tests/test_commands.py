@@ -0,0 +1,25 @@
+"""Los comandos de benchmark corren de punta a punta sobre una base SQLite de descarte."""
+# pylint: disable=import-error
+import pytest
+
+from commands import bench_async, bench_editions
+
+
+def test_bench_editions_reports_both_history_sizes(tmp_path, capsys):
+    url = f"sqlite:///{tmp_path / 'bench.db'}"
+    assert bench_editions.main(["--database-url", url, "--editions", "20", "--sales", "3",
+                                "--ingredients", "2", "--limit", "5", "--repeat", "2"]) == 0
+    out = capsys.readouterr().out
+    assert "20 ediciones" in out and "200 ediciones" in out
+    assert "10x historial" in out
+
+
+def test_bench_async_runs_both_modes(engine, seed, capsys):
+    pytest.importorskip("aiosqlite")
+    seed(n_sales=10, n_ingredients=4)
+    url = engine.url.render_as_string(hide_password=False)
+    assert bench_async.main(["--database-url", url, "--async-database-url", url.replace("sqlite://", "sqlite+aiosqlite://"),
+                             "--concurrency", "4", "--requests", "20"]) == 0
+    out = capsys.readouterr().out
+    assert "sync" in out and "async" in out
+    assert "errores 0" in out
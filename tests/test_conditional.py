@@ -0,0 +1,60 @@
+"""GET condicionales (ETag / If-None-Match) de los listados que las tablets consultan en polling."""
+# pylint: disable=import-error
+
+
+def _etag(client, url: str):
+    resp = client.get(url)
+    assert resp.status_code == 200, resp.text
+    return resp.headers["ETag"], resp.json()
+
+
+def _revalidate(client, url: str, etag: str):
+    return client.get(url, headers={"If-None-Match": etag})
+
+
+def test_edition_ingredients_unchanged_is_304(client, seed):
+    seed()
+    etag, _ = _etag(client, "/edition_ingredients/1")
+    assert _revalidate(client, "/edition_ingredients/1", etag).status_code == 304
+
+
+def test_edition_ingredients_etag_follows_purchases_no_longer_linked(client, seed):
+    seed()
+    # con `sum` purchase_id pasa a la compra nueva: la compra 1 queda fuera del join
+    resp = client.post("/edition_ingredients/1", json={"ingredient_id": 1, "quantity": 1.0})
+    assert resp.status_code == 201, resp.text
+    etag, body = _etag(client, "/edition_ingredients/1")
+
+    assert client.patch("/purchases/1", json={"quantity": 50.0}).status_code == 200
+
+    resp = _revalidate(client, "/edition_ingredients/1", etag)
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert resp.json()["total_expenses"] != body["total_expenses"]
+
+
+def test_edition_ingredients_etag_changes_when_a_purchase_is_deleted(client, seed):
+    seed()
+    client.post("/edition_ingredients/1", json={"ingredient_id": 1, "quantity": 1.0})
+    etag, body = _etag(client, "/edition_ingredients/1")
+
+    assert client.delete("/purchases/1").status_code == 204
+
+    resp = _revalidate(client, "/edition_ingredients/1", etag)
+    assert resp.status_code == 200
+    assert resp.json()["total_expenses"] < body["total_expenses"]
+
+
+def test_sales_edition_etag(client, seed):
+    seed(n_sales=5)
+    url = "/sales/edition/1"
+    etag, _ = _etag(client, url)
+    assert _revalidate(client, url, etag).status_code == 304
+
+    assert client.patch("/sales/2", json={"delivered": True}).status_code == 200
+    resp = _revalidate(client, url, etag)
+    assert resp.status_code == 200
+    new_etag = resp.headers["ETag"]
+
+    assert client.delete("/sales/3").status_code == 204
+    assert _revalidate(client, url, new_etag).status_code == 200
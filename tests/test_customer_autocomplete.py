@@ -0,0 +1,113 @@
+"""Autocompletado de clientes en memoria (crud/customer_autocomplete.py) y sus hooks de escritura."""
+# pylint: disable=import-error,redefined-outer-name
+import pytest
+
+from core.config import settings
+from crud import customer as crud_customer
+from crud.customer_autocomplete import CustomerAutocompleteIndex
+from models.customer import Customer
+
+
+@pytest.fixture
+def index(monkeypatch, session_factory):
+    """Índice nuevo, cargado desde la base de test y usado por el CRUD y la ruta."""
+    monkeypatch.setattr(settings, "autocomplete_enabled", True)
+    monkeypatch.setattr(settings, "autocomplete_refresh_seconds", 0.0)
+    fresh = CustomerAutocompleteIndex()
+    monkeypatch.setattr(crud_customer, "customer_index", fresh)
+
+    def _load():
+        with session_factory() as db:
+            fresh.load(db)
+        return fresh
+
+    return _load
+
+
+def _add(session_factory, *customers):
+    with session_factory() as db:
+        db.add_all([Customer(name=name, phone=phone, email=email) for name, phone, email in customers])
+        db.commit()
+
+
+def _names(results):
+    return [item["name"] for item in results]
+
+
+def test_prefixes_of_name_email_and_phone(session_factory, index):
+    _add(session_factory,
+         ("José Pérez", "11 2345-6789", "jperez@mail.com"),
+         ("María Gómez", None, "maria.gomez@mail.com"))
+    idx = index()
+
+    assert _names(idx.search("jos")) == ["José Pérez"]
+    assert _names(idx.search("PEREZ")) == ["José Pérez"]
+    assert _names(idx.search("11 2345")) == ["José Pérez"]
+    assert _names(idx.search("gomez")) == ["María Gómez"]
+    assert _names(idx.search("maria.gomez@mail.com")) == ["María Gómez"]
+    assert _names(idx.search("ma go")) == ["María Gómez"]
+    assert idx.search("ma xx") == []
+
+
+def test_whole_word_matches_rank_first_for_single_word_queries(session_factory, index):
+    _add(session_factory, ("Anabel", None, None), ("Ana Martínez", None, None), ("Anahí Ruiz", None, None))
+    idx = index()
+
+    # sin la coincidencia exacta ganaría el nombre más corto (Anabel)
+    assert _names(idx.search("ana")) == ["Ana Martínez", "Anabel", "Anahí Ruiz"]
+    assert _names(idx.search("ana", limit=1)) == ["Ana Martínez"]
+
+
+def test_candidate_cap_is_taken_from_the_most_selective_prefix(session_factory, index, monkeypatch):
+    _add(session_factory, *[(f"Cliente {i:02d}", None, None) for i in range(20)], ("Zoe Cliente", None, None))
+    idx = index()
+    monkeypatch.setattr(settings, "autocomplete_max_candidates", 5)
+
+    # "zoe" tiene un solo token: el tope no lo afecta aunque "cliente" tenga 21
+    assert _names(idx.search("cliente zoe")) == ["Zoe Cliente"]
+    assert len(idx.search("cliente", limit=50)) == 5
+
+
+def test_route_answers_from_memory_without_touching_the_database(client, seed, index, queries):
+    seed(n_sales=3)
+    index()
+    queries.reset()
+
+    resp = client.get("/customers/autocomplete", params={"q": "cliente 0001"})
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["source"] == "memory"
+    assert _names(resp.json()["items"]) == ["Cliente 0001"]
+    assert queries.count == 0
+
+
+@pytest.mark.usefixtures("index")
+def test_route_falls_back_to_the_database_until_the_index_loads(client, seed):
+    seed(n_sales=3)
+
+    resp = client.get("/customers/autocomplete", params={"q": "cliente 0002"})
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["source"] == "database"
+    assert _names(resp.json()["items"]) == ["Cliente 0002"]
+
+
+def test_create_update_and_delete_keep_the_index_in_sync(client, seed, index):
+    seed(n_sales=0)
+    index()
+
+    def search(q):
+        resp = client.get("/customers/autocomplete", params={"q": q})
+        assert resp.json()["source"] == "memory"
+        return _names(resp.json()["items"])
+
+    customer_id = client.post("/customers/", json={"name": "Rocío Benítez", "phone": "555-0101"}).json()["id"]
+    assert search("rocio") == ["Rocío Benítez"]
+    assert search("5550101") == ["Rocío Benítez"]
+
+    assert client.patch(f"/customers/{customer_id}", json={"name": "Rocío Acosta"}).status_code == 200
+    assert search("benitez") == []
+    assert search("acosta") == ["Rocío Acosta"]
+
+    assert client.delete(f"/customers/{customer_id}").status_code == 204
+    assert search("rocio") == []
@@ -0,0 +1,116 @@
+"""
+create_edition_ingredient usa solo la conexión de su sesión: N escritores
+concurrentes terminan con un pool de exactamente N conexiones (max_overflow=0),
+y dentro de la transacción de un caller corre en un SAVEPOINT.
+"""
+# pylint: disable=import-error,redefined-outer-name
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.pool import QueuePool
+
+from commands.bench_edition_ingredients import PoolUsage
+from crud.edition_ingredient import create_edition_ingredient
+from db.base import Base
+from models.customer import Customer
+from models.edition_ingredient import EditionIngredient
+from models.ingredient import Ingredient
+from models.purchase import Purchase
+from schemas.edition_ingredient import EditionIngredientCreate
+
+WRITERS = 4
+PER_WRITER = 10
+
+
+@pytest.fixture
+def engine(tmp_path):
+    eng = create_engine(
+        f"sqlite:///{tmp_path / 'concurrency.db'}",
+        poolclass=QueuePool,
+        pool_size=WRITERS,
+        max_overflow=0,
+        pool_timeout=5,
+        connect_args={"timeout": 30, "check_same_thread": False},
+    )
+
+    # pysqlite: transacciones y SAVEPOINT explícitos (BEGIN IMMEDIATE serializa escritores)
+    @event.listens_for(eng, "connect")
+    def _no_implicit_begin(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None
+
+    @event.listens_for(eng, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
+
+
+def _quantity(session_factory, ingredient_id: int = 1) -> float:
+    with session_factory() as db:
+        return db.execute(select(EditionIngredient.quantity).where(
+            EditionIngredient.edition_id == 1, EditionIngredient.ingredient_id == ingredient_id,
+        )).scalar_one()
+
+
+def _purchases(session_factory) -> int:
+    with session_factory() as db:
+        return db.execute(select(func.count()).select_from(Purchase)).scalar_one()  # pylint: disable=not-callable
+
+
+@pytest.mark.parametrize("strategy", ["sum", "replace"])
+def test_concurrent_writers_fit_in_one_connection_each(engine, session_factory, seed, strategy):
+    seed(n_sales=0, n_ingredients=4)
+    usage = PoolUsage(engine)
+    purchases_before = _purchases(session_factory)
+    payload = EditionIngredientCreate(ingredient_id=1, quantity=1.5)
+
+    def writer(_: int) -> None:
+        with session_factory() as db:
+            for _ in range(PER_WRITER):
+                create_edition_ingredient(db, 1, payload, strategy=strategy)
+
+    with ThreadPoolExecutor(max_workers=WRITERS) as pool:
+        list(pool.map(writer, range(WRITERS)))
+
+    assert usage.peak <= WRITERS
+    assert _purchases(session_factory) == purchases_before + WRITERS * PER_WRITER
+    # la fila sembrada tiene quantity=2
+    expected = 2 + WRITERS * PER_WRITER * 1.5 if strategy == "sum" else 1.5
+    assert _quantity(session_factory) == pytest.approx(expected)
+
+
+def test_failure_inside_caller_transaction_rolls_back_only_its_savepoint(engine, session_factory, seed):
+    seed(n_sales=0, n_ingredients=4)
+    usage = PoolUsage(engine)
+    with session_factory() as db:
+        db.add(Ingredient(name="Pimentón", unit_price=3.0, unit="kg", category="OTHER"))
+        db.commit()
+    with engine.begin() as conn:
+        # falla el alta del edition_ingredient después de insertar su compra
+        conn.exec_driver_sql(
+            "CREATE TRIGGER reject_pimenton BEFORE INSERT ON edition_ingredient "
+            "WHEN NEW.ingredient_id = 5 BEGIN SELECT RAISE(ABORT, 'rechazado'); END"
+        )
+    purchases_before = _purchases(session_factory)
+
+    with session_factory() as db:
+        with db.begin():
+            db.add(Customer(name="Del caller", phone="555"))
+            create_edition_ingredient(db, 1, EditionIngredientCreate(ingredient_id=1, quantity=1.0))
+            with pytest.raises(HTTPException) as exc_info:
+                create_edition_ingredient(db, 1, EditionIngredientCreate(ingredient_id=5, quantity=1.0))
+            assert exc_info.value.status_code == 400
+            # la transacción del caller sigue viva después del ROLLBACK TO SAVEPOINT
+            create_edition_ingredient(db, 1, EditionIngredientCreate(ingredient_id=2, quantity=1.0))
+
+    assert usage.peak == 1
+    assert _quantity(session_factory, 1) == pytest.approx(3.0)
+    assert _quantity(session_factory, 2) == pytest.approx(3.0)
+    assert _purchases(session_factory) == purchases_before + 2
+    with session_factory() as db:
+        assert db.execute(select(Customer.name).where(Customer.phone == "555")).scalar_one() == "Del caller"
+        assert db.execute(select(EditionIngredient).where(EditionIngredient.ingredient_id == 5)).first() is None
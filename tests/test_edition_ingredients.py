@@ -0,0 +1,62 @@
+"""Listado y altas de ingredientes por edición."""
+# pylint: disable=import-error
+from sqlalchemy import event, func, select
+
+from crud import edition_ingredient as crud_ei
+from models.edition_ingredient import EditionIngredient
+from models.purchase import Purchase
+from schemas.edition_ingredient import EditionIngredientCreate
+
+
+def test_list_totals_by_category_and_grand_total(client, seed):
+    seed(n_ingredients=6)
+    body = client.get("/edition_ingredients/1", params={"limit": 2}).json()
+
+    # Carne 200 + Chorizo 100 + Poroto 20 + Zapallo 10 + dos "OTHER" (2 y 4)
+    assert body["total"] == 6
+    assert body["ingredients_total"] == 336.0
+    assert body["total_expenses"] == 336.0
+    by_category = {c["category"]: c["total"] for c in body["category_totals"]}
+    assert by_category == {"LEGUMES": 20.0, "MEAT": 200.0, "OTHER": 6.0, "SAUSAGES": 100.0, "VEGETABLES": 10.0}
+
+
+def test_list_totals_without_matches_still_report_expenses(client, seed):
+    seed(n_ingredients=2)
+    body = client.get("/edition_ingredients/1", params={"q": "no existe"}).json()
+
+    assert body["total"] == 0
+    assert body["category_totals"] == []
+    assert body["ingredients_total"] == 0.0
+    assert body["total_expenses"] == 300.0
+
+
+def test_batch_retries_when_a_new_row_was_created_concurrently(engine, session_factory, seed):
+    seed(n_ingredients=4)
+    with session_factory() as db:
+        # alta de otra transacción, commiteada "después" del SELECT ... FOR UPDATE del lote
+        db.add(EditionIngredient(edition_id=2, ingredient_id=1, quantity=5.0, unit_price=100.0, subtotal=500.0))
+        db.commit()
+
+    blinded = []
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _miss_first_lock(_conn, _cursor, statement, parameters, _context, _executemany):
+        if not blinded and statement.startswith("SELECT edition_ingredient.id, edition_ingredient.ingredient_id"):
+            blinded.append(statement)
+            statement = statement.replace("WHERE ", "WHERE 0 AND ", 1)
+        return statement, parameters
+
+    items = [EditionIngredientCreate(ingredient_id=1, quantity=1.0), EditionIngredientCreate(ingredient_id=2, quantity=2.0)]
+    with session_factory() as db:
+        result = crud_ei.create_edition_ingredients_batch(db, 2, items, strategy="sum")
+
+    assert blinded
+    assert (result.created, result.updated, result.purchases) == (1, 1, 2)
+    with session_factory() as db:
+        rows = dict(db.execute(
+            select(EditionIngredient.ingredient_id, EditionIngredient.quantity).where(EditionIngredient.edition_id == 2)
+        ).all())
+        # la compra del intento fallido se deshizo con él
+        purchases = db.execute(select(func.count()).select_from(Purchase).where(Purchase.edition_id == 2)).scalar_one()  # pylint: disable=not-callable
+    assert rows == {1: 6.0, 2: 2.0}
+    assert purchases == 2
@@ -0,0 +1,103 @@
+"""MessagePack por negociación de contenido (api/formats.py): respuestas y cuerpos de pedido."""
+# pylint: disable=import-error,redefined-outer-name
+import pytest
+
+from core import cache
+from core.config import settings
+
+msgpack = pytest.importorskip("msgpack")
+
+MSGPACK = "application/msgpack"
+
+
+@pytest.fixture
+def response_cache(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_enabled", True)
+    monkeypatch.setattr(settings, "response_cache_compress_min_bytes", 0)
+    monkeypatch.setattr(cache, "backend", cache.MemoryBackend(max_entries=100))
+
+
+@pytest.mark.parametrize("accept, binary", [
+    (MSGPACK, True),
+    ("application/x-msgpack", True),
+    (f"application/json;q=0.5, {MSGPACK}", True),
+    (f"application/json, {MSGPACK};q=0.5", False),
+    (f"{MSGPACK};q=0", False),
+    ("*/*", False),
+    ("", False),
+])
+def test_accept_negotiates_the_response_format(client, seed, accept, binary):
+    seed(n_sales=3)
+    headers = {"Accept": accept} if accept else {}
+
+    resp = client.get("/sales/edition/1", headers=headers)
+
+    assert resp.status_code == 200, resp.text
+    assert "Accept" in resp.headers["Vary"]
+    if binary:
+        assert resp.headers["Content-Type"] == MSGPACK
+        assert msgpack.unpackb(resp.content) == client.get("/sales/edition/1").json()
+    else:
+        assert resp.headers["Content-Type"].startswith("application/json")
+
+
+def test_routes_serialized_by_fastapi_are_re_encoded(client, seed):
+    seed()
+    expected = client.get("/customers/1").json()
+
+    resp = client.get("/customers/1", headers={"Accept": MSGPACK})
+
+    assert resp.headers["Content-Type"] == MSGPACK
+    assert msgpack.unpackb(resp.content) == expected
+
+
+def test_cached_msgpack_keeps_gzip_and_does_not_mix_with_json(client, seed, response_cache):
+    seed()
+    json_body = client.get("/ingredients/", headers={"Accept-Encoding": "gzip"}).json()
+
+    for expected_cache in ("MISS", "HIT"):
+        resp = client.get("/ingredients/", headers={"Accept": MSGPACK, "Accept-Encoding": "gzip"})
+        assert resp.headers["X-Cache"] == expected_cache
+        assert resp.headers["Content-Type"] == MSGPACK
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert set(resp.headers["Vary"].replace(" ", "").split(",")) == {"Accept", "Accept-Encoding"}
+        assert msgpack.unpackb(resp.content) == json_body
+
+    resp = client.get("/ingredients/", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["X-Cache"] == "HIT"
+    assert resp.json() == json_body
+
+
+def test_conditional_get_answers_msgpack(client, seed):
+    seed()
+    resp = client.get("/edition_ingredients/1", headers={"Accept": MSGPACK})
+
+    assert resp.headers["Content-Type"] == MSGPACK
+    assert msgpack.unpackb(resp.content) == client.get("/edition_ingredients/1").json()
+    assert client.get("/edition_ingredients/1", headers={
+        "Accept": MSGPACK, "If-None-Match": resp.headers["ETag"],
+    }).status_code == 304
+
+
+def test_msgpack_request_body_is_decoded(client):
+    body = msgpack.packb({"name": "Cliente MsgPack", "phone": "123"})
+
+    resp = client.post("/customers/", content=body, headers={"Content-Type": MSGPACK})
+
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["name"] == "Cliente MsgPack"
+
+
+def test_msgpack_request_body_is_validated_like_json(client):
+    body = msgpack.packb({"name": ""})
+
+    resp = client.post("/customers/", content=body, headers={"Content-Type": MSGPACK})
+
+    assert resp.status_code == 422, resp.text
+
+
+@pytest.mark.parametrize("body", [b"\xc1", msgpack.packb({"name": b"\x00\x01"})])
+def test_invalid_msgpack_request_body_is_400(client, body):
+    resp = client.post("/customers/", content=body, headers={"Content-Type": MSGPACK})
+
+    assert resp.status_code == 400, resp.text
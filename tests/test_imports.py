@@ -0,0 +1,58 @@
+"""POST /imports/{entity}: el cuerpo se copia a un archivo temporal sin bloquear el event loop."""
+# pylint: disable=import-error
+import asyncio
+import os
+import tempfile
+
+from api.routes import imports as imports_route
+from crud.imports import ImportJob
+
+_NamedTemporaryFile = tempfile.NamedTemporaryFile
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class _RecordingFile:
+    """Archivo temporal que anota si cada operación corrió sobre el event loop."""
+
+    def __init__(self, calls, **kwargs) -> None:
+        calls.append(("open", _in_event_loop()))
+        self._calls = calls
+        self._file = _NamedTemporaryFile(**kwargs)  # pylint: disable=consider-using-with
+        self.name = self._file.name
+
+    def write(self, data) -> int:
+        self._calls.append(("write", _in_event_loop()))
+        return self._file.write(data)
+
+    def close(self) -> None:
+        self._calls.append(("close", _in_event_loop()))
+        self._file.close()
+
+
+def test_upload_is_written_off_the_event_loop(client, monkeypatch):
+    calls, started = [], []
+    monkeypatch.setattr(imports_route.tempfile, "NamedTemporaryFile", lambda **kw: _RecordingFile(calls, **kw))
+
+    def _start(_engine, entity, fmt, path):
+        with open(path, "rb") as stream:
+            started.append(stream.read())
+        os.remove(path)
+        return ImportJob(entity=entity, format=fmt)
+
+    monkeypatch.setattr(imports_route.import_jobs, "start", _start)
+    body = b"name,email\n" + b"".join(b"Cliente %d,c%d@x.com\n" % (i, i) for i in range(150_000))
+
+    resp = client.post("/imports/customers", content=body, headers={"Content-Type": "text/csv"})
+
+    assert resp.status_code == 202, resp.text
+    assert started == [body]
+    assert [op for op, _ in calls][0] == "open" and [op for op, _ in calls][-1] == "close"
+    assert any(op == "write" for op, _ in calls)
+    assert not any(on_loop for _, on_loop in calls)
@@ -0,0 +1,82 @@
+"""Totales de listados: modo estimate (EXPLAIN del planner) con filtros Enum."""
+# pylint: disable=import-error,protected-access
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from core.config import settings
+from crud.pagination import TotalMode, count_total
+from models.ingredient import Category, Ingredient
+from models.purchase import PaymentStatus, Purchase
+
+
+class _PlannerSession:
+    """Sesión con dialecto psycopg2 que captura lo ejecutado y devuelve un plan fijo."""
+
+    def __init__(self, dialect, plan_rows: int) -> None:
+        self.dialect = dialect
+        self.plan_rows = plan_rows
+        self.executed = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=self.dialect)
+
+    def execute(self, statement, params=None):
+        self.executed.append((statement, params))
+        plan = f'[{{"Plan": {{"Plan Rows": {self.plan_rows}}}}}]'
+        return SimpleNamespace(scalar_one=lambda: plan)
+
+
+def _driver_params(dialect, statement) -> dict:
+    # lo mismo que hace el contexto de ejecución antes de llamar a cursor.execute()
+    compiled = statement.compile(dialect=dialect)
+    expanded = compiled._process_parameters_for_postcompile(compiled.construct_params())
+    processors = {**compiled._bind_processors, **expanded.processors}
+    return compiled, {
+        key: processors[key](value) if key in processors else value
+        for key, value in expanded.parameters.items()
+    }
+
+
+@pytest.mark.parametrize("stmt", [
+    select(Ingredient).where(Ingredient.category.in_([Category.MEAT, Category.SAUSAGES])),
+    select(Purchase).where(Purchase.payment_status == PaymentStatus.PENDING),
+])
+def test_estimate_with_enum_filter_binds_driver_values(stmt):
+    psycopg2 = pytest.importorskip("psycopg2")
+    from sqlalchemy.dialects.postgresql.psycopg2 import dialect as pg_dialect  # pylint: disable=import-outside-toplevel
+
+    dialect = pg_dialect()
+    db = _PlannerSession(dialect, plan_rows=7)
+
+    assert count_total(db, stmt, TotalMode.ESTIMATE) == 7
+
+    (statement, params), = db.executed
+    assert params is None
+    compiled, values = _driver_params(dialect, statement)
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert values
+    for value in values.values():
+        assert not isinstance(value, (Category, PaymentStatus))
+        psycopg2.extensions.adapt(value)
+
+
+def test_estimate_falls_back_to_exact_count_outside_postgres(client, seed):
+    seed(n_ingredients=4)
+    resp = client.get("/ingredients/", params={"q": "meat", "total_mode": "estimate"})
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["total"] == 1
+    assert [item["name"] for item in body["items"]] == ["Carne"]
+
+
+def test_count_cache_is_cleared_by_writes(client, seed, monkeypatch):
+    monkeypatch.setattr(settings, "count_cache_ttl_seconds", 60.0)
+    seed(n_ingredients=4)
+    assert client.get("/ingredients/").json()["total"] == 4
+
+    resp = client.post("/ingredients/", json={"name": "Cebolla", "unit_price": 2.0, "category": "VEGETABLES"})
+    assert resp.status_code in (200, 201), resp.text
+
+    assert client.get("/ingredients/").json()["total"] == 5
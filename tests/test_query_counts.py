@@ -0,0 +1,59 @@
+"""
+Cantidad de sentencias por endpoint: con los perfiles de carga (crud/loaders.py)
+no depende del tamaño de la página, y el raiseload("*") de cada perfil no salta.
+"""
+# pylint: disable=import-error
+import pytest
+
+from crud import edition_ingredient as crud_ei
+
+
+def _statements(client, queries, url: str, **params) -> int:
+    queries.reset()
+    resp = client.get(url, params=params)
+    assert resp.status_code == 200, resp.text
+    return queries.count
+
+
+@pytest.mark.parametrize("url", ["/sales/", "/edition_ingredients/1", "/purchases/"])
+def test_list_query_count_does_not_depend_on_page_size(client, seed, queries, url):
+    seed(n_sales=40, n_ingredients=30)
+
+    small = _statements(client, queries, url, limit=3)
+    large = _statements(client, queries, url, limit=25)
+
+    assert small == large
+
+
+@pytest.mark.parametrize("url", ["/sales/", "/edition_ingredients/1", "/purchases/"])
+def test_list_pages_are_complete(client, seed, url):
+    # las relaciones anidadas vienen en cada fila (no se cortan por raiseload)
+    seed(n_sales=40, n_ingredients=30)
+    items = client.get(url, params={"limit": 25}).json()["items"]
+    assert len(items) == 25
+    if url == "/sales/":
+        assert all(item["customer"] and item["edition"] for item in items)
+    if url == "/edition_ingredients/1":
+        assert all(item["ingredient"] and item["edition"] and item["purchase"] for item in items)
+
+
+@pytest.mark.parametrize("url", ["/sales/{}", "/purchases/{}"])
+def test_get_query_count_is_fixed(client, seed, queries, url):
+    seed(n_sales=10, n_ingredients=10)
+
+    first = _statements(client, queries, url.format(1))
+    other = _statements(client, queries, url.format(7))
+
+    assert first == other
+
+
+def test_get_edition_ingredient_query_count_is_fixed(session_factory, seed, queries):
+    seed(n_ingredients=10)
+    counts = []
+    for ei_id in (1, 7):
+        with session_factory() as db:
+            queries.reset()
+            row = crud_ei.get_edition_ingredient(db, ei_id)
+            assert row.ingredient.id and row.edition.id and row.purchase.id
+            counts.append(queries.count)
+    assert counts[0] == counts[1]
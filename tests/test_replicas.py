@@ -0,0 +1,56 @@
+"""Lecturas en réplicas (api/deps.py): sin checkout extra y fallback al primario si la réplica no responde."""
+# pylint: disable=import-error,redefined-outer-name
+import pytest
+from sqlalchemy import create_engine, event
+
+from api import deps
+from db.replicas import ReplicaSet
+
+
+@pytest.fixture
+def use_replica(monkeypatch):
+    def _use(*engines):
+        replica_set = ReplicaSet(list(engines))
+        monkeypatch.setattr(deps, "replicas", replica_set)
+        return replica_set
+
+    return _use
+
+
+def _checkouts(eng) -> list:
+    calls = []
+    event.listen(eng, "checkout", lambda *_: calls.append(1))
+    return calls
+
+
+def test_replica_read_takes_a_single_checkout(client, seed, engine, use_replica):
+    seed(n_sales=3)
+    replica = create_engine(engine.url)
+    use_replica(replica)
+    replica_checkouts, primary_checkouts = _checkouts(replica), _checkouts(engine)
+
+    resp = client.get("/customers/1")
+
+    assert resp.status_code == 200, resp.text
+    assert len(replica_checkouts) == 1
+    assert not primary_checkouts
+    replica.dispose()
+
+
+def test_unreachable_replica_falls_back_to_primary_and_leaves_rotation(client, seed, tmp_path, engine, use_replica):
+    seed(n_sales=3)
+    broken = create_engine(f"sqlite:///{tmp_path / 'no-existe' / 'replica.db'}")
+    replica_set = use_replica(broken)
+    primary_checkouts = _checkouts(engine)
+
+    resp = client.get("/customers/1")
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["id"] == 1
+    assert primary_checkouts
+    assert replica_set.candidates() == []
+
+    # fuera de rotación: el siguiente GET ni intenta la réplica
+    broken_checkouts = _checkouts(broken)
+    assert client.get("/customers/").status_code == 200
+    assert not broken_checkouts
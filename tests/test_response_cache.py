@@ -0,0 +1,112 @@
+"""Cache de respuestas (api/cache.py): lecturas de réplica y negociación de gzip."""
+# pylint: disable=import-error,redefined-outer-name
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+from starlette.requests import Request
+
+import main
+from api.cache import cached_response
+from api.deps import get_db
+from core import cache
+from core.config import settings
+
+
+class _Body(BaseModel):
+    value: int
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_enabled", True)
+    monkeypatch.setattr(settings, "read_your_writes_seconds", 5.0)
+    fresh = cache.MemoryBackend(max_entries=100)
+    monkeypatch.setattr(cache, "backend", fresh)
+    return fresh
+
+
+def _request(replica: bool = False, accept_encoding: str = "") -> Request:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    request = Request({"type": "http", "method": "GET", "path": "/things/", "query_string": b"", "headers": headers})
+    if replica:
+        request.state.db_replica = True
+    return request
+
+
+def _get(request: Request, builds: list):
+    async def build():
+        builds.append(1)
+        return {"value": len(builds)}
+
+    return asyncio.run(cached_response(request, tags=("things",), model=_Body, build=build))
+
+
+def test_replica_read_right_after_invalidation_is_not_stored(backend):
+    builds = []
+    cache.invalidate("things")
+
+    assert _get(_request(replica=True), builds).headers["X-Cache"] == "MISS"
+    assert _get(_request(replica=True), builds).headers["X-Cache"] == "MISS"
+    assert len(builds) == 2
+    assert backend.size() == 0
+
+
+def test_replica_read_outside_the_lag_window_is_stored(backend, monkeypatch):
+    builds = []
+    cache.invalidate("things")
+    monkeypatch.setattr(settings, "read_your_writes_seconds", 0.0)
+
+    _get(_request(replica=True), builds)
+    assert _get(_request(replica=True), builds).headers["X-Cache"] == "HIT"
+    assert len(builds) == 1
+
+
+def test_primary_read_after_invalidation_is_stored(backend):
+    builds = []
+    cache.invalidate("things")
+
+    _get(_request(), builds)
+    assert _get(_request(replica=True), builds).headers["X-Cache"] == "HIT"
+    assert len(builds) == 1
+
+
+@pytest.mark.parametrize("accept_encoding, gzipped", [
+    ("gzip", True),
+    ("deflate, gzip;q=0.5", True),
+    ("GZIP ; Q=1.0", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0.0, deflate", False),
+    ("*, gzip;q=0", False),
+    ("br", False),
+    ("", False),
+])
+def test_gzip_entries_honour_q_values_and_always_vary(backend, monkeypatch, accept_encoding, gzipped):
+    monkeypatch.setattr(settings, "response_cache_compress_min_bytes", 0)
+    builds = []
+    for expected_cache in ("MISS", "HIT"):
+        resp = _get(_request(accept_encoding=accept_encoding), builds)
+        assert resp.headers["X-Cache"] == expected_cache
+        assert resp.headers["Vary"] == "Accept-Encoding"
+        assert (resp.headers.get("Content-Encoding") == "gzip") is gzipped
+        if not gzipped:
+            assert resp.body == b'{"value":1}'
+
+
+@pytest.mark.parametrize("url", ["/ingredients/", "/editions/", "/editions/1"])
+def test_cache_hit_does_not_open_a_session(backend, client, seed, url):
+    seed()
+    opened = []
+    get_test_db = main.app.dependency_overrides[get_db]
+
+    def _counting_get_db():
+        opened.append(1)
+        yield from get_test_db()
+
+    main.app.dependency_overrides[get_db] = _counting_get_db
+    assert client.get(url).headers["X-Cache"] == "MISS"
+    assert len(opened) == 1
+
+    assert client.get(url).headers["X-Cache"] == "HIT"
+    assert len(opened) == 1
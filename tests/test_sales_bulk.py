@@ -0,0 +1,51 @@
+"""PATCH /sales/bulk: tope de filas también por filtro y nulls explícitos."""
+# pylint: disable=import-error
+import pytest
+
+from core.config import settings
+
+
+def _delivered(client) -> int:
+    items = client.get("/sales/edition/1", params={"limit": 100}).json()["items"]
+    return sum(item["delivered"] for item in items)
+
+
+def test_filter_matching_more_than_the_cap_is_rejected(client, seed, monkeypatch):
+    seed(n_sales=10)
+    monkeypatch.setattr(settings, "sale_bulk_max_rows", 5)
+
+    resp = client.patch("/sales/bulk", json={"filter": {"edition_id": 1}, "changes": {"delivered": True}})
+
+    assert resp.status_code == 413, resp.text
+    assert _delivered(client) == 0
+
+
+def test_filter_within_the_cap_updates(client, seed, monkeypatch):
+    seed(n_sales=10)
+    monkeypatch.setattr(settings, "sale_bulk_max_rows", 10)
+
+    resp = client.patch("/sales/bulk", json={"filter": {"edition_id": 1}, "changes": {"delivered": True}})
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["updated"] == 10
+    assert _delivered(client) == 10
+
+
+@pytest.mark.parametrize("field", ["payment_status", "total_portions", "delivered"])
+def test_explicit_null_for_required_fields_is_422(client, seed, field):
+    seed(n_sales=3)
+
+    resp = client.patch("/sales/bulk", json={"ids": [1, 2], "changes": {field: None}})
+
+    assert resp.status_code == 422, resp.text
+
+
+def test_explicit_null_clears_optional_fields(client, seed):
+    seed(n_sales=3)
+    client.patch("/sales/bulk", json={"ids": [1], "changes": {"discount_price": 2.0}})
+
+    resp = client.patch("/sales/bulk", json={"ids": [1], "changes": {"discount_price": None}})
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["items"][0]["discount_price"] is None
+    assert resp.json()["items"][0]["total_amount"] == 10.0